@@ -0,0 +1,58 @@
+"""Alembic environment: runs migrations against the app's configured database."""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.core.database import Base, create_engine
+import app.modules.evals.models  # noqa: F401  (register models on Base.metadata)
+import app.modules.playground.models  # noqa: F401
+
+
+config = context.config
+
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def _configure(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL without a database connection."""
+    context.configure(
+        url=settings.async_database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=settings.is_sqlite,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_async() -> None:
+    """Run migrations using a fresh async engine (CLI usage)."""
+    engine = create_engine()
+    async with engine.begin() as connection:
+        await connection.run_sync(_configure)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif (connection := config.attributes.get("connection")) is not None:
+    # Called from app.core.database.init_db with an open connection
+    _configure(connection)
+else:
+    asyncio.run(run_migrations_async())
@@ -0,0 +1,43 @@
+"""Baseline schema (eval_runs as created by the original create_all bootstrap).
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "eval_runs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("dataset_name", sa.String(), nullable=True),
+        sa.Column("metric_config", sa.JSON(), nullable=True),
+        sa.Column("inputs", sa.JSON(), nullable=True),
+        sa.Column("outputs", sa.JSON(), nullable=True),
+        sa.Column("results", sa.JSON(), nullable=True),
+        sa.Column("total_items", sa.Integer(), nullable=True),
+        sa.Column("completed_items", sa.Integer(), nullable=True),
+        sa.Column("avg_latency_ms", sa.Float(), nullable=True),
+        sa.Column("avg_perplexity", sa.Float(), nullable=True),
+        sa.Column("pass_rate", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("eval_runs")
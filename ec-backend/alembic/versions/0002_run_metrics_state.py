@@ -0,0 +1,27 @@
+"""Add running metrics snapshot and list-view index to eval_runs.
+
+Revision ID: 0002_run_metrics_state
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_run_metrics_state"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("metrics_state", sa.JSON(), nullable=True))
+    op.create_index("ix_eval_runs_created_at", "eval_runs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_runs_created_at", table_name="eval_runs")
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("metrics_state")
@@ -0,0 +1,38 @@
+"""Add eval_jobs table for the in-process job runner.
+
+Revision ID: 0003_eval_jobs
+Revises: 0002_run_metrics_state
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_eval_jobs"
+down_revision = "0002_run_metrics_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "eval_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_eval_jobs_run_id", "eval_jobs", ["run_id"])
+    op.create_index("ix_eval_jobs_status", "eval_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_jobs_status", table_name="eval_jobs")
+    op.drop_index("ix_eval_jobs_run_id", table_name="eval_jobs")
+    op.drop_table("eval_jobs")
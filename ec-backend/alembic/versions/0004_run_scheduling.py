@@ -0,0 +1,31 @@
+"""Add generation settings and pre-flight schedule to eval_runs.
+
+Revision ID: 0004_run_scheduling
+Revises: 0003_eval_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_run_scheduling"
+down_revision = "0003_eval_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("temperature", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("max_tokens", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("estimate", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("schedule", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("schedule")
+        batch_op.drop_column("estimate")
+        batch_op.drop_column("max_tokens")
+        batch_op.drop_column("temperature")
@@ -0,0 +1,31 @@
+"""Add priority class to eval_runs and eval_jobs.
+
+Revision ID: 0005_run_priority
+Revises: 0004_run_scheduling
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_run_priority"
+down_revision = "0004_run_scheduling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("priority", sa.String(), nullable=False, server_default="batch"))
+    with op.batch_alter_table("eval_jobs") as batch_op:
+        batch_op.add_column(sa.Column("priority", sa.String(), nullable=False, server_default="batch"))
+    op.create_index("ix_eval_runs_status_priority", "eval_runs", ["status", "priority", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_runs_status_priority", table_name="eval_runs")
+    with op.batch_alter_table("eval_jobs") as batch_op:
+        batch_op.drop_column("priority")
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("priority")
@@ -0,0 +1,31 @@
+"""Add comparison run type, lane parent link and model list to eval_runs.
+
+Revision ID: 0006_comparison_runs
+Revises: 0005_run_priority
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_comparison_runs"
+down_revision = "0005_run_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("run_type", sa.String(), nullable=False, server_default="single"))
+        batch_op.add_column(sa.Column("parent_id", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("models", sa.JSON(), nullable=True))
+    op.create_index("ix_eval_runs_parent_id", "eval_runs", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_runs_parent_id", table_name="eval_runs")
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("models")
+        batch_op.drop_column("parent_id")
+        batch_op.drop_column("run_type")
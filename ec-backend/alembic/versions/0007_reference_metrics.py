@@ -0,0 +1,25 @@
+"""Add reference-scoring aggregates to eval_runs.
+
+Revision ID: 0007_reference_metrics
+Revises: 0006_comparison_runs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_reference_metrics"
+down_revision = "0006_comparison_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("reference_metrics", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("reference_metrics")
@@ -0,0 +1,27 @@
+"""Add sequential stopping rule and outcome to eval_runs.
+
+Revision ID: 0008_early_stopping
+Revises: 0007_reference_metrics
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_early_stopping"
+down_revision = "0007_reference_metrics"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("stopping_rule", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("stopping", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("stopping")
+        batch_op.drop_column("stopping_rule")
@@ -0,0 +1,40 @@
+"""Add per-item table keyed by prompt hash for run-to-run diffs.
+
+Revision ID: 0009_eval_items
+Revises: 0008_early_stopping
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_eval_items"
+down_revision = "0008_early_stopping"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "eval_items",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("item_index", sa.Integer(), nullable=False),
+        sa.Column("input_hash", sa.String(length=64), nullable=False),
+        sa.Column("occurrence", sa.Integer(), nullable=False),
+        sa.Column("passed", sa.Boolean(), nullable=False),
+        sa.Column("latency_ms", sa.Float(), nullable=True),
+        sa.Column("failure_reason", sa.String(), nullable=True),
+        sa.Column("output", sa.Text(), nullable=True),
+        sa.Column("output_hash", sa.String(length=64), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_eval_items_run_input", "eval_items", ["run_id", "input_hash", "occurrence"], unique=True)
+    op.create_index("ix_eval_items_input_hash", "eval_items", ["input_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_items_input_hash", table_name="eval_items")
+    op.drop_index("ix_eval_items_run_input", table_name="eval_items")
+    op.drop_table("eval_items")
@@ -0,0 +1,37 @@
+"""Add export fields and an ordered (run_id, item_index) index to eval_items.
+
+Revision ID: 0010_item_export_fields
+Revises: 0009_eval_items
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_item_export_fields"
+down_revision = "0009_eval_items"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_items") as batch_op:
+        batch_op.add_column(sa.Column("input_prompt", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("output_tokens", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("perplexity", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("aborted", sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column("validations", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("reference_scores", sa.JSON(), nullable=True))
+    op.create_index("ix_eval_items_run_index", "eval_items", ["run_id", "item_index"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eval_items_run_index", table_name="eval_items")
+    with op.batch_alter_table("eval_items") as batch_op:
+        batch_op.drop_column("reference_scores")
+        batch_op.drop_column("validations")
+        batch_op.drop_column("aborted")
+        batch_op.drop_column("perplexity")
+        batch_op.drop_column("output_tokens")
+        batch_op.drop_column("input_prompt")
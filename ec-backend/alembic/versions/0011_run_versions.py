@@ -0,0 +1,30 @@
+"""Add a write version counter and updated_at to eval_runs for conditional GETs.
+
+Revision ID: 0011_run_versions
+Revises: 0010_item_export_fields
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_run_versions"
+down_revision = "0010_item_export_fields"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE eval_runs SET updated_at = COALESCE(completed_at, started_at, created_at)")
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("version")
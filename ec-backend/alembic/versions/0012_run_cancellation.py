@@ -0,0 +1,29 @@
+"""Add cancellation flag and item / run deadlines to eval_runs.
+
+Revision ID: 0012_run_cancellation
+Revises: 0011_run_versions
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_run_cancellation"
+down_revision = "0011_run_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("item_timeout_seconds", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("run_timeout_seconds", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("cancel_requested")
+        batch_op.drop_column("run_timeout_seconds")
+        batch_op.drop_column("item_timeout_seconds")
@@ -0,0 +1,27 @@
+"""Add archival timestamp and chunk manifest to eval_runs.
+
+Revision ID: 0013_run_archival
+Revises: 0012_run_cancellation
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013_run_archival"
+down_revision = "0012_run_cancellation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("archived_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("archive", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("archive")
+        batch_op.drop_column("archived_at")
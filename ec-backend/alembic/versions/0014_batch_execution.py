@@ -0,0 +1,27 @@
+"""Add execution mode and provider batch job state to eval_runs.
+
+Revision ID: 0014_batch_execution
+Revises: 0013_run_archival
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014_batch_execution"
+down_revision = "0013_run_archival"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.add_column(sa.Column("execution_mode", sa.String(), nullable=False, server_default="stream"))
+        batch_op.add_column(sa.Column("batch", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_runs") as batch_op:
+        batch_op.drop_column("batch")
+        batch_op.drop_column("execution_mode")
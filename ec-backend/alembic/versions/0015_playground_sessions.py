@@ -0,0 +1,41 @@
+"""Add recorded playground sessions.
+
+Revision ID: 0015_playground_sessions
+Revises: 0014_batch_execution
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_playground_sessions"
+down_revision = "0014_batch_execution"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "playground_sessions",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("models", sa.JSON(), nullable=False),
+        sa.Column("n", sa.Integer(), nullable=False),
+        sa.Column("system_prompt", sa.Text(), nullable=True),
+        sa.Column("user_prompt", sa.Text(), nullable=False),
+        sa.Column("temperature", sa.Float(), nullable=True),
+        sa.Column("max_tokens", sa.Integer(), nullable=True),
+        sa.Column("top_p", sa.Float(), nullable=True),
+        sa.Column("streams", sa.JSON(), nullable=False),
+        sa.Column("duration_ms", sa.Float(), nullable=True),
+        sa.Column("blob_key", sa.String(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_playground_sessions_created_at", "playground_sessions", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playground_sessions_created_at", table_name="playground_sessions")
+    op.drop_table("playground_sessions")
@@ -0,0 +1,25 @@
+"""Add timed_out to eval_items (items replace the run's results JSON).
+
+Revision ID: 0016_item_timed_out
+Revises: 0015_playground_sessions
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016_item_timed_out"
+down_revision = "0015_playground_sessions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("eval_items") as batch_op:
+        batch_op.add_column(sa.Column("timed_out", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("eval_items") as batch_op:
+        batch_op.drop_column("timed_out")
@@ -0,0 +1,159 @@
+"""Runtime data assets (NLTK corpora, tokenizers) prepared at build time.
+
+Nothing downloads at request time: images run `python -m app.core.assets`
+during the build, which fetches every asset into the configured
+directories, and the API and workers only check at startup that the
+files are present.
+
+Usage:
+    python -m app.core.assets           # download missing assets
+    python -m app.core.assets --check   # exit 1 if any asset is missing
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from typing import Dict, List
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+# NLTK resources: punkt/punkt_tab for sentence splitting (burstiness), cmudict for textstat
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "cmudict": "corpora/cmudict",
+}
+
+TIKTOKEN_ENCODINGS = {
+    "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+}
+
+# Tokenizer family -> Hugging Face repo its tokenizer.json is fetched from
+# (gated repos need HF_TOKEN at build time)
+TOKENIZER_REPOS = {
+    "llama-3": "meta-llama/Llama-3.1-8B-Instruct",
+    "mixtral": "mistralai/Mixtral-8x7B-Instruct-v0.1",
+    "gemma-2": "google/gemma-2-9b-it",
+}
+
+
+def configure_asset_paths() -> None:
+    """Point NLTK and tiktoken at the prepared asset directories (before either is imported)."""
+    os.environ.setdefault("NLTK_DATA", os.path.abspath(settings.nltk_data_dir))
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.abspath(settings.tiktoken_cache_dir))
+
+
+def _nltk_present(path: str) -> bool:
+    base = os.path.join(os.environ.get("NLTK_DATA", settings.nltk_data_dir), path)
+    return os.path.isdir(base) or os.path.isfile(base + ".zip")
+
+
+def _tiktoken_present(url: str) -> bool:
+    # tiktoken caches each blob under the sha1 of its URL
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR", settings.tiktoken_cache_dir)
+    return os.path.isfile(os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest()))
+
+
+def tokenizer_path(name: str) -> str:
+    """Local tokenizer.json for a tokenizer family."""
+    return os.path.join(settings.tokenizer_dir, name, "tokenizer.json")
+
+
+def missing_assets() -> List[str]:
+    """Names of assets not present on disk (filesystem checks only, no heavy imports)."""
+    missing = [f"nltk:{name}" for name, path in NLTK_RESOURCES.items() if not _nltk_present(path)]
+    missing += [f"tiktoken:{name}" for name, url in TIKTOKEN_ENCODINGS.items() if not _tiktoken_present(url)]
+    missing += [f"tokenizer:{name}" for name in TOKENIZER_REPOS if not os.path.isfile(tokenizer_path(name))]
+    return missing
+
+
+def _download_tokenizer(name: str, repo: str) -> None:
+    """Fetch a repo's tokenizer.json (written via a temp file so a failed download leaves nothing)."""
+    import httpx
+
+    headers = {"Authorization": f"Bearer {os.environ['HF_TOKEN']}"} if os.environ.get("HF_TOKEN") else {}
+    path = tokenizer_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with httpx.stream(
+        "GET", f"https://huggingface.co/{repo}/resolve/main/tokenizer.json",
+        headers=headers, follow_redirects=True, timeout=60.0,
+    ) as response:
+        response.raise_for_status()
+        with open(path + ".tmp", "wb") as f:
+            for chunk in response.iter_bytes():
+                f.write(chunk)
+    os.replace(path + ".tmp", path)
+
+
+def check_assets() -> None:
+    """
+    Startup check for prepared assets.
+
+    Raises:
+        RuntimeError: If assets are missing and `require_assets` is set
+    """
+    missing = missing_assets()
+    if not missing:
+        return
+    message = f"Missing runtime assets: {', '.join(missing)} (run `python -m app.core.assets`)"
+    if settings.require_assets:
+        raise RuntimeError(message)
+    logger.warning(f"{message}; affected features fall back or fail")
+
+
+def prepare_assets() -> Dict[str, bool]:
+    """Download every missing asset; returns asset name -> present afterwards."""
+    configure_asset_paths()
+    status = {}
+
+    import nltk
+    nltk_dir = os.environ["NLTK_DATA"]
+    for name, path in NLTK_RESOURCES.items():
+        if not _nltk_present(path):
+            nltk.download(name, download_dir=nltk_dir, quiet=True)
+        status[f"nltk:{name}"] = _nltk_present(path)
+
+    import tiktoken
+    os.makedirs(os.environ["TIKTOKEN_CACHE_DIR"], exist_ok=True)
+    for name, url in TIKTOKEN_ENCODINGS.items():
+        if not _tiktoken_present(url):
+            try:
+                tiktoken.get_encoding(name)
+            except Exception as e:
+                logger.error(f"Failed to fetch tiktoken encoding {name}: {e}")
+        status[f"tiktoken:{name}"] = _tiktoken_present(url)
+
+    for name, repo in TOKENIZER_REPOS.items():
+        if not os.path.isfile(tokenizer_path(name)):
+            try:
+                _download_tokenizer(name, repo)
+            except Exception as e:
+                logger.error(f"Failed to fetch tokenizer {name} from {repo}: {e}")
+        status[f"tokenizer:{name}"] = os.path.isfile(tokenizer_path(name))
+    return status
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only check; exit 1 if anything is missing")
+    args = parser.parse_args()
+
+    configure_asset_paths()
+    if args.check:
+        missing = missing_assets()
+        for name in missing:
+            print(f"missing {name}")
+        return 1 if missing else 0
+
+    status = prepare_assets()
+    for name, present in status.items():
+        print(f"{'ok' if present else 'FAILED'} {name}")
+    return 0 if all(status.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
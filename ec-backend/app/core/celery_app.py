@@ -1,8 +1,12 @@
 """Celery application configuration."""
 
 from celery import Celery
+from kombu import Queue
+from .assets import configure_asset_paths
 from .config import settings
 
+configure_asset_paths()
+
 # Create Celery app
 celery_app = Celery(
     "ec_backend",
@@ -20,6 +24,31 @@ celery_app.conf.update(
     enable_utc=True,
     # Rate limiting to avoid flooding upstream APIs
     task_default_rate_limit="10/m",
-    # Concurrency limit
-    worker_concurrency=4,
+    # Each worker process executes one run at a time, so fair sharing of
+    # upstream slots (fair_scheduler) never applies between Celery runs.
+    # Interactive runs get their own queue instead: every worker consumes
+    # both, and workers started with `-Q <celery_interactive_queue>` are
+    # reserved for interactive runs, so batch runs can't occupy them.
+    task_queues=(Queue(settings.celery_queue), Queue(settings.celery_interactive_queue)),
+    task_default_queue=settings.celery_queue,
+    worker_concurrency=settings.celery_worker_concurrency,
+    # Priority queuing on Redis: 0 is served first. Prefetch one task at a
+    # time so a queued interactive run isn't stuck behind prefetched batch runs.
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+        "sep": ":",
+    },
+    task_default_priority=5,
+    worker_prefetch_multiplier=1,
 )
+
+# Celery task priority and queue per run priority class
+TASK_PRIORITIES = {
+    "interactive": 0,
+    "batch": 9,
+}
+TASK_QUEUES = {
+    "interactive": settings.celery_interactive_queue,
+    "batch": settings.celery_queue,
+}
@@ -15,12 +15,131 @@ class Settings(BaseSettings):
     
     # API Keys
     groq_api_key: str = ""
+    groq_api_keys: str = ""  # Comma-separated key pool (with groq_api_key); rate limits apply per key
+    groq_base_url: str = ""  # Override the Groq API endpoint (e.g. a local stand-in for load tests)
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./evals.db"
+    db_echo: bool = False  # Log every SQL statement (very noisy)
+    db_auto_migrate: bool = True  # Run alembic migrations to head on startup
+    
+    # Database: connection pool (Postgres / asyncpg)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    
+    # Database: SQLite pragmas applied on every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size: int = -65536  # Negative = KiB, i.e. 64 MiB
+    
+    # Build-time assets (python -m app.core.assets); nothing downloads at runtime
+    nltk_data_dir: str = "assets/nltk_data"
+    tiktoken_cache_dir: str = "assets/tiktoken"
+    tokenizer_dir: str = "assets/tokenizers"  # <family>/tokenizer.json
+    require_assets: bool = False  # Fail startup instead of warning when assets are missing
+    
+    # Loaded tokenizers: LRU size and threads for batch encoding
+    tokenizer_cache_size: int = 4
+    tokenizer_threads: int = 4
+    
+    # Playground: how often live TTFT / tokens-per-second events are sent per stream
+    playground_metrics_interval_seconds: float = 0.25
+    
+    # Playground recording: finished sessions saved for replay (also per request via `record`)
+    playground_recording_enabled: bool = False
+    recording_dir: str = "recordings"  # Blob store root for recorded token streams
+    
+    # Runtime stats: event-loop lag sampling interval (0 disables), read via /health/runtime
+    loop_monitor_interval_ms: float = 0.0
+    loop_block_threshold_ms: float = 100.0  # Capture the loop's stack when blocked this long (0 disables)
+    
+    # Profiling (opt-in): sampled requests / eval tasks write folded stacks for flamegraphs
+    profiling_enabled: bool = False  # Request middleware; also honours the X-Profile header
+    profile_sample_rate: int = 0  # Profile 1 in N requests (0: only requests with X-Profile)
+    profile_task_sample_rate: int = 0  # Profile 1 in N run_evaluation_task executions (0 disables)
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "profiles"
     
     # Redis / Celery
     redis_url: str = "redis://localhost:6379/0"
+    celery_queue: str = "evals"  # Batch runs
+    celery_interactive_queue: str = "evals-interactive"  # Interactive runs (see README: reserved workers)
+    celery_worker_concurrency: int = 4  # Processes per worker; each executes one run at a time
+    celery_interactive_concurrency: int = 4  # Processes of the workers reserved for interactive runs
+    
+    # Eval execution: "celery", "inprocess", or "auto" (Celery with in-process fallback)
+    job_backend: str = "auto"
+    job_runner_concurrency: int = 4  # Max runs executing at once in the API process
+    job_runner_interactive_concurrency: int = 4  # Extra run slots reserved for interactive runs
+    job_runner_shutdown_timeout: float = 10.0
+    
+    # Fair scheduling across runs: shared upstream streams and priority weights
+    upstream_concurrency: int = 16
+    scheduler_interactive_weight: float = 8.0
+    scheduler_batch_weight: float = 1.0
+    interactive_max_items: int = 100  # Runs up to this size default to interactive
+    
+    # Eval scheduling: upstream rate budgets per key and model, and throughput estimates
+    eval_tpm_limit: int = 6000
+    eval_rpm_limit: int = 30
+    eval_item_concurrency: int = 8  # Concurrent upstream streams per run
+    eval_default_output_tokens: int = 256  # Output estimate when no expected_output
+    eval_output_tokens_per_s: float = 250.0
+    eval_request_overhead_ms: float = 300.0
+    
+    # API key pool: how long keys returning auth / rate-limit errors leave the rotation
+    key_rate_limit_ejection_seconds: float = 30.0  # Without Retry-After; doubles per consecutive 429
+    key_auth_ejection_seconds: float = 600.0
+    key_max_ejection_seconds: float = 600.0
+    
+    # Batch execution mode: runs submitted as one offline provider batch job
+    batch_completion_window: str = "24h"  # Provider window; unfinished requests expire after it
+    batch_poll_interval_seconds: float = 30.0
+    batch_ingest_chunk: int = 500  # Output lines ingested (and progress committed) at a time
+    
+    # Expensive validators (batched onto a process pool after generation)
+    validator_batch_size: int = 64
+    validator_pool_workers: int = 2
+    
+    # Run cancellation: how often executing runs poll for a cancel request
+    cancel_poll_interval_seconds: float = 0.5
+    
+    # Archival: payloads of finished runs older than archive_after_days move to zstd chunks (0 disables)
+    archive_after_days: float = 30.0
+    archive_dir: str = "archive"  # Blob store root
+    archive_chunk_records: int = 2000  # Records per compressed chunk
+    archive_zstd_level: int = 9
+    archive_sweep_interval_seconds: float = 3600.0  # Periodic sweep in the API process (0 disables)
+    archive_sweep_batch_size: int = 50  # Runs archived per sweep query
+    
+    # Cached status payloads for polling clients (invalidated on writes in this process)
+    status_cache_ttl_seconds: float = 1.0  # Active runs and run listings
+    status_cache_final_ttl_seconds: float = 300.0  # Completed / failed runs
+    status_cache_max_entries: int = 10000
+    
+    @property
+    def async_database_url(self) -> str:
+        """Database URL with an async driver (plain Postgres URLs map to asyncpg)."""
+        url = self.database_url
+        for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix):]
+        return url
+    
+    @property
+    def groq_api_keys_list(self) -> list[str]:
+        """Pooled API keys: groq_api_key first, then groq_api_keys, without duplicates."""
+        keys = [self.groq_api_key, *self.groq_api_keys.split(",")]
+        return list(dict.fromkeys(key.strip() for key in keys if key.strip()))
+    
+    @property
+    def is_sqlite(self) -> bool:
+        """Whether the configured database is SQLite."""
+        return self.database_url.startswith("sqlite")
     
     # CORS
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
@@ -1,16 +1,68 @@
 """Database configuration and session management."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from .config import settings
 
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite performance profile to a new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def create_engine(url: str | None = None, **overrides) -> AsyncEngine:
+    """
+    Create an async engine using the configured database profile.
+
+    SQLite connections get WAL mode and tuned pragmas on connect; other
+    backends (Postgres via asyncpg) get a sized, pre-pinged connection pool.
+
+    Args:
+        url: Database URL (defaults to settings)
+        **overrides: Extra keyword arguments for `create_async_engine`
+
+    Returns:
+        Configured AsyncEngine
+    """
+    url = url or settings.async_database_url
+    kwargs: dict = {"echo": settings.db_echo}
+
+    if url.startswith("sqlite"):
+        # The driver-level timeout backs up busy_timeout for lock waits
+        kwargs["connect_args"] = {"timeout": settings.sqlite_busy_timeout_ms / 1000}
+    else:
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+    kwargs.update(overrides)
+
+    new_engine = create_async_engine(url, **kwargs)
+    if url.startswith("sqlite"):
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-)
+engine = create_engine()
 
 # Session factory
 async_session_factory = async_sessionmaker(
@@ -38,7 +90,28 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def _upgrade_to_head(connection) -> None:
+    """Run alembic migrations to head on an existing sync connection."""
+    from alembic import command
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import inspect
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+
+    # Databases created by the old create_all() bootstrap have tables but no
+    # version row: mark them as the baseline revision before upgrading.
+    current = MigrationContext.configure(connection).get_current_revision()
+    if current is None and inspect(connection).has_table("eval_runs"):
+        command.stamp(config, "0001_baseline")
+
+    command.upgrade(config, "head")
+
+
 async def init_db() -> None:
-    """Initialize database tables."""
+    """Bring the database schema up to date via alembic migrations."""
+    if not settings.db_auto_migrate:
+        return
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_to_head)
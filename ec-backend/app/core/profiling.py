@@ -0,0 +1,138 @@
+"""Opt-in sampling profiler for requests and eval tasks.
+
+A sampler thread snapshots one thread's Python stack every
+`profile_interval_ms` (via `sys._current_frames`) and counts identical
+stacks. Profiles are written in the folded format (one `outer;...;inner
+count` line per stack) that flamegraph.pl, inferno and speedscope render
+directly.
+
+Requests are sampled on the event-loop thread, so a request's profile
+shows everything the loop ran while that request was in flight, not only
+its own coroutine. That is what makes it useful under load: sync work in
+any handler shows up as the loop's hot path. Samples land in
+`settings.profile_dir`; file names are returned in the X-Profile response
+header.
+"""
+
+import asyncio
+import itertools
+import os
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+from typing import List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+# Request header that asks for a profile (only honoured when profiling is enabled)
+PROFILE_HEADER = b"x-profile"
+
+_SITE_PACKAGES = re.compile(r".*[/\\](site|dist)-packages[/\\]")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = _SITE_PACKAGES.sub("", code.co_filename)
+    if path.startswith(os.getcwd()):
+        path = os.path.relpath(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def stack_labels(frame: Optional[FrameType]) -> List[str]:
+    """Frame labels from outermost to innermost."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[";".join(stack_labels(frame))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Stop sampling; returns stack -> sample count."""
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def write_profile(stacks: Counter, name: str) -> str:
+    """Write folded stacks to `profile_dir/<name>.folded` (empty when nothing was sampled); returns the path."""
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    path = os.path.join(settings.profile_dir, f"{name}.folded")
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    logger.info(f"Wrote profile {path} ({sum(stacks.values())} samples)")
+    return path
+
+
+def profile_name(*parts: str) -> str:
+    """Timestamped, filesystem-safe profile name."""
+    slug = "-".join(re.sub(r"[^A-Za-z0-9]+", "_", part).strip("_") for part in parts if part)
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{slug}-{uuid.uuid4().hex[:8]}"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles 1 in `profile_sample_rate` requests, and any request with an
+    X-Profile header. Pure ASGI, so streaming responses are profiled until
+    their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.counter = itertools.count(1)
+
+    def _selected(self, scope) -> bool:
+        if any(name == PROFILE_HEADER for name, _ in scope.get("headers", [])):
+            return True
+        rate = settings.profile_sample_rate
+        return rate > 0 and next(self.counter) % rate == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = profile_name(scope["method"], scope["path"])
+        sampler = StackSampler(threading.get_ident(), settings.profile_interval_ms / 1000).start()
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile", f"{name}.folded".encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            # Joining the sampler and writing the file stay off the loop
+            stacks = await asyncio.to_thread(sampler.stop)
+            await asyncio.to_thread(write_profile, stacks, name)
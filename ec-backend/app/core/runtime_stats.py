@@ -0,0 +1,142 @@
+"""Process runtime stats: event-loop lag, blocked-loop detection and resident memory.
+
+The lag monitor is a task that sleeps for a fixed interval and records how
+late it wakes up: anything that blocks the loop (sync CPU work in a
+handler, a slow callback) shows up as lag for every coroutine in the
+process. Enabled with LOOP_MONITOR_INTERVAL_MS > 0; samples accumulate
+until read (and optionally reset) through `/health/runtime`.
+
+While the monitor runs, a watchdog thread checks its heartbeat. When the
+loop hasn't woken it for LOOP_BLOCK_THRESHOLD_MS, the watchdog captures
+the loop thread's stack *while it is still blocked*, so the report names
+the offending call (e.g. a sync tokenizer or NLTK call in a handler)
+rather than just the delay.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.profiling import stack_labels
+
+
+# Innermost frames kept per blocked-loop report
+BLOCK_STACK_DEPTH = 12
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag (wake-up delay of a periodic sleep) and reports blocked-loop stacks."""
+
+    def __init__(self, interval_ms: float, block_threshold_ms: float = 0.0):
+        self.interval = interval_ms / 1000
+        self.block_threshold = block_threshold_ms / 1000
+        self.samples: List[float] = []
+        self.blocks: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self.task: Optional[asyncio.Task] = None
+        self.heartbeat = 0.0
+        self.loop_thread_id: Optional[int] = None
+        self._reported_heartbeat: Optional[float] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            if self._reported_heartbeat == self.heartbeat and self.blocks:
+                # The block the watchdog reported just ended: record its full length
+                self.blocks[-1]["blocked_ms"] = round(lag * 1000, 1)
+            self.heartbeat = now
+            self.samples.append(lag)
+            # Bounded even if nobody reads the stats (~1 day at 100ms)
+            if len(self.samples) > 1_000_000:
+                del self.samples[:500_000]
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.block_threshold / 2):
+            stalled = time.perf_counter() - self.heartbeat - self.interval
+            if stalled < self.block_threshold or self._reported_heartbeat == self.heartbeat:
+                continue
+            self._reported_heartbeat = self.heartbeat
+            stack = stack_labels(sys._current_frames().get(self.loop_thread_id))[-BLOCK_STACK_DEPTH:]
+            self.blocks.append({
+                "at": datetime.utcnow().isoformat(),
+                "blocked_ms": round(stalled * 1000, 1),  # Updated to the full length once the loop wakes
+                "stack": stack,
+            })
+            logger.warning(
+                f"Event loop blocked for >{stalled * 1000:.0f}ms in: " + " <- ".join(reversed(stack[-4:]))
+            )
+
+    def start(self) -> None:
+        """Start sampling on the running loop (no-op when disabled)."""
+        if not self.enabled or self.task is not None:
+            return
+        self.heartbeat = time.perf_counter()
+        self.loop_thread_id = threading.get_ident()
+        self.task = asyncio.create_task(self._sample())
+        if self.block_threshold > 0:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(
+            f"Event-loop lag monitor started (interval={self.interval * 1000:.0f}ms, "
+            f"block threshold={self.block_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def snapshot(self, reset: bool = False) -> Optional[Dict[str, Any]]:
+        """Lag percentiles (ms) and blocked-loop reports since the last reset; None when disabled."""
+        if not self.enabled:
+            return None
+        samples = sorted(self.samples)
+        blocks = list(self.blocks)
+        if reset:
+            self.samples = []
+            self.blocks.clear()
+        if not samples:
+            return {"samples": 0, "mean_ms": None, "p50_ms": None, "p99_ms": None, "max_ms": None, "blocks": blocks}
+
+        def percentile(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+
+        return {
+            "samples": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1] * 1000, 2),
+            "blocks": blocks,
+        }
+
+
+loop_monitor = LoopLagMonitor(settings.loop_monitor_interval_ms, settings.loop_block_threshold_ms)
@@ -0,0 +1,179 @@
+"""Per-process async runtime for Celery workers.
+
+Each worker process owns one long-lived event loop (running in a dedicated
+thread), one DB engine and one LLM client. They are created at
+`worker_process_init` and torn down at shutdown, so tasks run as coroutines
+on the same loop instead of paying for `asyncio.run()` and reconnecting.
+
+The loop is covered by the event-loop lag monitor when it is enabled, and
+1 in PROFILE_TASK_SAMPLE_RATE eval task executions is profiled (sampling
+the loop thread, where the task's coroutine runs).
+"""
+
+import asyncio
+import itertools
+import threading
+from typing import Any, Coroutine, Dict, TypeVar
+
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from . import database
+from .assets import check_assets
+from .config import settings
+from .profiling import StackSampler, profile_name, write_profile
+from .runtime_stats import loop_monitor
+
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """Event loop, DB engine and LLM client shared by all tasks in a worker process."""
+
+    def __init__(self):
+        """Start the loop thread and create process-local resources."""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name="eval-worker-loop",
+            daemon=True,
+        )
+        self._thread.start()
+
+        self.engine = database.create_engine()
+        self.session_factory = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        self.llm_client = self._create_llm_client()
+        # Lag / blocked-loop monitoring of the task loop (when enabled)
+        self.loop.call_soon_threadsafe(loop_monitor.start)
+
+    @property
+    def thread_id(self) -> int | None:
+        """Ident of the thread running the loop (where tasks execute)."""
+        return self._thread.ident
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @staticmethod
+    def _create_llm_client():
+        """Create the shared LLM client, or None if it isn't configured yet."""
+        from app.modules.common.llm_client import GroqLLMClient
+
+        try:
+            return GroqLLMClient()
+        except ValueError as e:
+            # Tasks create their own client and fail the run with this error
+            logger.warning(f"LLM client not configured for worker: {e}")
+            return None
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the worker loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def shutdown(self) -> None:
+        """Dispose of the engine and client, then stop and close the loop."""
+        try:
+            self.run(self._aclose())
+        except Exception as e:
+            logger.warning(f"Error while closing worker resources: {e}")
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self.loop.close()
+
+    async def _aclose(self) -> None:
+        await loop_monitor.stop()
+        if self.llm_client is not None:
+            await self.llm_client.aclose()
+        await self.engine.dispose()
+        await self.loop.shutdown_asyncgens()
+
+
+_runtime: WorkerRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_worker_runtime() -> WorkerRuntime:
+    """
+    Get this process's worker runtime, creating it on first use.
+
+    Prefork workers create it at `worker_process_init`; lazy creation covers
+    the solo/threads pools and eager task execution.
+    """
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = WorkerRuntime()
+    return _runtime
+
+
+@worker_init.connect
+def init_worker(**kwargs) -> None:
+    """Check build-time assets once, in the worker's main process."""
+    check_assets()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs) -> None:
+    """Create the runtime in a freshly forked worker process."""
+    # Drop pooled connections inherited from the parent without closing them
+    database.engine.sync_engine.dispose(close=False)
+    get_worker_runtime()
+    logger.info("Worker process runtime initialized")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_process(**kwargs) -> None:
+    """Tear down the runtime when the worker process exits."""
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.shutdown()
+        logger.info("Worker process runtime shut down")
+
+    from app.modules.evals.validators import shutdown_validation_pool
+    shutdown_validation_pool()
+
+
+# Profiled task executions in this process: task id -> sampler
+_task_samplers: Dict[str, StackSampler] = {}
+_task_counter = itertools.count(1)
+
+
+@task_prerun.connect
+def start_task_profile(task_id: str = None, task=None, **kwargs) -> None:
+    """Profile 1 in `profile_task_sample_rate` eval task executions."""
+    rate = settings.profile_task_sample_rate
+    if rate <= 0 or not task.name.endswith("run_evaluation_task") or next(_task_counter) % rate:
+        return
+    # The task body only waits; its coroutine runs on the runtime's loop thread
+    _task_samplers[task_id] = StackSampler(
+        get_worker_runtime().thread_id, settings.profile_interval_ms / 1000
+    ).start()
+
+
+@task_postrun.connect
+def stop_task_profile(task_id: str = None, task=None, args=None, **kwargs) -> None:
+    """Write the profile of a sampled task execution."""
+    sampler = _task_samplers.pop(task_id, None)
+    if sampler is None:
+        return
+    run_id = args[0] if args else ""
+    write_profile(sampler.stop(), profile_name("task", "run_evaluation", run_id))
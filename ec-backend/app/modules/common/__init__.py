@@ -1,5 +1,16 @@
 # app/modules/common/__init__.py
 from .llm_client import GroqLLMClient
 from .math_utils import calculate_entropy, calculate_perplexity, calculate_burstiness
+from .stats import RunningStats, RunMetrics, beta_interval, wilson_interval, z_score
 
-__all__ = ["GroqLLMClient", "calculate_entropy", "calculate_perplexity", "calculate_burstiness"]
+__all__ = [
+    "GroqLLMClient",
+    "calculate_entropy",
+    "calculate_perplexity",
+    "calculate_burstiness",
+    "RunningStats",
+    "RunMetrics",
+    "wilson_interval",
+    "beta_interval",
+    "z_score",
+]
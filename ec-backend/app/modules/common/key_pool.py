@@ -0,0 +1,336 @@
+"""Pool of provider API keys with per-key rate budgets and health state.
+
+Each key has its own TPM/RPM token buckets per model (EVAL_TPM_LIMIT /
+EVAL_RPM_LIMIT apply per key), so provisioning more keys multiplies the
+throughput eval runs can use. Requests go to the healthy key with the
+most headroom. A key answering 429 is ejected for its Retry-After (or an
+exponential backoff); a key answering 401/403 is ejected for
+`key_auth_ejection_seconds`. Per-key usage is reported through
+`/health/keys`.
+
+Two ways to take a key:
+
+- `acquire` waits (FIFO per model, so scheduled eval order is kept and
+  one model running out of budget never holds up another) until some key
+  has budget for the reservation; eval items use it.
+- `route` never waits: it picks the best key and charges it, possibly
+  into debt that later acquisitions wait out. The playground uses it, so
+  interactive requests don't queue behind batch runs.
+
+State is per process: the API and each Celery worker keep their own pool.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+SECONDS_PER_WINDOW = 60.0
+
+
+class KeyPoolExhausted(RuntimeError):
+    """Every key in the pool was rejected by the provider (auth errors)."""
+
+
+class TokenBucket:
+    """Continuously refilling bucket sized to a per-minute limit."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / SECONDS_PER_WINDOW
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (capped at capacity) is available."""
+        self.refill()
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+
+class RateBudget:
+    """
+    Joint TPM/RPM budget for one key and model.
+
+    Token reservations use estimates; `settle` corrects them afterwards.
+    """
+
+    def __init__(self, tpm: int, rpm: int):
+        self.tokens = TokenBucket(tpm)
+        self.requests = TokenBucket(rpm)
+
+    def wait_time(self, tokens: int) -> float:
+        """Seconds until one request and `tokens` tokens fit."""
+        return max(self.tokens.wait_time(tokens), self.requests.wait_time(1))
+
+    def headroom(self) -> float:
+        """Fraction of the tighter of the two budgets currently available."""
+        self.tokens.refill()
+        self.requests.refill()
+        return min(self.tokens.level / self.tokens.capacity, self.requests.level / self.requests.capacity)
+
+    def take(self, tokens: int) -> None:
+        """Charge one request and `tokens` tokens (levels may go negative)."""
+        self.tokens.level -= min(tokens, self.tokens.capacity)
+        self.requests.level -= 1
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct a reservation once actual token usage is known."""
+        self.tokens.refill()
+        self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+
+
+class EjectReason:
+    """Why a key was taken out of rotation."""
+    AUTH = "auth"
+    RATE_LIMIT = "rate_limit"
+
+
+@dataclass
+class KeyUsage:
+    """Counters for one key since process start."""
+    requests: int = 0
+    tokens: int = 0  # Settled (actual) tokens
+    in_flight: int = 0
+    ejections: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+
+class PooledKey:
+    """One API key: per-model budgets, health and usage."""
+
+    def __init__(self, index: int, api_key: str, tpm: int, rpm: int):
+        self.index = index
+        self.api_key = api_key
+        self.tpm = tpm
+        self.rpm = rpm
+        self.budgets: Dict[str, RateBudget] = {}
+        self.usage = KeyUsage()
+        self.ejected_until = 0.0
+        self.eject_reason: Optional[str] = None
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """Identifies the key in logs and metrics without revealing it."""
+        return f"key-{self.index} (...{self.api_key[-4:]})"
+
+    def budget(self, model: str) -> RateBudget:
+        budget = self.budgets.get(model)
+        if budget is None:
+            budget = self.budgets[model] = RateBudget(self.tpm, self.rpm)
+        return budget
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        ejected = not self.available(now)
+        return {
+            "key": self.label,
+            "state": "ejected" if ejected else "healthy",
+            "eject_reason": self.eject_reason if ejected else None,
+            "ejected_for_s": round(self.ejected_until - now, 1) if ejected else None,
+            "last_error": self.last_error,
+            "requests": self.usage.requests,
+            "tokens": self.usage.tokens,
+            "in_flight": self.usage.in_flight,
+            "ejections": self.usage.ejections,
+            "errors": dict(self.usage.errors),
+            "headroom": {model: round(budget.headroom(), 3) for model, budget in self.budgets.items()},
+        }
+
+
+@dataclass
+class KeyLease:
+    """A request's claim on a key: the model and the tokens reserved against it."""
+    key: PooledKey
+    model: str
+    tokens: int
+    settled: bool = False
+
+    @property
+    def api_key(self) -> str:
+        return self.key.api_key
+
+
+class KeyPool:
+    """Routes requests across API keys by rate-budget headroom and health."""
+
+    def __init__(self, api_keys: List[str], tpm: int, rpm: int):
+        self.keys = [PooledKey(i, api_key, tpm, rpm) for i, api_key in enumerate(api_keys)]
+        # Waiters queue per model; budget checks and charges never await, so they need no lock
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _live(self, now: float) -> List[PooledKey]:
+        live = [key for key in self.keys if key.available(now)]
+        if live or not self.keys:
+            return live
+        if all(key.eject_reason == EjectReason.AUTH for key in self.keys):
+            raise KeyPoolExhausted(f"All {len(self.keys)} API keys were rejected: {self.keys[0].last_error}")
+        return []
+
+    def _lease(self, key: PooledKey, model: str, tokens: int) -> KeyLease:
+        key.budget(model).take(tokens)
+        key.usage.requests += 1
+        key.usage.in_flight += 1
+        return KeyLease(key, model, tokens)
+
+    async def acquire(self, model: str, tokens: int) -> KeyLease:
+        """
+        Wait until a healthy key has budget for one request and `tokens`, then reserve it there.
+
+        Among keys that fit now, the one with the most headroom wins.
+        Acquisitions for the same model are served in FIFO order.
+
+        Raises:
+            KeyPoolExhausted: If every key is ejected for auth errors
+        """
+        if not self.keys:
+            raise KeyPoolExhausted("No API keys configured (set GROQ_API_KEY or GROQ_API_KEYS)")
+        lock = self._locks.get(model)
+        if lock is None:
+            lock = self._locks[model] = asyncio.Lock()
+        async with lock:
+            while True:
+                now = time.monotonic()
+                live = self._live(now)
+                if not live:
+                    await asyncio.sleep(min(key.ejected_until for key in self.keys) - now)
+                    continue
+                waits = {key.index: key.budget(model).wait_time(tokens) for key in live}
+                ready = [key for key in live if waits[key.index] <= 0]
+                if ready:
+                    best = max(ready, key=lambda key: key.budget(model).headroom())
+                    return self._lease(best, model, tokens)
+                # Wake when the first key fits, or an ejected key comes back
+                wake = min(waits.values())
+                ejected = [key.ejected_until - now for key in self.keys if not key.available(now)]
+                await asyncio.sleep(min([wake, *ejected]))
+
+    def route(self, model: str, tokens: int) -> KeyLease:
+        """
+        Pick the healthy key with the most headroom without waiting, and charge it.
+
+        When every key is rate-limited, the one returning first is used.
+
+        Raises:
+            KeyPoolExhausted: If no keys are configured or all were rejected
+        """
+        if not self.keys:
+            raise KeyPoolExhausted("No API keys configured (set GROQ_API_KEY or GROQ_API_KEYS)")
+        now = time.monotonic()
+        live = self._live(now)
+        if live:
+            best = max(live, key=lambda key: key.budget(model).headroom())
+        else:
+            best = min(self.keys, key=lambda key: key.ejected_until)
+        return self._lease(best, model, tokens)
+
+    def pick(self) -> PooledKey:
+        """
+        A healthy key for calls outside the rate budgets (e.g. batch jobs).
+
+        Raises:
+            KeyPoolExhausted: If no keys are configured or all were rejected
+        """
+        if not self.keys:
+            raise KeyPoolExhausted("No API keys configured (set GROQ_API_KEY or GROQ_API_KEYS)")
+        now = time.monotonic()
+        return (self._live(now) or sorted(self.keys, key=lambda key: key.ejected_until))[0]
+
+    def find(self, label: str) -> Optional[PooledKey]:
+        """The pooled key with this label, if still configured."""
+        return next((key for key in self.keys if key.label == label), None)
+
+    async def reroute(self, lease: KeyLease, wait: bool = True) -> KeyLease:
+        """
+        Move a lease whose key was just ejected to another key.
+
+        The failed key gets its tokens back (the request still counts);
+        the same lease object then points at the new key, taken with
+        `acquire` or, when not `wait`, with `route`.
+        """
+        old = lease.key
+        old.budget(lease.model).settle(lease.tokens, 0)
+        old.usage.in_flight -= 1
+        if wait:
+            replacement = await self.acquire(lease.model, lease.tokens)
+        else:
+            replacement = self.route(lease.model, lease.tokens)
+        lease.key = replacement.key
+        return lease
+
+    def settle(self, lease: KeyLease, actual_tokens: int) -> None:
+        """Release a lease, correcting its reservation to the tokens actually used."""
+        if lease.settled:
+            return
+        lease.settled = True
+        lease.key.budget(lease.model).settle(lease.tokens, actual_tokens)
+        lease.key.usage.tokens += actual_tokens
+        lease.key.usage.in_flight -= 1
+
+    def report_success(self, lease: KeyLease) -> None:
+        lease.key.consecutive_failures = 0
+
+    def report_error(self, lease: KeyLease, status_code: Optional[int], retry_after: Optional[float], message: str) -> bool:
+        """
+        Record a failed request; ejects the key on auth (401/403) or rate-limit (429) errors.
+
+        Returns:
+            True if the key was ejected (the request may be retried on another key)
+        """
+        key = lease.key
+        kind = {401: "auth", 403: "auth", 429: "rate_limit"}.get(status_code, "other")
+        key.usage.errors[kind] = key.usage.errors.get(kind, 0) + 1
+        key.last_error = message[:200]
+        if kind == "other":
+            return False
+
+        key.consecutive_failures += 1
+        if kind == "auth":
+            duration, reason = settings.key_auth_ejection_seconds, EjectReason.AUTH
+        else:
+            backoff = settings.key_rate_limit_ejection_seconds * 2 ** (key.consecutive_failures - 1)
+            duration = retry_after if retry_after is not None else backoff
+            reason = EjectReason.RATE_LIMIT
+            # The provider says this key is out of budget for the model
+            budget = key.budget(lease.model)
+            budget.tokens.level = min(budget.tokens.level, 0.0)
+        duration = min(duration, settings.key_max_ejection_seconds)
+        now = time.monotonic()
+        if key.available(now):
+            # Requests already in flight when the key was ejected don't count again
+            key.usage.ejections += 1
+            logger.warning(f"Ejected API {key.label} for {duration:.0f}s after HTTP {status_code}")
+        key.ejected_until = max(key.ejected_until, now + duration)
+        key.eject_reason = reason
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-key health and usage."""
+        now = time.monotonic()
+        keys = [key.snapshot(now) for key in self.keys]
+        return {
+            "keys": keys,
+            "healthy": sum(key["state"] == "healthy" for key in keys),
+            "tpm_limit_per_key": settings.eval_tpm_limit,
+            "rpm_limit_per_key": settings.eval_rpm_limit,
+        }
+
+
+key_pool = KeyPool(settings.groq_api_keys_list, settings.eval_tpm_limit, settings.eval_rpm_limit)
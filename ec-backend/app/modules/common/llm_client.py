@@ -1,14 +1,16 @@
 """Groq LLM Client with streaming support and logprobs extraction."""
 
 import json
-from typing import AsyncGenerator
+import math
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Tuple
 from dataclasses import dataclass
 
-from groq import Groq, AsyncGroq
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from loguru import logger
 
 from app.core.config import settings
+from .key_pool import KeyLease, KeyPool, KeyPoolExhausted, key_pool
 from .math_utils import calculate_token_entropy
 
 
@@ -19,6 +21,7 @@ class TokenData:
     text: str
     logprob: float
     entropy: float
+    top_logprobs: List[Tuple[str, float]] | None = None  # Top-k alternatives (token, logprob)
 
 
 @dataclass
@@ -29,6 +32,13 @@ class StreamChunk:
     error: str | None = None
 
 
+# Logprob assumed per token when the model returns none (simulated medium confidence)
+FALLBACK_LOGPROB = -0.1
+
+# Extra attempts for budgeted requests after every key has been tried: they wait
+# out Retry-After in `KeyPool.acquire`, so a retry usually lands
+RATE_LIMIT_RETRIES = 3
+
 # Models known to NOT support logprobs (updated as we discover them)
 MODELS_WITHOUT_LOGPROBS = {
     "llama-3.1-8b-instant",
@@ -37,17 +47,53 @@ MODELS_WITHOUT_LOGPROBS = {
 }
 
 
+def _retry_after(error: Exception) -> float | None:
+    """Retry-After seconds from a provider error response, if present."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
 class GroqLLMClient:
     """Client for Groq API with streaming and logprobs support."""
     
-    def __init__(self, api_key: str | None = None):
-        """Initialize the Groq client."""
-        self.api_key = api_key or settings.groq_api_key
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY is required. Set it in .env file.")
+    def __init__(self, api_key: str | None = None, pool: KeyPool | None = None):
+        """
+        Initialize the Groq client.
         
-        self.client = Groq(api_key=self.api_key)
-        self.async_client = AsyncGroq(api_key=self.api_key)
+        Args:
+            api_key: Use only this key (default: route across the configured key pool)
+            pool: Key pool to route requests through (default: the process-wide pool)
+        """
+        self.pool = pool or (KeyPool([api_key], settings.eval_tpm_limit, settings.eval_rpm_limit) if api_key else key_pool)
+        if not len(self.pool):
+            raise ValueError("GROQ_API_KEY is required. Set it in .env file.")
+        self.api_key = self.pool.keys[0].api_key
+        self._async_clients: Dict[str, object] = {}
+    
+    def _client_for(self, api_key: str):
+        """SDK client for one pooled key, created on first use."""
+        client = self._async_clients.get(api_key)
+        if client is None:
+            # Imported on first use: the SDK is slow to import and not needed at startup
+            from groq import AsyncGroq
+            
+            # With several keys, a 429 fails over to another key instead of retrying this one
+            client = self._async_clients[api_key] = AsyncGroq(
+                api_key=api_key,
+                base_url=settings.groq_base_url or None,
+                max_retries=2 if len(self.pool) == 1 else 0,
+            )
+        return client
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pools."""
+        for client in self._async_clients.values():
+            await client.close()
+        self._async_clients = {}
     
     async def stream_chat_completion(
         self,
@@ -57,10 +103,17 @@ class GroqLLMClient:
         temperature: float = 0.7,
         max_tokens: int = 1024,
         top_p: float = 1.0,
+        lease: KeyLease | None = None,
     ) -> AsyncGenerator[StreamChunk, None]:
         """
         Stream chat completion with logprobs when supported.
         
+        Requests go out on a pooled API key. Callers that reserve rate
+        budget pass their `lease` (and settle it themselves); otherwise the
+        key with the most headroom is picked without waiting and settled
+        here. Auth or rate-limit errors before the first token eject the
+        key and retry on another one.
+        
         Args:
             system_prompt: System message
             user_prompt: User message
@@ -68,10 +121,90 @@ class GroqLLMClient:
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
             top_p: Top-p sampling parameter
+            lease: Key lease from `KeyPool.acquire` (settled by the caller)
             
         Yields:
             StreamChunk with token data or completion signal
         """
+        owned = lease is None
+        if owned:
+            # Rough reservation: ~4 chars per prompt token plus the generation limit
+            prompt_tokens = math.ceil((len(system_prompt) + len(user_prompt)) / 4)
+            try:
+                lease = self.pool.route(model, prompt_tokens + max_tokens)
+            except KeyPoolExhausted as e:
+                yield StreamChunk(error=str(e))
+                return
+        
+        generated = 0
+        try:
+            # Closing this generator early closes the upstream stream, through both layers
+            chunks = self._stream_with_failover(
+                system_prompt, user_prompt, model, temperature, max_tokens, top_p, lease, wait=not owned
+            )
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if chunk.token:
+                        generated += 1
+                    yield chunk
+        finally:
+            if owned:
+                self.pool.settle(lease, prompt_tokens + generated)
+    
+    async def _stream_with_failover(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        top_p: float,
+        lease: KeyLease,
+        wait: bool,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Stream on the lease's key, moving the lease to another key when this one is ejected.
+        
+        `wait` reroutes through `KeyPool.acquire` (budgeted callers) rather than `route`.
+        """
+        attempts = len(self.pool) + (RATE_LIMIT_RETRIES if wait else 0)
+        for attempt in range(attempts):
+            started = False
+            chunks = self._stream_once(system_prompt, user_prompt, model, temperature, max_tokens, top_p, lease)
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if not isinstance(chunk, Exception):
+                        started = started or chunk.token is not None
+                        yield chunk
+                        continue
+                    
+                    status_code = getattr(chunk, "status_code", None)
+                    ejected = self.pool.report_error(lease, status_code, _retry_after(chunk), str(chunk))
+                    if not ejected or started or attempt + 1 == attempts:
+                        yield StreamChunk(error=str(chunk))
+                        return
+                    try:
+                        await self.pool.reroute(lease, wait)
+                    except KeyPoolExhausted as e:
+                        yield StreamChunk(error=str(e))
+                        return
+                    logger.info(f"Retrying on API {lease.key.label} after HTTP {status_code}")
+                    break
+                else:
+                    self.pool.report_success(lease)
+                    return
+    
+    async def _stream_once(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        top_p: float,
+        lease: KeyLease,
+    ) -> AsyncGenerator[StreamChunk | Exception, None]:
+        """One upstream request on the lease's key; a failure is yielded as the exception."""
         # Check if model supports logprobs
         supports_logprobs = model not in MODELS_WITHOUT_LOGPROBS
         
@@ -98,48 +231,55 @@ class GroqLLMClient:
                 request_params["logprobs"] = True
                 request_params["top_logprobs"] = 5
             
-            stream = await self.async_client.chat.completions.create(**request_params)
+            stream = await self._client_for(lease.api_key).chat.completions.create(**request_params)
             
             token_id = 0
-            async for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    choice = chunk.choices[0]
-                    delta = choice.delta
-                    
-                    if delta and delta.content:
-                        text = delta.content
-                        
-                        # Extract logprob from the chunk (if available)
-                        logprob = -0.1  # Default fallback (simulated medium confidence)
-                        top_logprobs = None
+            try:
+                async for chunk in stream:
+                    if chunk.choices and len(chunk.choices) > 0:
+                        choice = chunk.choices[0]
+                        delta = choice.delta
                         
-                        if supports_logprobs and hasattr(choice, 'logprobs') and choice.logprobs:
-                            content_logprobs = choice.logprobs.content
-                            if content_logprobs and len(content_logprobs) > 0:
-                                token_logprob = content_logprobs[0]
-                                logprob = token_logprob.logprob
-                                
-                                # Get top logprobs for entropy calculation
-                                if hasattr(token_logprob, 'top_logprobs') and token_logprob.top_logprobs:
-                                    top_logprobs = [tlp.logprob for tlp in token_logprob.top_logprobs]
+                        if delta and delta.content:
+                            text = delta.content
+                            
+                            # Extract logprob from the chunk (if available)
+                            logprob = FALLBACK_LOGPROB
+                            top_logprobs = None
+                            alternatives = None
+                            
+                            if supports_logprobs and hasattr(choice, 'logprobs') and choice.logprobs:
+                                content_logprobs = choice.logprobs.content
+                                if content_logprobs and len(content_logprobs) > 0:
+                                    token_logprob = content_logprobs[0]
+                                    logprob = token_logprob.logprob
+                                    
+                                    # Get top logprobs for entropy calculation
+                                    if hasattr(token_logprob, 'top_logprobs') and token_logprob.top_logprobs:
+                                        top_logprobs = [tlp.logprob for tlp in token_logprob.top_logprobs]
+                                        alternatives = [(tlp.token, tlp.logprob) for tlp in token_logprob.top_logprobs]
+                            
+                            # Calculate entropy
+                            entropy = calculate_token_entropy(logprob, top_logprobs)
+                            
+                            token_data = TokenData(
+                                id=token_id,
+                                text=text,
+                                logprob=logprob,
+                                entropy=entropy,
+                                top_logprobs=alternatives,
+                            )
+                            
+                            token_id += 1
+                            yield StreamChunk(token=token_data)
                         
-                        # Calculate entropy
-                        entropy = calculate_token_entropy(logprob, top_logprobs)
-                        
-                        token_data = TokenData(
-                            id=token_id,
-                            text=text,
-                            logprob=logprob,
-                            entropy=entropy,
-                        )
-                        
-                        token_id += 1
-                        yield StreamChunk(token=token_data)
-                    
-                    # Check for finish reason
-                    if choice.finish_reason:
-                        yield StreamChunk(done=True)
-                        break
+                        # Check for finish reason
+                        if choice.finish_reason:
+                            yield StreamChunk(done=True)
+                            break
+            finally:
+                # Closing early (consumer stopped reading) cancels the upstream generation
+                await stream.close()
             
             logger.debug(f"Stream completed, {token_id} tokens generated")
             
@@ -151,19 +291,84 @@ class GroqLLMClient:
                 logger.warning(f"Model {model} doesn't support logprobs, retrying without")
                 MODELS_WITHOUT_LOGPROBS.add(model)  # Remember for next time
                 
-                async for chunk in self.stream_chat_completion(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=top_p,
+                async for chunk in self._stream_once(
+                    system_prompt, user_prompt, model, temperature, max_tokens, top_p, lease
                 ):
                     yield chunk
                 return
             
-            logger.error(f"Stream error: {e}")
-            yield StreamChunk(error=error_msg)
+            logger.error(f"Stream error on API {lease.key.label}: {e}")
+            yield e
+    
+    def batch_request_body(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        top_p: float = 1.0,
+    ) -> Dict[str, Any]:
+        """Non-streaming chat completion body for one line of a batch file."""
+        body = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+        }
+        if self.model_supports_logprobs(model):
+            body["logprobs"] = True
+        return body
+    
+    async def create_batch(
+        self,
+        api_key: str,
+        requests: bytes,
+        completion_window: str,
+        metadata: Dict[str, str] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a JSONL file of chat completion requests and start a batch job over it.
+        
+        Batch jobs run offline and don't draw on the key's online rate
+        budgets, so they bypass the pool's routing; the caller picks the key.
+        
+        Args:
+            api_key: Key that owns the job (its files and results)
+            requests: JSONL batch input, one request per line
+            completion_window: Provider window, e.g. "24h"
+            metadata: Labels stored with the job
+            
+        Returns:
+            The provider's batch object
+        """
+        client = self._client_for(api_key)
+        upload = await client.files.create(file=("batch.jsonl", requests), purpose="batch")
+        batch = await client.batches.create(
+            completion_window=completion_window,
+            endpoint="/v1/chat/completions",
+            input_file_id=upload.id,
+            metadata=metadata,
+        )
+        logger.info(f"Created batch {batch.id} ({len(requests)} bytes) on API key ...{api_key[-4:]}")
+        return batch.model_dump()
+    
+    async def get_batch(self, api_key: str, batch_id: str) -> Dict[str, Any]:
+        """Current state of a batch job."""
+        return (await self._client_for(api_key).batches.retrieve(batch_id)).model_dump()
+    
+    async def cancel_batch(self, api_key: str, batch_id: str) -> Dict[str, Any]:
+        """Ask the provider to stop a batch job (finished requests stay in its output file)."""
+        return (await self._client_for(api_key).batches.cancel(batch_id)).model_dump()
+    
+    async def download_file(self, api_key: str, file_id: str) -> bytes:
+        """Content of a provider file, e.g. a batch job's output."""
+        response = await self._client_for(api_key).files.content(file_id)
+        return await response.read()
     
     def get_available_models(self) -> list[str]:
         """Get list of available Groq models."""
@@ -1,8 +1,16 @@
 """Mathematical utilities for LLM analysis metrics."""
 
 import math
+import re
+import statistics
 from typing import List
-import numpy as np
+
+from loguru import logger
+
+
+# Used when the NLTK punkt models haven't been prepared (see app.core.assets)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_punkt_available: bool | None = None
 
 
 def calculate_entropy(logprobs: List[float]) -> float:
@@ -58,12 +66,35 @@ def calculate_perplexity(logprobs: List[float]) -> float:
     if not logprobs:
         return 1.0
     
-    mean_logprob = np.mean(logprobs)
+    mean_logprob = math.fsum(logprobs) / len(logprobs)
     perplexity = math.exp(-mean_logprob)
     
     return perplexity
 
 
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences with NLTK punkt.
+    
+    The punkt models are prepared at build time and never downloaded here;
+    without them this falls back to splitting on sentence-ending punctuation.
+    """
+    global _punkt_available
+    import nltk
+    
+    if _punkt_available is None:
+        try:
+            nltk.data.find("tokenizers/punkt_tab")
+            _punkt_available = True
+        except LookupError:
+            _punkt_available = False
+            logger.warning("NLTK punkt data missing (run `python -m app.core.assets`); using a regex sentence splitter")
+    
+    if _punkt_available:
+        return nltk.sent_tokenize(text)
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
 def calculate_burstiness(text: str) -> float:
     """
     Calculate burstiness (coefficient of variation of sentence lengths).
@@ -80,19 +111,8 @@ def calculate_burstiness(text: str) -> float:
     Returns:
         Burstiness coefficient (>= 0)
     """
-    import nltk
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt', quiet=True)
-    
-    try:
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        nltk.download('punkt_tab', quiet=True)
-    
     # Tokenize into sentences
-    sentences = nltk.sent_tokenize(text)
+    sentences = split_sentences(text)
     
     if len(sentences) < 2:
         return 0.0
@@ -100,11 +120,11 @@ def calculate_burstiness(text: str) -> float:
     # Count words per sentence (simple tokenization)
     token_counts = [len(sentence.split()) for sentence in sentences]
     
-    mean_count = np.mean(token_counts)
+    mean_count = statistics.fmean(token_counts)
     if mean_count == 0:
         return 0.0
     
-    std_count = np.std(token_counts)
+    std_count = statistics.pstdev(token_counts)
     burstiness = std_count / mean_count
     
     return float(burstiness)
@@ -0,0 +1,277 @@
+"""Online (streaming) statistics for evaluation runs.
+
+Accumulators here update in O(1) time and memory per observation and can be
+merged, so partial results from several workers or lanes combine exactly.
+"""
+
+import math
+from dataclasses import dataclass, field, asdict
+from statistics import NormalDist
+
+
+# z-score for a two-sided 95% confidence interval
+Z_95 = 1.959963984540054
+
+
+@dataclass
+class RunningStats:
+    """
+    Welford accumulator for count, mean, variance, min and max.
+
+    Uses Welford's update for single observations and Chan et al.'s
+    pairwise formula for merging two accumulators.
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float | None = None
+    max: float | None = None
+
+    def update(self, value: float) -> None:
+        """Add a single observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Merge another accumulator into this one (in place) and return self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two observations)."""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def confidence_interval(self, z: float = Z_95) -> tuple[float, float] | None:
+        """Normal-approximation confidence interval for the mean (None for fewer than two observations)."""
+        if self.count < 2:
+            return None
+        half_width = z * self.std / math.sqrt(self.count)
+        return (self.mean - half_width, self.mean + half_width)
+
+    def to_dict(self) -> dict:
+        """Serialize accumulator state."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "RunningStats":
+        """Restore accumulator state from `to_dict` output."""
+        if not data:
+            return cls()
+        return cls(**{k: data[k] for k in ("count", "mean", "m2", "min", "max") if k in data})
+
+
+def wilson_interval(successes: int, total: int, z: float = Z_95) -> tuple[float, float] | None:
+    """
+    Wilson score interval for a binomial proportion.
+
+    Args:
+        successes: Number of successes
+        total: Number of trials
+        z: z-score for the desired confidence level
+
+    Returns:
+        (lower, upper) bounds, or None when there are no trials
+    """
+    if total == 0:
+        return None
+    p = successes / total
+    z2 = z * z
+    denom = 1 + z2 / total
+    center = (p + z2 / (2 * total)) / denom
+    half_width = z * math.sqrt(p * (1 - p) / total + z2 / (4 * total * total)) / denom
+    return (max(0.0, center - half_width), min(1.0, center + half_width))
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided z-score for a confidence level (e.g. 0.95 -> 1.96)."""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return h
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    # The continued fraction converges fast on one side of the mean; use symmetry on the other
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def beta_interval(
+    successes: int,
+    total: int,
+    confidence: float = 0.95,
+    prior: tuple[float, float] = (1.0, 1.0),
+) -> tuple[float, float] | None:
+    """
+    Equal-tailed Bayesian credible interval for a proportion.
+
+    Uses the Beta(prior + successes, prior + failures) posterior; quantiles
+    are found by bisection on the regularized incomplete beta function.
+
+    Returns:
+        (lower, upper) bounds, or None when there are no trials
+    """
+    if total == 0:
+        return None
+    a, b = prior[0] + successes, prior[1] + total - successes
+    tail = (1 - confidence) / 2
+
+    def quantile(q: float) -> float:
+        lo, hi = 0.0, 1.0
+        for _ in range(50):
+            mid = (lo + hi) / 2
+            if beta_cdf(mid, a, b) < q:
+                lo = mid
+            else:
+                hi = mid
+        return (lo + hi) / 2
+
+    return (quantile(tail), quantile(1 - tail))
+
+
+@dataclass
+class RunMetrics:
+    """
+    Mergeable running metrics for an evaluation run.
+
+    Tracks item/pass counts, latency statistics over successful items and
+    the sum of token logprobs (for perplexity) without keeping per-item lists.
+    """
+    items: int = 0
+    passed: int = 0
+    latency: RunningStats = field(default_factory=RunningStats)
+    logprob_sum: float = 0.0
+    token_count: int = 0
+
+    def record(
+        self,
+        passed: bool,
+        latency_ms: float | None = None,
+        logprob_sum: float = 0.0,
+        token_count: int = 0,
+    ) -> None:
+        """Record the outcome of one evaluated item."""
+        self.items += 1
+        if passed:
+            self.passed += 1
+        if latency_ms is not None:
+            self.latency.update(latency_ms)
+        self.logprob_sum += logprob_sum
+        self.token_count += token_count
+
+    def merge(self, other: "RunMetrics") -> "RunMetrics":
+        """Merge another accumulator into this one (in place) and return self."""
+        self.items += other.items
+        self.passed += other.passed
+        self.latency.merge(other.latency)
+        self.logprob_sum += other.logprob_sum
+        self.token_count += other.token_count
+        return self
+
+    @property
+    def failed(self) -> int:
+        """Number of failed items."""
+        return self.items - self.passed
+
+    @property
+    def pass_rate(self) -> float:
+        """Fraction of recorded items that passed."""
+        return self.passed / self.items if self.items else 0.0
+
+    @property
+    def perplexity(self) -> float | None:
+        """Perplexity over all recorded tokens: exp(-mean(logprob))."""
+        if not self.token_count:
+            return None
+        return math.exp(-self.logprob_sum / self.token_count)
+
+    def summary(self) -> dict:
+        """Derived metrics suitable for API responses."""
+        latency_ci = self.latency.confidence_interval()
+        pass_rate_ci = wilson_interval(self.passed, self.items)
+        return {
+            "items": self.items,
+            "passed_items": self.passed,
+            "failed_items": self.failed,
+            "pass_rate": self.pass_rate,
+            "pass_rate_ci": list(pass_rate_ci) if pass_rate_ci else None,
+            "avg_latency_ms": self.latency.mean if self.latency.count else None,
+            "latency_std_ms": self.latency.std if self.latency.count else None,
+            "latency_ci_ms": list(latency_ci) if latency_ci else None,
+            "min_latency_ms": self.latency.min,
+            "max_latency_ms": self.latency.max,
+            "avg_perplexity": self.perplexity,
+        }
+
+    def to_dict(self) -> dict:
+        """Serialize accumulator state (stored on `EvalRun.metrics_state`)."""
+        return {
+            "items": self.items,
+            "passed": self.passed,
+            "latency": self.latency.to_dict(),
+            "logprob_sum": self.logprob_sum,
+            "token_count": self.token_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "RunMetrics":
+        """Restore accumulator state from `to_dict` output."""
+        if not data:
+            return cls()
+        return cls(
+            items=data.get("items", 0),
+            passed=data.get("passed", 0),
+            latency=RunningStats.from_dict(data.get("latency")),
+            logprob_sum=data.get("logprob_sum", 0.0),
+            token_count=data.get("token_count", 0),
+        )
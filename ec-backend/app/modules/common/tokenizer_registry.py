@@ -0,0 +1,167 @@
+"""Model-specific tokenizers loaded from local files.
+
+Each model maps to a tokenizer family whose `tokenizer.json` is fetched at
+build time (`python -m app.core.assets`); loading reads only that file, so
+nothing touches the network at runtime. Loaded tokenizers hold large
+vocabularies, so a bounded LRU keeps the most recently used ones and
+reports the memory each added when it loaded. Models without a local
+tokenizer fall back to tiktoken's cl100k_base and are flagged approximate.
+
+Encoding runs on a thread pool: both the `tokenizers` and tiktoken
+encoders release the GIL, so batches encode in parallel without blocking
+the event loop.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.assets import missing_assets, tokenizer_path
+from app.core.config import settings
+from app.core.runtime_stats import rss_bytes
+
+
+# Model -> tokenizer family (a directory under settings.tokenizer_dir)
+MODEL_TOKENIZERS = {
+    "llama-3.3-70b-versatile": "llama-3",
+    "llama-3.1-8b-instant": "llama-3",
+    "llama-3.2-1b-preview": "llama-3",
+    "llama-3.2-3b-preview": "llama-3",
+    "mixtral-8x7b-32768": "mixtral",
+    "gemma2-9b-it": "gemma-2",
+}
+
+FALLBACK_TOKENIZER = "cl100k_base"
+
+
+class TokenizerUnavailable(RuntimeError):
+    """Neither the model's tokenizer nor the fallback encoding is installed."""
+
+
+@dataclass
+class LoadedTokenizer:
+    """A loaded tokenizer with its load cost."""
+    name: str
+    approximate: bool  # True for the cl100k_base fallback
+    encoder: Any  # tokenizers.Tokenizer, or tiktoken.Encoding for the fallback
+    memory_bytes: Optional[int]  # RSS growth while loading
+    load_ms: float
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """Token IDs for each text (no special tokens)."""
+        if self.approximate:
+            return self.encoder.encode_ordinary_batch(texts)
+        return [encoding.ids for encoding in self.encoder.encode_batch(texts, add_special_tokens=False)]
+
+    def tokenize(self, text: str) -> List[Tuple[int, str]]:
+        """(token ID, text span) pairs for display."""
+        if self.approximate:
+            return [(token_id, self.encoder.decode([token_id])) for token_id in self.encoder.encode_ordinary(text)]
+        encoding = self.encoder.encode(text, add_special_tokens=False)
+        # Offsets map back to the input, so byte-level / sentencepiece markers don't leak into the text.
+        # Tokens splitting one character share its span; it's shown on the first, so pieces join back to the input.
+        pieces, shown = [], 0
+        for token_id, (start, end) in zip(encoding.ids, encoding.offsets):
+            pieces.append((token_id, text[max(start, shown):end]))
+            shown = max(shown, end)
+        return pieces
+
+    def info(self) -> Dict[str, Any]:
+        """Cache entry description."""
+        return {
+            "name": self.name,
+            "approximate": self.approximate,
+            "memory_bytes": self.memory_bytes,
+            "load_ms": round(self.load_ms, 1),
+        }
+
+
+class TokenizerRegistry:
+    """LRU of loaded tokenizers, keyed by family (models sharing a tokenizer share the entry)."""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self.loaded: "OrderedDict[str, LoadedTokenizer]" = OrderedDict()
+        # Loads are serialized so the RSS delta is attributable and nothing loads twice
+        self.lock = threading.Lock()
+
+    def resolve(self, model: Optional[str]) -> str:
+        """Tokenizer family for a model, or the fallback when it has no local tokenizer."""
+        name = MODEL_TOKENIZERS.get(model or "")
+        if name and os.path.isfile(tokenizer_path(name)):
+            return name
+        return FALLBACK_TOKENIZER
+
+    def _load(self, name: str) -> LoadedTokenizer:
+        started = time.perf_counter()
+        rss_before = rss_bytes()
+        if name == FALLBACK_TOKENIZER:
+            # tiktoken downloads missing encodings; only load what the build prepared
+            if f"tiktoken:{name}" in missing_assets():
+                raise TokenizerUnavailable("Tokenizer data not installed (run `python -m app.core.assets`)")
+            import tiktoken
+            encoder = tiktoken.get_encoding(name)
+        else:
+            from tokenizers import Tokenizer
+            encoder = Tokenizer.from_file(tokenizer_path(name))
+        rss_after = rss_bytes()
+
+        loaded = LoadedTokenizer(
+            name=name,
+            approximate=name == FALLBACK_TOKENIZER,
+            encoder=encoder,
+            memory_bytes=max(0, rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            load_ms=(time.perf_counter() - started) * 1000,
+        )
+        logger.info(f"Loaded tokenizer {name} in {loaded.load_ms:.0f}ms (+{(loaded.memory_bytes or 0) / 2**20:.1f} MiB)")
+        return loaded
+
+    def get(self, model: Optional[str]) -> LoadedTokenizer:
+        """
+        Tokenizer for a model, loading it on first use (blocking; call from a thread).
+
+        Raises:
+            TokenizerUnavailable: If no tokenizer is installed for the model
+        """
+        name = self.resolve(model)
+        with self.lock:
+            loaded = self.loaded.get(name)
+            if loaded is None:
+                loaded = self._load(name)
+                self.loaded[name] = loaded
+                while len(self.loaded) > self.max_entries:
+                    evicted, _ = self.loaded.popitem(last=False)
+                    logger.info(f"Evicted tokenizer {evicted}")
+            self.loaded.move_to_end(name)
+            return loaded
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Loaded tokenizers, most recently used first."""
+        with self.lock:
+            return [loaded.info() for loaded in reversed(self.loaded.values())]
+
+
+tokenizer_registry = TokenizerRegistry(settings.tokenizer_cache_size)
+
+_executor = ThreadPoolExecutor(max_workers=settings.tokenizer_threads, thread_name_prefix="tokenizer")
+
+
+async def encode_batch(model: Optional[str], texts: List[str]) -> Tuple[LoadedTokenizer, List[List[int]]]:
+    """Encode many texts with the model's tokenizer on the tokenizer thread pool."""
+    loop = asyncio.get_running_loop()
+    tokenizer = await loop.run_in_executor(_executor, tokenizer_registry.get, model)
+    return tokenizer, await loop.run_in_executor(_executor, tokenizer.encode_batch, texts)
+
+
+async def tokenize(model: Optional[str], text: str) -> Tuple[LoadedTokenizer, List[Tuple[int, str]]]:
+    """Tokenize one text for display on the tokenizer thread pool."""
+    loop = asyncio.get_running_loop()
+    tokenizer = await loop.run_in_executor(_executor, tokenizer_registry.get, model)
+    return tokenizer, await loop.run_in_executor(_executor, tokenizer.tokenize, text)
@@ -0,0 +1,438 @@
+"""Archival of finished runs' heavy payloads to compressed blob storage.
+
+Once a finished run is older than `archive_after_days`, its `inputs`
+JSON (plus the `outputs` and `results` of runs archived before items
+replaced them) and the text/JSON columns of its `eval_items` rows move to
+zstd-compressed chunk files, and the columns are cleared. Summaries (metrics, pass rate, estimates) and the slim item
+index used for diffs (hashes, pass flags, latencies) stay in the
+database, so listings, status polls and diff summaries never touch the
+archive and the database stops growing with history.
+
+Blobs use an object-store key layout (immutable objects under flat
+`runs/<run_id>/...` keys) on local disk:
+
+    runs/<run_id>/<part>/00000.jsonl.zst   one zstd frame of JSONL records
+    runs/<run_id>/manifest.json            copy of the manifest kept on the run
+
+Parts are `inputs`, `outputs` and `results` (the run's lists, in order)
+and `items` (heavy item fields, in item_index order). Chunks hold
+`archive_chunk_records` records each, so reads rehydrate one chunk at a
+time: exports and reports stream with bounded memory and point lookups
+decompress a single chunk.
+
+Sweeps run periodically in the API process (ARCHIVE_SWEEP_INTERVAL_SECONDS)
+or on demand:
+
+    python -m app.modules.evals.archive_cli [--older-than-days N] [--all] [--vacuum]
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from .export import EXPORT_COLUMNS, iter_rows
+from .items import ensure_items, item_result
+from .models import EvalItem, EvalRun, EvalStatus
+
+
+# Run columns moved to the archive
+RUN_PARTS = ("inputs", "outputs", "results")
+
+# Item part name and the EvalItem columns it holds
+ITEMS_PART = "items"
+ITEM_COLUMNS = {
+    "input_prompt": EvalItem.input_prompt,
+    "output": EvalItem.output,
+    "validations": EvalItem.validations,
+    "reference_scores": EvalItem.reference_scores,
+}
+
+FINAL_STATUSES = (EvalStatus.COMPLETED.value, EvalStatus.FAILED.value, EvalStatus.CANCELLED.value)
+
+# Decompressed chunks kept per reader for point lookups
+LOOKUP_CACHE_CHUNKS = 2
+
+
+class ArchiveError(RuntimeError):
+    """An archived payload is missing or unreadable."""
+
+
+class LocalBlobStore:
+    """
+    Object-store stand-in on local disk.
+
+    Keys map to files under `root`; objects are written to a temporary file
+    and renamed into place, so readers never see partial blobs.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ArchiveError(f"Archived blob {key} not found in {self.root}")
+
+    def delete_prefix(self, prefix: str) -> None:
+        shutil.rmtree(self._path(prefix.rstrip("/")), ignore_errors=True)
+
+
+archive_store = LocalBlobStore(settings.archive_dir)
+
+
+def _run_prefix(run_id: str) -> str:
+    return f"runs/{run_id}"
+
+
+def compress_records(records: List[Any]) -> bytes:
+    """One zstd frame of JSONL."""
+    import zstandard
+
+    raw = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+    return zstandard.ZstdCompressor(level=settings.archive_zstd_level).compress(raw)
+
+
+def decompress_records(data: bytes) -> List[Any]:
+    """Records of one chunk."""
+    import zstandard
+
+    raw = zstandard.ZstdDecompressor().decompress(data)
+    return [json.loads(line) for line in raw.decode("utf-8").splitlines()]
+
+
+class _PartWriter:
+    """Writes one part's records as chunks and describes them for the manifest."""
+
+    def __init__(self, store: LocalBlobStore, run_id: str, part: str):
+        self.store = store
+        self.prefix = f"{_run_prefix(run_id)}/{part}"
+        self.chunks: List[Dict[str, Any]] = []
+
+    def write(self, records: List[Any], first: Optional[int] = None, last: Optional[int] = None) -> None:
+        data = compress_records(records)
+        key = f"{self.prefix}/{len(self.chunks):05d}.jsonl.zst"
+        self.store.put(key, data)
+        chunk = {"key": key, "records": len(records), "bytes": len(data)}
+        if first is not None:
+            chunk.update(first=first, last=last)
+        self.chunks.append(chunk)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "records": sum(chunk["records"] for chunk in self.chunks),
+            "bytes": sum(chunk["bytes"] for chunk in self.chunks),
+            "chunks": self.chunks,
+        }
+
+
+def _write_list(store: LocalBlobStore, run_id: str, part: str, values: List[Any]) -> Dict[str, Any]:
+    writer = _PartWriter(store, run_id, part)
+    size = settings.archive_chunk_records
+    for start in range(0, len(values), size):
+        writer.write(values[start:start + size])
+    return writer.describe()
+
+
+async def _compact_items(session: AsyncSession, run_id: str) -> None:
+    """
+    Rewrite a run's item rows without the archived columns.
+
+    Clearing the columns in place would leave every old page mostly empty
+    (new rows are appended, so that space is never reused); copying the
+    slim rows packs them densely and frees whole pages for new runs. The
+    copy is staged under a temporary run id to keep the unique index valid.
+    """
+    staging_id = f"{run_id}~archive"
+    slim = [column for column in EvalItem.__table__.columns if column.name != "id" and column.name not in ITEM_COLUMNS]
+    names = [column.name for column in slim]
+    copied = select(*[literal(staging_id) if column.name == "run_id" else column for column in slim])
+    await session.execute(delete(EvalItem).where(EvalItem.run_id == staging_id))
+    await session.execute(
+        insert(EvalItem).from_select(names, copied.where(EvalItem.run_id == run_id).order_by(EvalItem.item_index))
+    )
+    await session.execute(delete(EvalItem).where(EvalItem.run_id == run_id))
+    await session.execute(update(EvalItem).where(EvalItem.run_id == staging_id).values(run_id=run_id))
+
+
+async def archive_run(session: AsyncSession, run: EvalRun, store: LocalBlobStore = archive_store) -> bool:
+    """
+    Move a finished run's payloads to the archive (commits).
+
+    Blobs are written before the columns are cleared, so a crash in between
+    leaves the run unarchived and the next sweep rewrites the same keys.
+
+    Returns:
+        False if the run is not finished or already archived
+    """
+    if run.status not in FINAL_STATUSES or run.archived_at is not None:
+        return False
+
+    # Summaries must not depend on the payloads once they're gone
+    await ensure_items(session, run)
+
+    parts = {}
+    for part in RUN_PARTS:
+        values = getattr(run, part)
+        if values is not None:
+            parts[part] = await asyncio.to_thread(_write_list, store, run.id, part, values)
+
+    # Heavy item fields, streamed out of the database one chunk at a time
+    names = list(ITEM_COLUMNS)
+    writer = _PartWriter(store, run.id, ITEMS_PART)
+    stmt = (
+        select(EvalItem.item_index, *ITEM_COLUMNS.values())
+        .where(EvalItem.run_id == run.id)
+        .order_by(EvalItem.item_index)
+        .execution_options(yield_per=settings.archive_chunk_records)
+    )
+    result = await session.stream(stmt)
+    async for partition in result.partitions(settings.archive_chunk_records):
+        records = [{"index": row[0], **dict(zip(names, row[1:]))} for row in partition]
+        await asyncio.to_thread(writer.write, records, records[0]["index"], records[-1]["index"])
+    parts[ITEMS_PART] = writer.describe()
+
+    manifest = {
+        "version": 1,
+        "archived_at": datetime.utcnow().isoformat(),
+        "bytes": sum(part["bytes"] for part in parts.values()),
+        "parts": parts,
+    }
+    await asyncio.to_thread(
+        store.put, f"{_run_prefix(run.id)}/manifest.json", json.dumps(manifest).encode("utf-8")
+    )
+
+    await _compact_items(session, run.id)
+    for part in RUN_PARTS:
+        setattr(run, part, None)
+    run.archive = manifest
+    run.archived_at = datetime.utcnow()
+    await session.commit()
+    logger.info(
+        f"Archived eval run {run.id}: {parts[ITEMS_PART]['records']} items, "
+        f"{manifest['bytes'] / 2**10:.1f} KiB compressed"
+    )
+    return True
+
+
+async def delete_archive(run_id: str, store: LocalBlobStore = archive_store) -> None:
+    """Remove a run's archived blobs (no-op when it has none)."""
+    await asyncio.to_thread(store.delete_prefix, _run_prefix(run_id))
+
+
+class ArchiveReader:
+    """Rehydrates an archived run's parts from its manifest, chunk by chunk."""
+
+    def __init__(self, run: EvalRun, store: LocalBlobStore = archive_store):
+        self.run_id = run.id
+        self.manifest = run.archive or {}
+        self.store = store
+        self._cache: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+    def _chunks(self, part: str) -> List[Dict[str, Any]]:
+        return self.manifest.get("parts", {}).get(part, {}).get("chunks", [])
+
+    def has(self, part: str) -> bool:
+        return part in self.manifest.get("parts", {})
+
+    def count(self, part: str) -> int:
+        return self.manifest.get("parts", {}).get(part, {}).get("records", 0)
+
+    def _read(self, key: str) -> List[Any]:
+        return decompress_records(self.store.get(key))
+
+    async def iter_chunks(self, part: str) -> AsyncIterator[List[Any]]:
+        """Yield a part's records one chunk at a time (decompressed off the event loop)."""
+        for chunk in self._chunks(part):
+            yield await asyncio.to_thread(self._read, chunk["key"])
+
+    async def load(self, part: str) -> Optional[List[Any]]:
+        """A whole part, or None if the run had no such payload."""
+        if not self.has(part):
+            return None
+        records: List[Any] = []
+        async for chunk in self.iter_chunks(part):
+            records.extend(chunk)
+        return records
+
+    async def item(self, index: int) -> Optional[Dict[str, Any]]:
+        """Heavy fields of one item by item_index (decompresses at most one chunk)."""
+        chunks = self._chunks(ITEMS_PART)
+        position = bisect_right([chunk["first"] for chunk in chunks], index) - 1
+        if position < 0 or index > chunks[position]["last"]:
+            return None
+        key = chunks[position]["key"]
+        if key not in self._cache:
+            records = await asyncio.to_thread(self._read, key)
+            self._cache[key] = {record["index"]: record for record in records}
+            while len(self._cache) > LOOKUP_CACHE_CHUNKS:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(key)
+        return self._cache[key].get(index)
+
+
+async def run_payload(run: EvalRun, part: str, store: LocalBlobStore = archive_store) -> Optional[List[Any]]:
+    """A run's `inputs`, `outputs` or `results`, rehydrated from the archive if needed."""
+    if run.archived_at is None:
+        return getattr(run, part)
+    return await ArchiveReader(run, store).load(part)
+
+
+async def iter_results(
+    session: AsyncSession,
+    run: EvalRun,
+    store: LocalBlobStore = archive_store,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """A run's item results (see `items.item_result`) in item order, one batch at a time."""
+    batches = iter_rows(session, run.id, list(EXPORT_COLUMNS))
+    if run.archived_at is not None:
+        batches = merge_item_rows(batches, ArchiveReader(run, store), list(EXPORT_COLUMNS))
+    async for rows in batches:
+        yield [item_result(row) for row in rows]
+
+
+async def merge_item_rows(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    reader: ArchiveReader,
+    columns: List[str],
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Fill archived item fields into row batches from `export.iter_rows`.
+
+    Rows and archived records are both in item_index order, so the archive
+    is read sequentially alongside the database cursor. Rows must include
+    `index`; the output is projected to `columns`.
+    """
+    archived = [name for name in columns if name in ITEM_COLUMNS]
+    chunks = reader.iter_chunks(ITEMS_PART)
+    pending: List[Dict[str, Any]] = []
+    position = 0
+    exhausted = False
+    async for rows in batches:
+        for row in rows:
+            # Advance through archived records up to this row's index
+            while not exhausted:
+                if position == len(pending):
+                    try:
+                        pending, position = await chunks.__anext__(), 0
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                if pending[position]["index"] >= row["index"]:
+                    break
+                position += 1
+            if not exhausted and pending[position]["index"] == row["index"]:
+                for name in archived:
+                    row[name] = pending[position][name]
+        yield [{name: row[name] for name in columns} for row in rows]
+
+
+async def archive_due_runs(
+    older_than: timedelta,
+    limit: int,
+    session_factory: async_sessionmaker = async_session_factory,
+    store: LocalBlobStore = archive_store,
+) -> int:
+    """
+    Archive up to `limit` finished runs completed before now - `older_than`.
+
+    Returns:
+        Number of runs archived
+    """
+    cutoff = datetime.utcnow() - older_than
+    async with session_factory() as session:
+        run_ids = (await session.execute(
+            select(EvalRun.id)
+            .where(
+                EvalRun.status.in_(FINAL_STATUSES),
+                EvalRun.archived_at.is_(None),
+                EvalRun.completed_at < cutoff,
+            )
+            .order_by(EvalRun.completed_at)
+            .limit(limit)
+        )).scalars().all()
+
+    archived = 0
+    for run_id in run_ids:
+        # One session per run, so a failure only skips that run
+        async with session_factory() as session:
+            try:
+                run = await session.get(EvalRun, run_id)
+                if run is not None and await archive_run(session, run, store):
+                    archived += 1
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Failed to archive eval run {run_id}: {e}")
+    return archived
+
+
+class ArchiveSweeper:
+    """Periodically archives runs older than the retention policy."""
+
+    def __init__(self, interval_seconds: float, after_days: float, batch_size: int):
+        self.interval = interval_seconds
+        self.after = timedelta(days=after_days)
+        self.batch_size = batch_size
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 and self.after.total_seconds() > 0
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                # Drain the backlog in batches before sleeping
+                while await archive_due_runs(self.after, self.batch_size) == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Archive sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start sweeping on the running loop (no-op when disabled)."""
+        if not self.enabled or self.task is not None:
+            return
+        self.task = asyncio.create_task(self._loop(), name="archive-sweeper")
+        logger.info(f"Archive sweeper started (runs older than {self.after.days} days, every {self.interval:.0f}s)")
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+
+archive_sweeper = ArchiveSweeper(
+    settings.archive_sweep_interval_seconds,
+    settings.archive_after_days,
+    settings.archive_sweep_batch_size,
+)
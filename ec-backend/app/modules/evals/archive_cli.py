@@ -0,0 +1,52 @@
+"""Archive payloads of finished eval runs on demand.
+
+Runs the same sweep as the API's periodic archiver, e.g. from cron when
+the sweep is disabled in the API process.
+
+Usage:
+    python -m app.modules.evals.archive_cli
+    python -m app.modules.evals.archive_cli --older-than-days 7 --all --vacuum
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, init_db
+from .archive import archive_due_runs
+
+
+async def _main(args: argparse.Namespace) -> None:
+    await init_db()
+    total = 0
+    while True:
+        archived = await archive_due_runs(timedelta(days=args.older_than_days), args.limit)
+        total += archived
+        if archived < args.limit or not args.all:
+            break
+    logger.info(f"Archived {total} eval runs")
+
+    if args.vacuum and settings.is_sqlite:
+        # Freed pages are reused by new rows anyway; VACUUM returns them to the filesystem
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM"))
+        logger.info("Vacuumed database")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=float, default=settings.archive_after_days)
+    parser.add_argument("--limit", type=int, default=settings.archive_sweep_batch_size, help="Runs per batch")
+    parser.add_argument("--all", action="store_true", help="Keep going until no due runs are left")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM SQLite afterwards to shrink the file")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Offline execution of eval runs through the provider's batch API.
+
+Runs created with `execution_mode=batch` don't stream items one at a time
+under the rate budgets. Their pending items are serialized into one JSONL
+file of chat completion requests (`custom_id` = `item-<index>`), which is
+uploaded and submitted as a provider batch job. The job is polled every
+`batch_poll_interval_seconds` until it finishes. Then its output and
+error files are parsed into the same item results the streaming path
+produces, and fed through the same validation, metrics and reporting
+pipeline in chunks of `batch_ingest_chunk`.
+
+The job's id and owning key are stored on the run (`EvalRun.batch`), so
+an interrupted run resumes polling its job instead of resubmitting.
+Cancelling a run (or passing its deadline) cancels the job; requests the
+provider finished by then are still ingested. Items that a completed job
+has no result for fail; items left unfinished by an expired job are not
+evaluated, like items after a run deadline.
+
+Batch runs have no per-item latency (`latency_ms` is 0, as for failed
+items), and streaming validators only see the finished output.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.modules.common.llm_client import FALLBACK_LOGPROB, GroqLLMClient
+from .cancellation import CancelReason, RunControl
+from .models import EvalRun
+from .validators import ValidatorSet, apply_validations, run_validators
+
+
+class BatchStatus:
+    """Provider batch job states the executor acts on."""
+    COMPLETED = "completed"
+    FAILED = "failed"  # The input file was rejected; nothing ran
+    EXPIRED = "expired"  # The completion window passed; finished requests are in the output
+    CANCELLED = "cancelled"
+
+
+FINAL_STATUSES = {BatchStatus.COMPLETED, BatchStatus.FAILED, BatchStatus.EXPIRED, BatchStatus.CANCELLED}
+
+
+class BatchError(RuntimeError):
+    """A batch job could not run (rejected input, or its key is gone)."""
+
+
+def custom_id(index: int) -> str:
+    return f"item-{index}"
+
+
+def build_requests(client: GroqLLMClient, run: EvalRun, inputs: List[Dict[str, Any]], indices: List[int]) -> bytes:
+    """Batch input file: one chat completion request per item, in `indices` order."""
+    lines = []
+    for index in indices:
+        input_data = inputs[index]
+        body = client.batch_request_body(
+            system_prompt=input_data.get("system_prompt", "You are a helpful assistant."),
+            user_prompt=input_data.get("user_prompt", ""),
+            model=run.model,
+            temperature=run.temperature if run.temperature is not None else 0.7,
+            max_tokens=run.max_tokens or 1024,
+        )
+        lines.append(json.dumps({
+            "custom_id": custom_id(index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body,
+        }))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def item_result(line: Dict[str, Any], inputs: List[Dict[str, Any]], validators: ValidatorSet) -> Dict[str, Any]:
+    """Stored result for one output (or error) file line, with cheap validators applied."""
+    index = int(line["custom_id"].removeprefix("item-"))
+    input_data = inputs[index]
+    result = {
+        "index": index,
+        "input_prompt": input_data.get("user_prompt", ""),
+        "output": "",
+        "latency_ms": 0,  # Not measurable per item in a batch
+    }
+
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    error = line.get("error") or body.get("error")
+    if error or response.get("status_code") != 200:
+        message = error.get("message") if isinstance(error, dict) else error
+        result.update(passed=False, failure_reason=message or f"HTTP {response.get('status_code')}")
+        return result
+
+    choice = body["choices"][0]
+    logprobs = [token["logprob"] for token in ((choice.get("logprobs") or {}).get("content") or [])]
+    output_tokens = len(logprobs) or (body.get("usage") or {}).get("completion_tokens", 0)
+    result.update(
+        output=choice["message"].get("content") or "",
+        output_tokens=output_tokens,
+        logprob_sum=sum(logprobs) if logprobs else FALLBACK_LOGPROB * output_tokens,
+    )
+    apply_validations(result, run_validators(validators.cheap, result["output"], input_data))
+    return result
+
+
+def parse_results(
+    files: List[bytes],
+    inputs: List[Dict[str, Any]],
+    validators: ValidatorSet,
+) -> Dict[int, Dict[str, Any]]:
+    """Item results from a job's output and error files, by item index."""
+    results = {}
+    for content in files:
+        for raw in content.splitlines():
+            if raw.strip():
+                result = item_result(json.loads(raw), inputs, validators)
+                results[result["index"]] = result
+    return results
+
+
+def job_state(job: Dict[str, Any], key_label: str) -> Dict[str, Any]:
+    """What the run keeps of a provider batch object (`EvalRun.batch`)."""
+    counts = job.get("request_counts") or {}
+    errors = [e.get("message") for e in ((job.get("errors") or {}).get("data") or [])]
+    return {
+        "id": job["id"],
+        "key": key_label,
+        "status": job["status"],
+        "completed": counts.get("completed", 0),
+        "failed": counts.get("failed", 0),
+        "total": counts.get("total", 0),
+        "output_file_id": job.get("output_file_id"),
+        "error_file_id": job.get("error_file_id"),
+        "errors": errors or None,
+    }
+
+
+async def _wait(control: RunControl, seconds: float) -> None:
+    """Sleep until the next poll, waking early on cancellation or the run deadline."""
+    if control.deadline is not None:
+        seconds = min(seconds, max(0.0, control.deadline - time.monotonic()))
+    try:
+        await asyncio.wait_for(control.cancelled.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_batch(
+    client: GroqLLMClient,
+    session: AsyncSession,
+    run: EvalRun,
+    inputs: List[Dict[str, Any]],
+    pending: List[int],
+    validators: ValidatorSet,
+    control: RunControl,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Evaluate `pending` items as one provider batch job.
+
+    Submits the job (or resumes the one on `run.batch`), polls it to a
+    final state, recording progress on the run, and then yields the item
+    results in index order, in chunks.
+
+    Args:
+        client: LLM client (its key pool supplies the job's key)
+        session: Session the run is attached to; progress is committed on it
+        run: Batch-mode eval run
+        inputs: The run's inputs
+        pending: Indices of items without a result yet
+        validators: Validators compiled once for the run
+        control: The run's cancellation and deadline control
+
+    Yields:
+        Lists of stored result dicts
+
+    Raises:
+        BatchError: If the provider rejected the job or its key is no longer configured
+    """
+    if not pending:
+        return
+
+    state = run.batch
+    if state is None:
+        key = client.pool.pick()
+        requests = await asyncio.to_thread(build_requests, client, run, inputs, pending)
+        job = await client.create_batch(
+            key.api_key, requests, settings.batch_completion_window, metadata={"run_id": run.id}
+        )
+        state = run.batch = job_state(job, key.label)
+        await session.commit()
+    else:
+        key = client.pool.find(state["key"])
+        if key is None:
+            raise BatchError(f"API {state['key']} that owns batch {state['id']} is no longer configured")
+        logger.info(f"Resuming batch {state['id']} of eval run {run.id} ({state['status']})")
+
+    # Poll to a final state; stopping the run cancels the job but keeps its finished requests
+    stop_requested = False
+    while state["status"] not in FINAL_STATUSES:
+        if (control.cancelled.is_set() or control.deadline_passed()) and not stop_requested:
+            stop_requested = True
+            job = await client.cancel_batch(key.api_key, state["id"])
+            logger.info(f"Cancelling batch {state['id']} of eval run {run.id}")
+            if control.reason == CancelReason.DELETED:
+                return
+        else:
+            if stop_requested:
+                # Cancellation is already sent; the cancelled event and deadline stay set, so don't wait on them
+                await asyncio.sleep(settings.batch_poll_interval_seconds)
+            else:
+                await _wait(control, settings.batch_poll_interval_seconds)
+            job = await client.get_batch(key.api_key, state["id"])
+        polled = job_state(job, key.label)
+        if polled != state:
+            state = run.batch = polled
+            await session.commit()
+
+    if state["status"] == BatchStatus.FAILED:
+        raise BatchError(f"Batch {state['id']} failed: {'; '.join(state['errors'] or ['no details'])}")
+
+    files = [
+        await client.download_file(key.api_key, file_id)
+        for file_id in (state["output_file_id"], state["error_file_id"])
+        if file_id
+    ]
+    results = await asyncio.to_thread(parse_results, files, inputs, validators)
+    logger.info(f"Batch {state['id']} of eval run {run.id} {state['status']} with {len(results)} results")
+
+    missing = [i for i in pending if i not in results]
+    if missing and state["status"] == BatchStatus.COMPLETED:
+        # A completed job accounts for every request; anything absent failed
+        for index in missing:
+            results[index] = {
+                "index": index,
+                "input_prompt": inputs[index].get("user_prompt", ""),
+                "output": "",
+                "latency_ms": 0,
+                "passed": False,
+                "failure_reason": f"No result in the output of batch {state['id']}",
+            }
+    elif missing and not stop_requested:
+        run.error_message = f"Batch {state['id']} {state['status']}; {len(missing)} items not evaluated"
+
+    ready: List[Dict[str, Any]] = []
+    for index in sorted(i for i in pending if i in results):
+        ready.append(results[index])
+        if len(ready) >= settings.batch_ingest_chunk:
+            yield ready
+            ready = []
+    if ready:
+        yield ready
@@ -0,0 +1,103 @@
+"""Run cancellation and deadlines.
+
+Every executing run has a RunControl. Cancelling sets its event, which
+ends the run's item loop (`run_bounded(stop=...)`): in-flight items are
+cancelled, and closing their generators closes the upstream HTTP
+streams. Runs executing in this process are signalled directly; runs in
+Celery workers notice the `cancel_requested` flag (or that their row was
+deleted) on the next poll, every `cancel_poll_interval_seconds`.
+
+Deadlines don't cancel anything wholesale: each item streams under the
+smaller of the item timeout and the time left until the run deadline, so
+slow items are recorded as timed out and no new items start afterwards.
+Items still waiting for rate budget at the deadline are not evaluated.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from .models import EvalRun
+
+
+class CancelReason:
+    """Why a run's control was cancelled."""
+    REQUESTED = "requested"  # POST /evals/{run_id}/cancel
+    DELETED = "deleted"  # Run row deleted while executing
+
+
+@dataclass
+class RunControl:
+    """Cancellation signal and deadlines for one executing run."""
+    run_id: str
+    item_timeout: Optional[float] = None  # Seconds per item stream
+    deadline: Optional[float] = None  # time.monotonic() value
+    reason: Optional[str] = None
+    cancelled: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @classmethod
+    def for_run(cls, run: EvalRun) -> "RunControl":
+        """Control for `run`; the run deadline counts from its first start, so resumes keep it."""
+        deadline = None
+        if run.run_timeout_seconds:
+            elapsed = (datetime.utcnow() - (run.started_at or datetime.utcnow())).total_seconds()
+            deadline = time.monotonic() + run.run_timeout_seconds - elapsed
+        return cls(run.id, run.item_timeout_seconds, deadline)
+
+    def cancel(self, reason: str = CancelReason.REQUESTED) -> None:
+        """Signal the run to stop."""
+        if not self.cancelled.is_set():
+            self.reason = reason
+            self.cancelled.set()
+
+    def deadline_passed(self) -> bool:
+        """Whether the run deadline has passed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def deadline_remaining(self) -> Optional[float]:
+        """Seconds left until the run deadline (None when unbounded)."""
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None
+
+    def item_timeout_remaining(self) -> Optional[float]:
+        """Timeout for an item starting now (None when unbounded)."""
+        limits = [limit for limit in (self.item_timeout, self.deadline_remaining()) if limit is not None]
+        return min(limits) if limits else None
+
+
+# Controls of runs executing in this process
+active_runs: Dict[str, RunControl] = {}
+
+
+def signal_cancel(run_id: str, reason: str = CancelReason.REQUESTED) -> bool:
+    """Cancel a run executing in this process; False if it isn't executing here."""
+    control = active_runs.get(run_id)
+    if control is None:
+        return False
+    control.cancel(reason)
+    return True
+
+
+async def watch_cancellation(control: RunControl, session_factory: async_sessionmaker) -> None:
+    """Poll the run's cancel flag (for runs cancelled from another process) until cancelled."""
+    while not control.cancelled.is_set():
+        await asyncio.sleep(settings.cancel_poll_interval_seconds)
+        try:
+            async with session_factory() as session:
+                requested = (await session.execute(
+                    select(EvalRun.cancel_requested).where(EvalRun.id == control.run_id)
+                )).scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Cancel check for eval run {control.run_id} failed: {e}")
+            continue
+        if requested is None:
+            control.cancel(CancelReason.DELETED)
+        elif requested:
+            control.cancel(CancelReason.REQUESTED)
+
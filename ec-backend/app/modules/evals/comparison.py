@@ -0,0 +1,100 @@
+"""Side-by-side reporting for multi-model comparison runs."""
+
+from typing import Any, Dict, List
+
+from app.modules.common.stats import RunMetrics
+from .models import EvalRun
+
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def _normalize(text: str) -> str:
+    """Whitespace/case-insensitive form of an output for agreement checks."""
+    return " ".join(text.split()).lower()
+
+
+def summarize_lane(lane: EvalRun, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summary metrics for one model lane.
+
+    Pass rate, mean latency and perplexity come from the lane's running
+    metrics; latency percentiles are computed over its results (which may
+    have been rehydrated from the archive).
+    """
+    import numpy as np
+    
+    summary = RunMetrics.from_dict(lane.metrics_state).summary()
+    latencies = np.array(
+        [r["latency_ms"] for r in results if r.get("latency_ms")],
+        dtype=float,
+    )
+    percentiles = (
+        np.percentile(latencies, LATENCY_PERCENTILES).tolist()
+        if latencies.size else [None] * len(LATENCY_PERCENTILES)
+    )
+
+    return {
+        "model": lane.model,
+        "run_id": lane.id,
+        "status": lane.status,
+        "completed_items": lane.completed_items or 0,
+        "passed_items": summary["passed_items"],
+        "failed_items": summary["failed_items"],
+        "pass_rate": summary["pass_rate"],
+        "pass_rate_ci": summary["pass_rate_ci"],
+        "avg_latency_ms": summary["avg_latency_ms"],
+        **{f"p{p}_latency_ms": value for p, value in zip(LATENCY_PERCENTILES, percentiles)},
+        "avg_perplexity": summary["avg_perplexity"],
+        "reference_metrics": lane.reference_metrics,
+        "error_message": lane.error_message,
+    }
+
+
+def diff_items(
+    inputs: List[Dict[str, Any]],
+    lanes: List[EvalRun],
+    lane_results: List[List[Dict[str, Any]]],
+    disagreements_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Per-item comparison across lanes.
+
+    Args:
+        inputs: The comparison run's inputs
+        lanes: Lane runs in model order
+        lane_results: Each lane's results, in lane order
+        disagreements_only: Keep only items where pass/fail or outputs differ
+
+    Returns:
+        One entry per input with each model's output, pass flag and latency
+    """
+    by_lane = [{r.get("index", i): r for i, r in enumerate(results)} for results in lane_results]
+
+    items = []
+    for index, input_data in enumerate(inputs):
+        outcomes = {}
+        for lane, results in zip(lanes, by_lane):
+            result = results.get(index)
+            if result is not None:
+                outcomes[lane.model] = {
+                    "output": result.get("output", ""),
+                    "passed": result.get("passed", False),
+                    "latency_ms": result.get("latency_ms", 0),
+                    "failure_reason": result.get("failure_reason"),
+                }
+
+        pass_agreement = len({o["passed"] for o in outcomes.values()}) <= 1
+        output_agreement = len({_normalize(o["output"]) for o in outcomes.values()}) <= 1
+        if disagreements_only and pass_agreement and output_agreement:
+            continue
+
+        items.append({
+            "index": index,
+            "input_prompt": input_data.get("user_prompt", ""),
+            "expected_output": input_data.get("expected_output"),
+            "pass_agreement": pass_agreement,
+            "output_agreement": output_agreement,
+            "outcomes": outcomes,
+        })
+    return items
@@ -0,0 +1,305 @@
+"""Streaming bulk export of run items to JSONL, CSV and Parquet.
+
+Rows are read from `eval_items` in (run_id, item_index) order with a
+server-side cursor, encoded batch by batch and yielded as bytes, so memory
+stays bounded by one batch (one row group for Parquet) regardless of run
+size. The run's `results` JSON is never loaded.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import EvalItem
+
+
+# Rows fetched per round trip
+EXPORT_BATCH_SIZE = 1000
+
+# Rows per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+class ExportFormat:
+    """Supported export formats."""
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+# Export column -> EvalItem attribute, in default output order
+EXPORT_COLUMNS = {
+    "index": EvalItem.item_index,
+    "input_hash": EvalItem.input_hash,
+    "input_prompt": EvalItem.input_prompt,
+    "output": EvalItem.output,
+    "passed": EvalItem.passed,
+    "failure_reason": EvalItem.failure_reason,
+    "latency_ms": EvalItem.latency_ms,
+    "output_tokens": EvalItem.output_tokens,
+    "perplexity": EvalItem.perplexity,
+    "aborted": EvalItem.aborted,
+    "timed_out": EvalItem.timed_out,
+    "validations": EvalItem.validations,
+    "reference_scores": EvalItem.reference_scores,
+}
+
+# Columns holding nested values (JSON-encoded in CSV)
+_NESTED_COLUMNS = {"validations", "reference_scores"}
+
+# Stream compression for text formats; Parquet compresses per column chunk
+TEXT_COMPRESSION = {"none", "gzip"}
+PARQUET_COMPRESSION = {"none", "snappy", "gzip", "zstd"}
+
+MEDIA_TYPES = {
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def resolve_columns(columns: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated column projection.
+
+    Raises:
+        ValueError: If a column is unknown
+    """
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)} (available: {', '.join(EXPORT_COLUMNS)})")
+    return list(dict.fromkeys(names))
+
+
+def resolve_compression(fmt: str, compression: Optional[str]) -> str:
+    """
+    Validate the compression for a format (default: uncompressed text, snappy Parquet).
+
+    Raises:
+        ValueError: If the format doesn't support the codec, or Parquet is unavailable
+    """
+    if fmt == ExportFormat.PARQUET:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow")
+        compression = compression or "snappy"
+        allowed = PARQUET_COMPRESSION
+    else:
+        compression = compression or "none"
+        allowed = TEXT_COMPRESSION
+    if compression not in allowed:
+        raise ValueError(f"Compression {compression!r} not supported for {fmt} (use one of: {', '.join(sorted(allowed))})")
+    return compression
+
+
+def export_filename(run_id: str, fmt: str, compression: str) -> str:
+    """Download filename for an export."""
+    suffix = ".gz" if fmt != ExportFormat.PARQUET and compression == "gzip" else ""
+    return f"{run_id}.{fmt}{suffix}"
+
+
+async def iter_rows(
+    session: AsyncSession,
+    run_id: str,
+    columns: List[str],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield a run's item rows (projected to `columns`) in item order, one batch at a time."""
+    stmt = (
+        select(*[EXPORT_COLUMNS[name] for name in columns])
+        .where(EvalItem.run_id == run_id)
+        .order_by(EvalItem.item_index)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(stmt)
+    async for partition in result.partitions(batch_size):
+        yield [dict(zip(columns, row)) for row in partition]
+
+
+class JsonlEncoder:
+    """One JSON object per line."""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    """CSV with a header before the first row; nested values are JSON-encoded."""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.nested = [name for name in columns if name in _NESTED_COLUMNS]
+        self.header_written = False
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns)
+        if not self.header_written:
+            writer.writeheader()
+            self.header_written = True
+        for row in rows:
+            for name in self.nested:
+                if row[name] is not None:
+                    row[name] = json.dumps(row[name], ensure_ascii=False)
+            writer.writerow(row)
+        return buffer.getvalue().encode("utf-8")
+
+    def finish(self) -> bytes:
+        # An empty run still gets its header
+        return b"" if self.header_written else self.encode([])
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller on `drain`."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema(columns: List[str]):
+    """Arrow schema for the projected columns."""
+    import pyarrow as pa
+
+    from .reference import METRICS
+
+    types = {
+        "index": pa.int64(),
+        "input_hash": pa.string(),
+        "input_prompt": pa.large_string(),
+        "output": pa.large_string(),
+        "passed": pa.bool_(),
+        "failure_reason": pa.string(),
+        "latency_ms": pa.float64(),
+        "output_tokens": pa.int64(),
+        "perplexity": pa.float64(),
+        "aborted": pa.bool_(),
+        "validations": pa.list_(pa.struct([
+            ("name", pa.string()), ("passed", pa.bool_()), ("reason", pa.string()),
+        ])),
+        "reference_scores": pa.struct([(name, pa.float64()) for name in METRICS]),
+    }
+    return pa.schema([(name, types[name]) for name in columns])
+
+
+class ParquetEncoder:
+    """
+    Writes one row group per PARQUET_ROW_GROUP_SIZE rows into an in-memory sink.
+
+    `encode` returns the bytes produced so far (empty until a row group is
+    full); `finish` flushes the last row group and the footer.
+    """
+
+    def __init__(self, columns: List[str], compression: str):
+        import pyarrow.parquet as pq
+
+        self.columns = columns
+        self.schema = _parquet_schema(columns)
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression=compression)
+        self.pending: List[Dict[str, Any]] = []
+
+    def _write_group(self, rows: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema), row_group_size=len(rows))
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        self.pending.extend(rows)
+        while len(self.pending) >= PARQUET_ROW_GROUP_SIZE:
+            group, self.pending = self.pending[:PARQUET_ROW_GROUP_SIZE], self.pending[PARQUET_ROW_GROUP_SIZE:]
+            self._write_group(group)
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        if self.pending:
+            self._write_group(self.pending)
+            self.pending = []
+        self.writer.close()
+        return self.sink.drain()
+
+
+def _gzip_stream() -> Callable[[Optional[bytes]], bytes]:
+    """Incremental gzip: call with each chunk, then with None to flush the trailer."""
+    compressor = zlib.compressobj(wbits=31)
+
+    def compress(data: Optional[bytes]) -> bytes:
+        if data is None:
+            return compressor.flush()
+        return compressor.compress(data)
+    return compress
+
+
+async def export_rows(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    fmt: str,
+    columns: List[str],
+    compression: str,
+) -> AsyncIterator[bytes]:
+    """
+    Encode row batches into a byte stream in the requested format.
+
+    Args:
+        batches: Row batches from `iter_rows`
+        fmt: ExportFormat value
+        columns: Projected columns, in output order
+        compression: Codec from `resolve_compression`
+
+    Yields:
+        Encoded (and possibly compressed) chunks
+    """
+    if fmt == ExportFormat.PARQUET:
+        encoder = ParquetEncoder(columns, compression)
+    elif fmt == ExportFormat.CSV:
+        encoder = CsvEncoder(columns)
+    else:
+        encoder = JsonlEncoder(columns)
+
+    compress = _gzip_stream() if compression == "gzip" and fmt != ExportFormat.PARQUET else None
+
+    async for rows in batches:
+        # Encoding (and Parquet compression) is CPU-bound; keep it off the event loop
+        chunk = await asyncio.to_thread(encoder.encode, rows)
+        if compress:
+            chunk = compress(chunk)
+        if chunk:
+            yield chunk
+
+    chunk = await asyncio.to_thread(encoder.finish)
+    if compress:
+        chunk = compress(chunk) + compress(None)
+    if chunk:
+        yield chunk
@@ -0,0 +1,155 @@
+"""Weighted fair sharing of upstream concurrency across active eval runs.
+
+Every in-flight upstream stream holds one slot from a process-wide pool.
+Slots are granted per item using start-time fair queuing: each run has a
+virtual clock that advances by 1/weight per granted slot, and the waiting
+run with the smallest clock goes next. Interactive runs carry a larger
+weight than batch runs, so when one arrives it takes over most slots as
+batch items finish - preemption happens at item boundaries, and nothing
+is cancelled mid-stream.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict
+
+from app.core.config import settings
+
+
+class PriorityClass:
+    """Priority classes for eval runs."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+def resolve_priority(requested: str | None, total_items: int) -> str:
+    """Use the requested class, or pick one from the run size."""
+    if requested:
+        return requested
+    if total_items <= settings.interactive_max_items:
+        return PriorityClass.INTERACTIVE
+    return PriorityClass.BATCH
+
+
+def priority_weight(priority: str) -> float:
+    """Fair-share weight for a priority class."""
+    if priority == PriorityClass.INTERACTIVE:
+        return settings.scheduler_interactive_weight
+    return settings.scheduler_batch_weight
+
+
+@dataclass
+class _RunShare:
+    """Scheduler state for one active run."""
+    priority: str
+    weight: float
+    vtime: float = 0.0
+    in_flight: int = 0
+    waiters: deque = field(default_factory=deque)
+
+
+class FairShareScheduler:
+    """Process-wide pool of upstream slots shared fairly between runs."""
+
+    def __init__(self, capacity: int | None = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            capacity: Total concurrent upstream streams (defaults to settings)
+        """
+        self.capacity = capacity or settings.upstream_concurrency
+        self.in_use = 0
+        self._runs: Dict[str, _RunShare] = {}
+
+    def register(self, run_id: str, priority: str) -> None:
+        """Add a run; it starts at the current virtual time so it can't claim a backlog."""
+        if run_id in self._runs:
+            return
+        active = [share.vtime for share in self._runs.values()]
+        self._runs[run_id] = _RunShare(
+            priority=priority,
+            weight=priority_weight(priority),
+            vtime=min(active) if active else 0.0,
+        )
+
+    def unregister(self, run_id: str) -> None:
+        """Remove a finished run."""
+        share = self._runs.pop(run_id, None)
+        if share is None:
+            return
+        for waiter in share.waiters:
+            waiter.cancel()
+
+    async def acquire(self, run_id: str) -> None:
+        """Wait for a slot on behalf of `run_id`."""
+        share = self._runs[run_id]
+        if self.in_use < self.capacity and not self._has_waiters():
+            self._grant(share)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        share.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancellation: give the slot back
+                self.release(run_id)
+            elif waiter in share.waiters:
+                share.waiters.remove(waiter)
+            raise
+
+    def release(self, run_id: str) -> None:
+        """Return a slot and hand it to the next run in fair order."""
+        self.in_use -= 1
+        share = self._runs.get(run_id)
+        if share is not None:
+            share.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, run_id: str) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block."""
+        await self.acquire(run_id)
+        try:
+            yield
+        finally:
+            self.release(run_id)
+
+    def _has_waiters(self) -> bool:
+        return any(share.waiters for share in self._runs.values())
+
+    def _grant(self, share: _RunShare) -> None:
+        self.in_use += 1
+        share.in_flight += 1
+        share.vtime += 1.0 / share.weight
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.capacity:
+            waiting = [share for share in self._runs.values() if share.waiters]
+            if not waiting:
+                return
+            share = min(waiting, key=lambda s: s.vtime)
+            waiter = share.waiters.popleft()
+            if waiter.done():
+                continue
+            self._grant(share)
+            waiter.set_result(None)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-run slot usage, for status reporting."""
+        return {
+            run_id: {
+                "priority": share.priority,
+                "in_flight": share.in_flight,
+                "waiting": len(share.waiters),
+            }
+            for run_id, share in self._runs.items()
+        }
+
+
+# Process-wide scheduler shared by all runs executing in this process
+fair_scheduler = FairShareScheduler()
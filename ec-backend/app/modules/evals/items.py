@@ -0,0 +1,260 @@
+"""Per-item storage keyed by prompt hash, and item-level diffs between runs.
+
+Every finished (or interrupted) run writes one `eval_items` row per item
+with a sha256 of its system and user prompts. The rows are the only copy
+of a run's per-item results: reports, exports and resumes read them, and
+the run itself keeps just the summaries. Two runs are compared by joining
+their items on (input_hash, occurrence) in SQL, so the diff stays
+index-driven for runs with 100k items.
+"""
+
+import asyncio
+import hashlib
+import math
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.modules.common.stats import RunMetrics
+from .export import EXPORT_COLUMNS
+from .models import EvalItem, EvalRun
+
+
+# Rows per executemany batch when storing items
+INSERT_BATCH_SIZE = 5000
+
+# Rows fetched per round trip when streaming a diff
+STREAM_BATCH_SIZE = 1000
+
+
+class DiffFilter:
+    """Which matched items a diff returns."""
+    CHANGES = "changes"  # Pass/fail flipped or output changed
+    FLIPPED = "flipped"  # Pass/fail flipped
+    ALL = "all"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def input_hash(system_prompt: str | None, user_prompt: str | None) -> str:
+    """Stable hash of an item's prompts (NUL-separated so the split is unambiguous)."""
+    return _sha256(f"{system_prompt or ''}\x00{user_prompt or ''}")
+
+
+def build_item_rows(run_id: str, results: List[Dict[str, Any]], inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Item rows for a run's results.
+
+    Repeated prompts within a run get increasing `occurrence` numbers (in
+    input order), so duplicates pair up one-to-one across runs.
+    """
+    seen: Dict[str, int] = {}
+    rows = []
+    for result in sorted(results, key=lambda r: r["index"]):
+        input_data = inputs[result["index"]]
+        digest = input_hash(input_data.get("system_prompt"), input_data.get("user_prompt"))
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+
+        output = result.get("output", "")
+        tokens = result.get("output_tokens", 0)
+        rows.append({
+            "run_id": run_id,
+            "item_index": result["index"],
+            "input_hash": digest,
+            "occurrence": occurrence,
+            "passed": bool(result.get("passed", False)),
+            "latency_ms": result.get("latency_ms"),
+            "failure_reason": result.get("failure_reason"),
+            "output": output,
+            "output_hash": _sha256(output),
+            "input_prompt": result.get("input_prompt"),
+            "output_tokens": tokens,
+            "perplexity": math.exp(-result.get("logprob_sum", 0.0) / tokens) if tokens else None,
+            "aborted": bool(result.get("aborted", False)),
+            "timed_out": bool(result.get("timed_out", False)),
+            "validations": result.get("validations"),
+            "reference_scores": result.get("reference_scores"),
+        })
+    return rows
+
+
+async def store_items(
+    session: AsyncSession,
+    run_id: str,
+    results: List[Dict[str, Any]],
+    inputs: List[Dict[str, Any]],
+) -> int:
+    """
+    Replace a run's item rows (caller commits).
+
+    Returns:
+        Number of rows written
+    """
+    rows = await asyncio.to_thread(build_item_rows, run_id, results, inputs)
+    await session.execute(delete(EvalItem).where(EvalItem.run_id == run_id))
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await session.execute(insert(EvalItem), rows[start:start + INSERT_BATCH_SIZE])
+    return len(rows)
+
+
+def item_result(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stored result dict for an item row keyed like `export.EXPORT_COLUMNS`.
+
+    The logprob sum (not stored) is recovered from perplexity and the token count.
+    """
+    result = {name: value for name, value in row.items() if name != "input_hash"}
+    tokens, perplexity = row.get("output_tokens") or 0, row.get("perplexity")
+    result["logprob_sum"] = -math.log(perplexity) * tokens if perplexity else 0.0
+    return result
+
+
+async def load_results(session: AsyncSession, run_id: str) -> List[Dict[str, Any]]:
+    """A run's stored results in item order (e.g. to resume an interrupted run)."""
+    rows = await session.execute(
+        select(*EXPORT_COLUMNS.values()).where(EvalItem.run_id == run_id).order_by(EvalItem.item_index)
+    )
+    return [item_result(dict(zip(EXPORT_COLUMNS, row))) for row in rows]
+
+
+async def ensure_items(session: AsyncSession, run: EvalRun) -> None:
+    """
+    Move a run's legacy `results` JSON into item rows (commits).
+
+    Runs from before items replaced the JSON get their rows rebuilt from it
+    (older rows may lack the export fields) and a metrics snapshot; the
+    run's `results` and `outputs` are then cleared, so each item is stored
+    once.
+    """
+    if not run.results:
+        return
+
+    inputs = run.inputs
+    if inputs is None and run.parent_id:
+        inputs = (await session.execute(
+            select(EvalRun.inputs).where(EvalRun.id == run.parent_id)
+        )).scalar_one_or_none()
+    results = [{"index": i, **r} for i, r in enumerate(run.results)]
+    await store_items(session, run.id, results, inputs or [])
+
+    # Summaries must not depend on the results once they're gone
+    if run.metrics_state is None:
+        metrics = RunMetrics()
+        for r in results:
+            metrics.record(r.get("passed", False), latency_ms=r.get("latency_ms") or None)
+        run.metrics_state = metrics.to_dict()
+
+    run.results = None
+    run.outputs = None
+    await session.commit()
+
+
+def _join(base_id: str, head_id: str):
+    """Aliased base/head item tables and the ON clause matching items by prompt."""
+    base, head = aliased(EvalItem), aliased(EvalItem)
+    on = and_(
+        head.run_id == head_id,
+        head.input_hash == base.input_hash,
+        head.occurrence == base.occurrence,
+    )
+    return base, head, on
+
+
+async def diff_summary(session: AsyncSession, base_id: str, head_id: str) -> Dict[str, Any]:
+    """Aggregate diff counts and the mean latency delta, computed in SQL."""
+    base, head, on = _join(base_id, head_id)
+    matched = (await session.execute(
+        select(
+            func.count(),
+            func.sum(case((and_(base.passed, ~head.passed), 1), else_=0)),
+            func.sum(case((and_(~base.passed, head.passed), 1), else_=0)),
+            func.sum(case((base.output_hash != head.output_hash, 1), else_=0)),
+            func.avg(head.latency_ms - base.latency_ms),
+        )
+        .select_from(base)
+        .join(head, on)
+        .where(base.run_id == base_id)
+    )).one()
+
+    counts = dict((await session.execute(
+        select(EvalItem.run_id, func.count())
+        .where(EvalItem.run_id.in_([base_id, head_id]))
+        .group_by(EvalItem.run_id)
+    )).all())
+
+    return {
+        "base": base_id,
+        "head": head_id,
+        "matched_items": matched[0],
+        "only_in_base": counts.get(base_id, 0) - matched[0],
+        "only_in_head": counts.get(head_id, 0) - matched[0],
+        "newly_failing": matched[1] or 0,
+        "newly_passing": matched[2] or 0,
+        "output_changed": matched[3] or 0,
+        "avg_latency_delta_ms": matched[4],
+    }
+
+
+async def stream_diff(
+    session: AsyncSession,
+    base_id: str,
+    head_id: str,
+    only: str = DiffFilter.CHANGES,
+    include_outputs: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream matched item pairs in base-item order, filtered in SQL.
+
+    Args:
+        session: Session used for the streaming query
+        base_id: Baseline run
+        head_id: Run compared against the baseline
+        only: DiffFilter value
+        include_outputs: Include both outputs for items whose output changed
+
+    Yields:
+        One dict per matched item pair
+    """
+    base, head, on = _join(base_id, head_id)
+    flipped = base.passed != head.passed
+    changed = base.output_hash != head.output_hash
+
+    columns = [
+        base.item_index, head.item_index, base.input_hash,
+        base.passed, head.passed, base.latency_ms, head.latency_ms,
+        base.failure_reason, head.failure_reason, changed.label("output_changed"),
+    ]
+    if include_outputs:
+        # Only read outputs for pairs that differ
+        columns += [case((changed, base.output)), case((changed, head.output))]
+
+    stmt = select(*columns).select_from(base).join(head, on).where(base.run_id == base_id)
+    if only == DiffFilter.FLIPPED:
+        stmt = stmt.where(flipped)
+    elif only == DiffFilter.CHANGES:
+        stmt = stmt.where(or_(flipped, changed))
+
+    result = await session.stream(
+        stmt.order_by(base.item_index).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async for row in result:
+        item = {
+            "base_index": row[0],
+            "head_index": row[1],
+            "input_hash": row[2],
+            "base_passed": row[3],
+            "head_passed": row[4],
+            "flipped": row[3] != row[4],
+            "latency_delta_ms": row[6] - row[5] if row[5] is not None and row[6] is not None else None,
+            "base_failure_reason": row[7],
+            "head_failure_reason": row[8],
+            "output_changed": bool(row[9]),
+        }
+        if include_outputs and row[9]:
+            item["base_output"], item["head_output"] = row[10], row[11]
+        yield item
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, JSON, DateTime, Enum as SQLEnum, Integer, Float
+from sqlalchemy import Boolean, Column, String, JSON, DateTime, Enum as SQLEnum, Integer, Float, Index, Text, literal_column
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 import enum
 
@@ -16,6 +16,28 @@ class EvalStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class RunType(str, enum.Enum):
+    """Kind of evaluation run."""
+    SINGLE = "single"
+    COMPARISON = "comparison"  # Parent of one lane run per model
+    LANE = "lane"  # One model's pass over its parent's inputs
+
+
+class ExecutionMode(str, enum.Enum):
+    """How a run's items reach the provider."""
+    STREAM = "stream"  # One streamed request per item, under the rate budgets
+    BATCH = "batch"  # One offline provider batch job for all items
+
+
+class JobStatus(str, enum.Enum):
+    """Status of an in-process job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
 
 
 class EvalRun(Base):
@@ -26,15 +48,33 @@ class EvalRun(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     status = Column(String, default=EvalStatus.PENDING.value, nullable=False)
     
+    # Run type; comparison runs own the inputs and lanes reference them via parent_id
+    run_type = Column(String, default=RunType.SINGLE.value, nullable=False)
+    parent_id = Column(String, nullable=True, index=True)
+    models = Column(JSON, nullable=True)  # Comparison runs: models in lane order
+    
     # Configuration
     model = Column(String, nullable=False)
     dataset_name = Column(String, nullable=True)
     metric_config = Column(JSON, nullable=True)  # e.g., {"check_json": true, "check_length": 100}
+    priority = Column(String, default="batch", nullable=False)  # "interactive" or "batch"
+    temperature = Column(Float, nullable=True)
+    max_tokens = Column(Integer, nullable=True)
     
     # Input data (stored as JSON array)
     inputs = Column(JSON, nullable=True)
     
-    # Results
+    # Scheduling (pre-flight token estimate and execution order)
+    estimate = Column(JSON, nullable=True)  # SchedulePlan.summary()
+    schedule = Column(JSON, nullable=True)  # Item indices in execution order
+    stopping_rule = Column(JSON, nullable=True)  # StoppingRule.to_dict(); schedule is then random
+    item_timeout_seconds = Column(Float, nullable=True)  # Per-item stream deadline
+    run_timeout_seconds = Column(Float, nullable=True)  # Deadline from first start
+    execution_mode = Column(String, default=ExecutionMode.STREAM.value, nullable=False)
+    batch = Column(JSON, nullable=True)  # Provider batch job of a batch-mode run: id, key, status, counts
+    cancel_requested = Column(Boolean, default=False, nullable=False)  # Polled by executing workers
+    
+    # Legacy per-item payloads; items now live in eval_items (see `items.ensure_items`)
     outputs = Column(JSON, nullable=True)  # List of model outputs
     results = Column(JSON, nullable=True)  # Aggregated results
     
@@ -46,30 +86,110 @@ class EvalRun(Base):
     avg_latency_ms = Column(Float, nullable=True)
     avg_perplexity = Column(Float, nullable=True)
     pass_rate = Column(Float, nullable=True)
+    metrics_state = Column(JSON, nullable=True)  # Serialized RunMetrics accumulator
+    reference_metrics = Column(JSON, nullable=True)  # Aggregates of scores vs expected_output
+    stopping = Column(JSON, nullable=True)  # Stopping outcome: reason, intervals, items evaluated
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
+    # Archival: inputs / outputs / results and heavy item fields moved to blob storage
+    archived_at = Column(DateTime, nullable=True)
+    archive = Column(JSON, nullable=True)  # Manifest of the archived chunks
+    
     # Error tracking
     error_message = Column(String, nullable=True)
     
+    # Bumped on every write; drives ETag / Last-Modified for polling clients
+    version = Column(Integer, default=0, onupdate=literal_column("version + 1"), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_eval_runs_status_priority", "status", "priority", "created_at"),
+    )
+    
     def to_dict(self) -> dict:
         """Convert model to dictionary."""
         return {
             "id": self.id,
             "status": self.status,
+            "run_type": self.run_type,
+            "parent_id": self.parent_id,
             "model": self.model,
+            "models": self.models,
             "dataset_name": self.dataset_name,
+            "priority": self.priority,
+            "execution_mode": self.execution_mode,
+            "batch": self.batch,
             "metric_config": self.metric_config,
+            "estimate": self.estimate,
             "total_items": self.total_items,
             "completed_items": self.completed_items,
             "avg_latency_ms": self.avg_latency_ms,
             "avg_perplexity": self.avg_perplexity,
             "pass_rate": self.pass_rate,
+            "reference_metrics": self.reference_metrics,
+            "stopping": self.stopping,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "archived_at": self.archived_at.isoformat() if self.archived_at else None,
             "error_message": self.error_message,
         }
+
+
+class EvalItem(Base):
+    """One evaluated item, keyed by a stable hash of its prompts for cross-run joins."""
+    
+    __tablename__ = "eval_items"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String, nullable=False)
+    item_index = Column(Integer, nullable=False)  # Position in the run's inputs
+    
+    # sha256 of system + user prompt; occurrence numbers repeated prompts within a run
+    input_hash = Column(String(64), nullable=False)
+    occurrence = Column(Integer, default=0, nullable=False)
+    
+    passed = Column(Boolean, nullable=False)
+    latency_ms = Column(Float, nullable=True)
+    failure_reason = Column(String, nullable=True)
+    output = Column(Text, nullable=True)
+    output_hash = Column(String(64), nullable=True)
+    
+    # Export and report fields
+    input_prompt = Column(Text, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    perplexity = Column(Float, nullable=True)
+    aborted = Column(Boolean, nullable=True)
+    timed_out = Column(Boolean, nullable=True)
+    validations = Column(JSON, nullable=True)
+    reference_scores = Column(JSON, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_eval_items_run_input", "run_id", "input_hash", "occurrence", unique=True),
+        Index("ix_eval_items_run_index", "run_id", "item_index"),
+        Index("ix_eval_items_input_hash", "input_hash"),
+    )
+
+
+class EvalJob(Base):
+    """Persistent queue entry for the in-process job runner."""
+    
+    __tablename__ = "eval_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    run_id = Column(String, nullable=False, index=True)
+    status = Column(String, default=JobStatus.QUEUED.value, nullable=False, index=True)
+    priority = Column(String, default="batch", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Error tracking
+    error_message = Column(String, nullable=True)
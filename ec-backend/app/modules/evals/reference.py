@@ -0,0 +1,267 @@
+"""Reference-based scoring of outputs against `expected_output`.
+
+Scores every (output, expected_output) pair of a run in one batch:
+
+- exact_match: equality after normalization (case, punctuation, whitespace)
+- token_f1: bag-of-tokens F1, as in SQuAD
+- rouge_l: F1 over the longest common token subsequence
+- char_ngram_f1: F1 over character trigram multisets
+
+Token and n-gram overlaps are computed on sparse (pair, term) count keys
+with NumPy set operations, and LCS runs as a row-wise DP vectorized across
+pairs of similar length, so there are no per-pair Python loops beyond
+normalization and splitting.
+"""
+
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+METRICS = ("exact_match", "token_f1", "rouge_l", "char_ngram_f1")
+
+CHAR_NGRAM = 3
+
+# Hashed n-gram width; keys are pair * 2**NGRAM_HASH_BITS + hash, leaving 23 bits for pairs
+NGRAM_HASH_BITS = 40
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Padded DP cells (pairs x output tokens x reference tokens) per LCS block
+LCS_BLOCK_CELLS = 4_000_000
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def _f1(overlap: np.ndarray, predicted: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """F1 from overlap and multiset sizes; two empty sides score 1, one empty side 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f1 = 2 * overlap / (predicted + reference)
+    return np.where((predicted == 0) & (reference == 0), 1.0, np.nan_to_num(f1))
+
+
+def _multiset_overlap(
+    pred_pairs: np.ndarray,
+    pred_terms: np.ndarray,
+    ref_pairs: np.ndarray,
+    ref_terms: np.ndarray,
+    n_pairs: int,
+    n_terms: int,
+) -> np.ndarray:
+    """
+    Per-pair size of the multiset intersection of term ids.
+
+    Each (pair, term) occurrence becomes one int64 key; counting unique keys
+    on both sides and taking the elementwise minimum over shared keys gives
+    the clipped overlap, summed back per pair.
+    """
+    pred_keys, pred_counts = np.unique(pred_pairs * n_terms + pred_terms, return_counts=True)
+    ref_keys, ref_counts = np.unique(ref_pairs * n_terms + ref_terms, return_counts=True)
+    shared, pred_idx, ref_idx = np.intersect1d(pred_keys, ref_keys, assume_unique=True, return_indices=True)
+    overlap = np.minimum(pred_counts[pred_idx], ref_counts[ref_idx])
+    return np.bincount(shared // n_terms, weights=overlap, minlength=n_pairs)
+
+
+@dataclass
+class TokenBatch:
+    """Token ids for many texts, stored flat with per-text offsets."""
+    ids: np.ndarray
+    offsets: np.ndarray
+    lengths: np.ndarray
+
+    @property
+    def owners(self) -> np.ndarray:
+        """Index of the text each token belongs to."""
+        return np.repeat(np.arange(len(self.lengths)), self.lengths)
+
+    def padded(self, rows: np.ndarray, fill: int) -> np.ndarray:
+        """Token ids of `rows` as a (len(rows), longest) matrix padded with `fill`."""
+        lengths = self.lengths[rows]
+        columns = np.arange(lengths.max())
+        mask = columns < lengths[:, None]
+        positions = np.where(mask, self.offsets[rows, None] + columns, 0)
+        return np.where(mask, self.ids[positions], fill)
+
+    def split(self, n: int) -> Tuple["TokenBatch", "TokenBatch"]:
+        """Split into the first `n` texts and the rest."""
+        boundary = int(self.lengths[:n].sum())
+        head = TokenBatch(self.ids[:boundary], self.offsets[:n], self.lengths[:n])
+        tail = TokenBatch(self.ids[boundary:], self.offsets[n:] - boundary, self.lengths[n:])
+        return head, tail
+
+
+def encode_tokens(texts: List[str]) -> Tuple[TokenBatch, int]:
+    """
+    Split normalized texts into word tokens with ids from a shared vocabulary.
+
+    Returns:
+        (token batch, vocabulary size)
+    """
+    tokens = [text.split() for text in texts]
+    flat = list(chain.from_iterable(tokens))
+    vocab = {token: i for i, token in enumerate(dict.fromkeys(flat))}
+    ids = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    return TokenBatch(ids, offsets, lengths), len(vocab)
+
+
+def token_f1(pred: TokenBatch, ref: TokenBatch, n_terms: int) -> np.ndarray:
+    """Bag-of-tokens F1 for each pair."""
+    overlap = _multiset_overlap(pred.owners, pred.ids, ref.owners, ref.ids, len(pred.lengths), max(n_terms, 1))
+    return _f1(overlap, pred.lengths, ref.lengths)
+
+
+def _char_ngrams(texts: List[str], n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed character n-grams for many strings at once.
+
+    Code points are packed into one uint64 per n-gram (21 bits each), mixed
+    with a multiplicative hash and truncated to NGRAM_HASH_BITS; n-grams
+    crossing string boundaries are masked out.
+
+    Returns:
+        (hashed n-grams, owning pair index, n-gram count per string)
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    chars = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    owners = np.repeat(np.arange(len(texts)), lengths)
+    if len(chars) < n:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.zeros(len(texts), dtype=np.int64)
+
+    width = len(chars) - n + 1
+    codes = np.zeros(width, dtype=np.uint64)
+    for offset in range(n):
+        codes = (codes << np.uint64(21)) | chars[offset:offset + width]
+    hashed = ((codes * _HASH_MULTIPLIER) >> np.uint64(64 - NGRAM_HASH_BITS)).astype(np.int64)
+
+    valid = owners[:width] == owners[n - 1:]
+    hashed, owners = hashed[valid], owners[:width][valid]
+    return hashed, owners, np.bincount(owners, minlength=len(texts))
+
+
+def char_ngram_f1(predictions: List[str], references: List[str], n: int = CHAR_NGRAM) -> np.ndarray:
+    """F1 over character n-gram multisets of the normalized texts."""
+    pred_codes, pred_pairs, pred_counts = _char_ngrams(predictions, n)
+    ref_codes, ref_pairs, ref_counts = _char_ngrams(references, n)
+    overlap = _multiset_overlap(
+        pred_pairs, pred_codes, ref_pairs, ref_codes, len(predictions), 1 << NGRAM_HASH_BITS,
+    )
+    scores = _f1(overlap, pred_counts, ref_counts)
+
+    # Strings too short to have any n-gram fall back to equality
+    short = (pred_counts == 0) | (ref_counts == 0)
+    if short.any():
+        equal = np.array([p == r for p, r in zip(predictions, references)])
+        scores = np.where(short, equal.astype(float), scores)
+    return scores
+
+
+def _lcs_block(pred: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """
+    LCS lengths for a block of padded pairs, vectorized across the block.
+
+    With L[i][0] = 0, row i of the DP is the running maximum along j of
+    max(L[i-1][j], L[i-1][j-1] + 1 if tokens match), so each row is a single
+    `np.maximum.accumulate` over all pairs in the block.
+    """
+    prev = np.zeros((pred.shape[0], ref.shape[1] + 1), dtype=np.int32)
+    for i in range(pred.shape[1]):
+        diagonal = np.where(pred[:, i, None] == ref, prev[:, :-1] + 1, 0)
+        candidate = np.maximum(prev[:, 1:], diagonal)
+        prev[:, 1:] = np.maximum.accumulate(candidate, axis=1)
+    return prev[:, -1]
+
+
+def rouge_l(pred: TokenBatch, ref: TokenBatch) -> np.ndarray:
+    """ROUGE-L F1 for each pair (pairs are bucketed by length to limit padding)."""
+    pred_lengths, ref_lengths = pred.lengths, ref.lengths
+    lcs = np.zeros(len(pred_lengths), dtype=np.float64)
+
+    order = np.lexsort((pred_lengths, ref_lengths))
+    order = order[(pred_lengths[order] > 0) & (ref_lengths[order] > 0)]
+    start = 0
+    while start < len(order):
+        # Grow the block while padded cells stay within budget (sorted by reference length)
+        end = start + 1
+        longest_pred = pred_lengths[order[start]]
+        while end < len(order):
+            longest_pred = max(longest_pred, pred_lengths[order[end]])
+            if (end - start + 1) * ref_lengths[order[end]] * longest_pred > LCS_BLOCK_CELLS:
+                break
+            end += 1
+        block = order[start:end]
+        # Distinct fill values so padding never matches
+        lcs[block] = _lcs_block(pred.padded(block, -1), ref.padded(block, -2))
+        start = end
+
+    return _f1(lcs, pred_lengths, ref_lengths)
+
+
+def score_pairs(predictions: List[str], references: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Score outputs against references in one batch.
+
+    Args:
+        predictions: Model outputs
+        references: Expected outputs, aligned with `predictions`
+
+    Returns:
+        Metric name -> array of per-pair scores in [0, 1]
+    """
+    pred_norm = [normalize_text(p) for p in predictions]
+    ref_norm = [normalize_text(r) for r in references]
+
+    # One vocabulary for both sides so token ids are comparable
+    tokens, n_terms = encode_tokens(pred_norm + ref_norm)
+    pred_tokens, ref_tokens = tokens.split(len(pred_norm))
+
+    return {
+        "exact_match": (np.array(pred_norm, dtype=object) == np.array(ref_norm, dtype=object)).astype(float),
+        "token_f1": token_f1(pred_tokens, ref_tokens, n_terms),
+        "rouge_l": rouge_l(pred_tokens, ref_tokens),
+        "char_ngram_f1": char_ngram_f1(pred_norm, ref_norm),
+    }
+
+
+def aggregate_scores(scores: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Per-metric mean, std and median over the scored items."""
+    scored = len(next(iter(scores.values()))) if scores else 0
+    summary: Dict[str, Any] = {"scored_items": scored}
+    for name, values in scores.items():
+        summary[name] = {
+            "mean": float(values.mean()) if scored else None,
+            "std": float(values.std()) if scored else None,
+            "p50": float(np.median(values)) if scored else None,
+        }
+    return summary
+
+
+def score_results(
+    results: List[Dict[str, Any]],
+    inputs: List[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Score every result whose input has an `expected_output`.
+
+    Writes per-item scores into each result's `reference_scores` and returns
+    run-level aggregates, or None when no input has a reference.
+    """
+    scored = [r for r in results if inputs[r["index"]].get("expected_output") is not None]
+    if not scored:
+        return None
+
+    scores = score_pairs(
+        [r.get("output", "") for r in scored],
+        [inputs[r["index"]]["expected_output"] for r in scored],
+    )
+    for k, result in enumerate(scored):
+        result["reference_scores"] = {name: round(float(values[k]), 4) for name, values in scores.items()}
+    return aggregate_scores(scores)
@@ -1,15 +1,20 @@
 """Evals API routes for batch evaluation processing."""
 
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, and_, or_, func, delete
 from loguru import logger
 
-from app.core.database import get_db
-from .models import EvalRun, EvalStatus
+from app.core.config import settings
+from app.core.database import get_db, async_session_factory
+from app.modules.common.stats import RunMetrics
+from app.modules.common.tokenizer_registry import tokenizer_registry
+from .models import EvalItem, EvalRun, EvalStatus, RunType
 from .schemas import (
     EvalRunRequest,
     EvalRunResponse,
@@ -19,24 +24,59 @@ from .schemas import (
     EvalItemResult,
     EvalListResponse,
     EvalListItem,
+    RunEstimate,
+    PriorityEnum,
+    ExecutionModeEnum,
+    BatchProgress,
+    ComparisonReportResponse,
+    ComparisonLane,
+    ComparisonItem,
+    DiffFilterEnum,
+    RunDiffSummary,
+    ItemDiff,
+    ExportFormatEnum,
 )
-from .tasks import run_evaluation_sync
+from .archive import ArchiveReader, delete_archive, iter_results, merge_item_rows, run_payload
+from .comparison import summarize_lane, diff_items
+from .items import ensure_items, diff_summary, stream_diff
+from .export import (
+    MEDIA_TYPES,
+    export_filename,
+    export_rows,
+    iter_rows,
+    resolve_columns,
+    resolve_compression,
+)
+from .fair_scheduler import PriorityClass, resolve_priority
+from .scheduling import estimate_items, plan_run
+from .stopping import random_order
+from .validators import ValidatorSet
+from .cancellation import CancelReason, signal_cancel
+from .status_cache import RUNS_KEY, conditional_response, make_etag, not_modified, status_cache, ttl_for, validator_headers
+from .runner import job_runner
 
 
 router = APIRouter(prefix="/evals", tags=["Evaluations"])
 
 
-async def run_eval_background(run_id: str):
-    """Background task to run evaluation."""
+async def run_eval_background(run_id: str, priority: str = PriorityClass.BATCH):
+    """Background task to dispatch an evaluation to Celery or the in-process runner."""
     try:
-        # Try Celery first, fall back to sync
-        try:
-            from .tasks import run_evaluation_task
-            run_evaluation_task.delay(run_id)
-            logger.info(f"Dispatched eval {run_id} to Celery")
-        except Exception as e:
-            logger.warning(f"Celery not available, running sync: {e}")
-            run_evaluation_sync(run_id)
+        if settings.job_backend != "inprocess":
+            try:
+                from app.core.celery_app import TASK_PRIORITIES, TASK_QUEUES
+                from .tasks import run_evaluation_task
+                run_evaluation_task.apply_async(
+                    (run_id,), queue=TASK_QUEUES[priority], priority=TASK_PRIORITIES[priority]
+                )
+                logger.info(f"Dispatched eval {run_id} to Celery ({priority})")
+                return
+            except Exception as e:
+                if settings.job_backend == "celery":
+                    raise
+                logger.warning(f"Celery not available, using in-process runner: {e}")
+        
+        await job_runner.submit(run_id, priority)
     except Exception as e:
         logger.error(f"Failed to run evaluation: {e}")
 
@@ -50,36 +90,117 @@ async def create_eval_run(
     """
     Create and start a new evaluation run.
     
-    Returns immediately with a run_id. Use /status/{run_id} to check progress.
+    With `models`, creates a comparison run: one lane per model over a
+    single shared copy of the inputs, all lanes executed concurrently.
+    With `stopping`, items run in random order and the run stops as soon
+    as the stopping rule is met. With `execution_mode=batch`, items go to
+    the provider as one offline batch job instead of live streams.
+    
+    Returns immediately with a run_id and a pre-flight token/cost/ETA
+    estimate. Use /status/{run_id} to check progress.
     """
+    # Reject unknown validators or bad params (e.g. invalid regex) up front
+    metric_config = request.metric_config.model_dump() if request.metric_config else None
+    try:
+        ValidatorSet(metric_config)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
     try:
         # Create eval run
         run_id = str(uuid.uuid4())
+        inputs = [inp.model_dump() for inp in request.inputs]
+        models = request.models or [request.model]
+        priority = resolve_priority(request.priority.value if request.priority else None, len(inputs))
+        
+        # Pre-flight: estimate tokens with each model's tokenizer and schedule items
+        # (tokenizing is CPU-bound; models sharing a tokenizer share the counts)
+        estimates = {}
+        for model in models:
+            tokenizer = tokenizer_registry.resolve(model)
+            if tokenizer not in estimates:
+                estimates[tokenizer] = await asyncio.to_thread(estimate_items, inputs, request.max_tokens, model)
+        plans = {
+            model: plan_run(inputs, model, request.max_tokens, estimates=estimates[tokenizer_registry.resolve(model)])
+            for model in models
+        }
         
-        eval_run = EvalRun(
-            id=run_id,
-            status=EvalStatus.PENDING.value,
-            model=request.model,
+        # Stopping rules need items in random order for an unbiased running estimate
+        stopping_rule = request.stopping.model_dump(mode="json") if request.stopping else None
+        if stopping_rule:
+            order = random_order(len(inputs), request.stopping.seed)
+            for plan in plans.values():
+                plan.order = order
+        
+        common = dict(
             dataset_name=request.dataset_name,
-            metric_config=request.metric_config.model_dump() if request.metric_config else None,
-            inputs=[inp.model_dump() for inp in request.inputs],
-            total_items=len(request.inputs),
+            metric_config=metric_config,
+            priority=priority,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            stopping_rule=stopping_rule,
+            item_timeout_seconds=request.item_timeout_seconds,
+            run_timeout_seconds=request.run_timeout_seconds,
+            execution_mode=request.execution_mode.value,
+            total_items=len(inputs),
             completed_items=0,
             created_at=datetime.utcnow(),
         )
         
-        db.add(eval_run)
+        lanes = None
+        if request.models:
+            lanes = {model: str(uuid.uuid4()) for model in models}
+            estimate = combine_estimates([plan.summary() for plan in plans.values()])
+            eval_run = EvalRun(
+                id=run_id,
+                status=EvalStatus.PENDING.value,
+                run_type=RunType.COMPARISON.value,
+                model=" vs ".join(models),
+                models=models,
+                inputs=inputs,
+                estimate=estimate,
+                schedule=plans[models[0]].order,
+                **{**common, "total_items": len(inputs) * len(models)},
+            )
+            db.add(eval_run)
+            for model, lane_id in lanes.items():
+                db.add(EvalRun(
+                    id=lane_id,
+                    status=EvalStatus.PENDING.value,
+                    run_type=RunType.LANE.value,
+                    parent_id=run_id,
+                    model=model,
+                    estimate=plans[model].summary(),
+                    **common,
+                ))
+        else:
+            plan = plans[request.model]
+            estimate = plan.summary()
+            eval_run = EvalRun(
+                id=run_id,
+                status=EvalStatus.PENDING.value,
+                model=request.model,
+                inputs=inputs,
+                estimate=estimate,
+                schedule=plan.order,
+                **common,
+            )
+            db.add(eval_run)
+        
         await db.commit()
         
         # Start background processing
-        background_tasks.add_task(run_eval_background, run_id)
+        background_tasks.add_task(run_eval_background, run_id, priority)
         
-        logger.info(f"Created eval run {run_id} with {len(request.inputs)} items")
+        logger.info(f"Created eval run {run_id} with {len(inputs)} items x {len(models)} model(s)")
         
         return EvalRunResponse(
             run_id=run_id,
             status=EvalStatusEnum.PENDING,
-            total_items=len(request.inputs),
+            total_items=eval_run.total_items,
+            priority=PriorityEnum(priority),
+            estimate=RunEstimate(**estimate),
+            lanes=lanes,
         )
     
     except Exception as e:
@@ -87,26 +208,158 @@ async def create_eval_run(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def combine_estimates(estimates: List[dict]) -> dict:
+    """Combine lane estimates: tokens and cost add up, lanes run concurrently."""
+    costs = [e["estimated_cost_usd"] for e in estimates if e["estimated_cost_usd"] is not None]
+    return {
+        "input_tokens": sum(e["input_tokens"] for e in estimates),
+        "output_tokens": sum(e["output_tokens"] for e in estimates),
+        "total_tokens": sum(e["total_tokens"] for e in estimates),
+        "estimated_cost_usd": round(sum(costs), 6) if costs else None,
+        "eta_seconds": max(e["eta_seconds"] for e in estimates),
+        "tpm_limit": estimates[0]["tpm_limit"],
+        "rpm_limit": estimates[0]["rpm_limit"],
+        "concurrency": sum(e["concurrency"] for e in estimates),
+    }
+
+
+def _remaining_seconds(estimate: dict | None, total_items: int, completed_items: int) -> float:
+    """Remaining estimated wall time of a run from its pre-flight ETA."""
+    if not estimate or not total_items:
+        return 0.0
+    return estimate.get("eta_seconds", 0.0) * (1 - (completed_items or 0) / total_items)
+
+
+def _run_capacity() -> tuple[int, int]:
+    """(shared, interactive-only) run slots of the backend executing runs."""
+    if settings.job_backend == "inprocess" or job_runner.started:
+        return settings.job_runner_concurrency, settings.job_runner_interactive_concurrency
+    return settings.celery_worker_concurrency, settings.celery_interactive_concurrency
+
+
+async def get_queue_position(db: AsyncSession, run: EvalRun) -> tuple[int, datetime]:
+    """
+    Position of a pending run in the queue and its estimated start time.
+    
+    Runs ahead are pending interactive runs (for batch runs) and older pending
+    runs of the same class. The start estimate spreads the remaining ETA of
+    those runs and of processing runs over the slots the run can use: batch
+    runs only get the shared slots. Interactive runs also get the reserved
+    ones, and processing batch runs only hold them up while they occupy
+    shared slots.
+    """
+    ahead = and_(EvalRun.priority == run.priority, EvalRun.created_at < run.created_at)
+    if run.priority != PriorityClass.INTERACTIVE:
+        ahead = or_(EvalRun.priority == PriorityClass.INTERACTIVE, ahead)
+    
+    stmt = select(
+        EvalRun.status, EvalRun.priority, EvalRun.estimate, EvalRun.total_items, EvalRun.completed_items
+    ).where(
+        EvalRun.parent_id.is_(None),
+        or_(
+            EvalRun.status == EvalStatus.PROCESSING.value,
+            and_(EvalRun.status == EvalStatus.PENDING.value, EvalRun.id != run.id, ahead),
+        ),
+    )
+    rows = (await db.execute(stmt)).all()
+    
+    position = 1 + sum(1 for row in rows if row.status == EvalStatus.PENDING.value)
+    shared, reserved = _run_capacity()
+    if run.priority == PriorityClass.INTERACTIVE:
+        # Batch runs never take reserved slots, and queued ones don't run ahead
+        batch = [row for row in rows if row.priority != PriorityClass.INTERACTIVE]
+        slots = reserved + max(0, shared - len(batch))
+        if slots:
+            rows = [row for row in rows if row.priority == PriorityClass.INTERACTIVE]
+        else:
+            # Nothing reserved and batch runs hold every slot: wait for them too
+            slots = shared
+    else:
+        slots = shared
+    backlog = sum(_remaining_seconds(row.estimate, row.total_items, row.completed_items) for row in rows)
+    wait_seconds = backlog / max(1, slots)
+    return position, datetime.utcnow() + timedelta(seconds=wait_seconds)
+
+
 @router.get("/status/{run_id}", response_model=EvalStatusResponse)
 async def get_eval_status(
     run_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the current status and progress of an evaluation run."""
+    """
+    Get the current status and progress of an evaluation run.
+    
+    Supports conditional GETs (ETag / Last-Modified from the run's write
+    version); recently served payloads are answered from cache.
+    """
+    cached = status_cache.get(run_id)
+    if cached:
+        return conditional_response(request, response, cached)
+    
     run = await db.get(EvalRun, run_id)
     
     if not run:
         raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
     
-    progress = (run.completed_items / run.total_items * 100) if run.total_items > 0 else 0
+    completed_items = run.completed_items
+    lanes_version, last_modified = 0, run.updated_at
+    if run.run_type == RunType.COMPARISON.value:
+        # Progress of a comparison run is the sum over its lanes
+        completed_items, lanes_version, lanes_modified = (await db.execute(
+            select(
+                func.coalesce(func.sum(EvalRun.completed_items), 0),
+                func.coalesce(func.sum(EvalRun.version), 0),
+                func.max(EvalRun.updated_at),
+            ).where(EvalRun.parent_id == run.id)
+        )).one()
+        last_modified = max(last_modified, lanes_modified or last_modified)
+    
+    progress = (completed_items / run.total_items * 100) if run.total_items > 0 else 0
+    summary = RunMetrics.from_dict(run.metrics_state).summary() if run.metrics_state else {}
+    
+    queue_position, estimated_start_at = None, None
+    if run.status == EvalStatus.PENDING.value:
+        queue_position, estimated_start_at = await get_queue_position(db, run)
     
-    return EvalStatusResponse(
+    payload = EvalStatusResponse(
         run_id=run.id,
         status=EvalStatusEnum(run.status),
         total_items=run.total_items,
-        completed_items=run.completed_items,
+        completed_items=completed_items,
         progress_percent=round(progress, 1),
         error_message=run.error_message,
+        pass_rate=summary.get("pass_rate", run.pass_rate),
+        pass_rate_ci=summary.get("pass_rate_ci"),
+        avg_latency_ms=summary.get("avg_latency_ms", run.avg_latency_ms),
+        latency_std_ms=summary.get("latency_std_ms"),
+        latency_ci_ms=summary.get("latency_ci_ms"),
+        priority=PriorityEnum(run.priority) if run.priority else None,
+        queue_position=queue_position,
+        estimated_start_at=estimated_start_at,
+        execution_mode=ExecutionModeEnum(run.execution_mode) if run.execution_mode else None,
+        batch=BatchProgress(**run.batch) if run.batch else None,
+    )
+    
+    # Pending runs also change when the queue ahead of them moves
+    etag = make_etag(run.version, lanes_version, queue_position or 0)
+    entry = status_cache.set(run_id, payload, etag, last_modified, ttl_for(run.status))
+    return conditional_response(request, response, entry)
+
+
+def _item_result(r: dict) -> EvalItemResult:
+    """Report entry for one stored result (item columns may be null on older rows)."""
+    return EvalItemResult(
+        input_prompt=r.get("input_prompt") or "",
+        output=r.get("output") or "",
+        latency_ms=r.get("latency_ms") or 0,
+        perplexity=r.get("perplexity"),
+        passed=bool(r.get("passed")),
+        failure_reason=r.get("failure_reason"),
+        validations=r.get("validations") or [],
+        timed_out=bool(r.get("timed_out")),
+        reference_scores=r.get("reference_scores"),
     )
 
 
@@ -116,68 +369,253 @@ async def get_eval_report(
     include_results: bool = True,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the full report for a completed evaluation run."""
+    """
+    Get the full report for a completed evaluation run.
+    
+    Results are read from the run's item rows (archived fields rehydrated
+    chunk by chunk) and the report is streamed, so memory stays bounded by
+    one batch.
+    """
     run = await db.get(EvalRun, run_id)
     
     if not run:
         raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
     
-    results = run.results or []
-    
-    # Calculate metrics
-    passed_items = sum(1 for r in results if r.get("passed", False))
-    failed_items = len(results) - passed_items
-    latencies = [r.get("latency_ms", 0) for r in results if r.get("latency_ms")]
-    
-    # Build detailed results if requested
-    detailed_results = None
-    if include_results and results:
-        detailed_results = [
-            EvalItemResult(
-                input_prompt=r.get("input_prompt", ""),
-                output=r.get("output", ""),
-                latency_ms=r.get("latency_ms", 0),
-                perplexity=r.get("perplexity"),
-                passed=r.get("passed", False),
-                failure_reason=r.get("failure_reason"),
-            )
-            for r in results
-        ]
+    # Runs finished before item rows existed are converted (and get a metrics snapshot) on first read
+    await ensure_items(db, run)
+    summary = RunMetrics.from_dict(run.metrics_state).summary()
     
-    return EvalReportResponse(
+    report = EvalReportResponse(
         run_id=run.id,
         status=EvalStatusEnum(run.status),
         model=run.model,
         dataset_name=run.dataset_name,
         total_items=run.total_items,
-        passed_items=passed_items,
-        failed_items=failed_items,
+        passed_items=summary["passed_items"],
+        failed_items=summary["failed_items"],
         pass_rate=run.pass_rate or 0,
         avg_latency_ms=run.avg_latency_ms or 0,
-        min_latency_ms=min(latencies) if latencies else 0,
-        max_latency_ms=max(latencies) if latencies else 0,
+        min_latency_ms=summary["min_latency_ms"] or 0,
+        max_latency_ms=summary["max_latency_ms"] or 0,
+        latency_std_ms=summary["latency_std_ms"],
+        latency_ci_ms=summary["latency_ci_ms"],
+        pass_rate_ci=summary["pass_rate_ci"],
         avg_perplexity=run.avg_perplexity,
+        reference_metrics=run.reference_metrics,
+        stopping=run.stopping,
+        estimate=RunEstimate(**run.estimate) if run.estimate else None,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        completed_at=run.completed_at,
+        archived_at=run.archived_at,
+    )
+    
+    if not include_results:
+        return report
+    
+    async def generate():
+        head = report.model_dump_json(exclude={"results"})
+        yield head[:-1] + ',"results":['
+        separator = ""
+        # The request's session may close before the response finishes streaming
+        async with async_session_factory() as session:
+            async for batch in iter_results(session, run):
+                yield separator + ",".join(_item_result(r).model_dump_json() for r in batch)
+                separator = ","
+        yield "]}"
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+@router.get("/report/{run_id}/comparison", response_model=ComparisonReportResponse)
+async def get_comparison_report(
+    run_id: str,
+    include_items: bool = True,
+    disagreements_only: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the side-by-side report for a comparison run.
+    
+    Lanes report pass rate, latency percentiles and perplexity per model;
+    items give the per-input diff across models.
+    """
+    run = await db.get(EvalRun, run_id)
+    
+    if not run:
+        raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
+    if run.run_type != RunType.COMPARISON.value:
+        raise HTTPException(status_code=400, detail=f"Eval run {run_id} is not a comparison run")
+    
+    lanes = (await db.execute(select(EvalRun).where(EvalRun.parent_id == run_id))).scalars().all()
+    order = {model: i for i, model in enumerate(run.models or [])}
+    lanes = sorted(lanes, key=lambda lane: order.get(lane.model, len(order)))
+    
+    # Archived payloads are rehydrated transparently
+    inputs = await run_payload(run, "inputs") or []
+    lane_results = []
+    for lane in lanes:
+        await ensure_items(db, lane)
+        lane_results.append([r async for batch in iter_results(db, lane) for r in batch])
+    
+    items = None
+    if include_items:
+        items = [
+            ComparisonItem(**item)
+            for item in diff_items(inputs, lanes, lane_results, disagreements_only)
+        ]
+    
+    return ComparisonReportResponse(
+        run_id=run.id,
+        status=EvalStatusEnum(run.status),
+        dataset_name=run.dataset_name,
+        total_items=len(inputs),
+        lanes=[ComparisonLane(**summarize_lane(lane, results)) for lane, results in zip(lanes, lane_results)],
+        items=items,
         created_at=run.created_at,
         started_at=run.started_at,
         completed_at=run.completed_at,
-        results=detailed_results,
+        archived_at=run.archived_at,
     )
 
 
+@router.get("/compare")
+async def compare_runs(
+    base: str,
+    head: str,
+    only: DiffFilterEnum = DiffFilterEnum.CHANGES,
+    include_outputs: bool = True,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Item-level diff between two runs, streamed as NDJSON.
+    
+    Items are matched by a hash of their prompts, so the runs may use
+    different datasets or orderings. The first line is a RunDiffSummary,
+    followed by one ItemDiff per matched item (filtered by `only`).
+    """
+    runs = {}
+    for run_id in (base, head):
+        run = await db.get(EvalRun, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
+        if run.run_type == RunType.COMPARISON.value:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Eval run {run_id} is a comparison run; compare one of its lanes instead",
+            )
+        runs[run_id] = run
+    
+    # Runs finished before item rows existed are indexed on first compare
+    for run in runs.values():
+        await ensure_items(db, run)
+    
+    # Outputs of archived runs are looked up chunk by chunk in the archive
+    readers = {run_id: ArchiveReader(run) for run_id, run in runs.items() if run.archived_at is not None}
+    
+    async def generate():
+        # The request's session may close before the response finishes streaming
+        async with async_session_factory() as session:
+            summary = RunDiffSummary(**await diff_summary(session, base, head))
+            yield summary.model_dump_json() + "\n"
+            async for item in stream_diff(session, base, head, only.value, include_outputs):
+                if include_outputs and item["output_changed"]:
+                    for side, run_id in (("base", base), ("head", head)):
+                        if run_id in readers:
+                            record = await readers[run_id].item(item[f"{side}_index"])
+                            item[f"{side}_output"] = record["output"] if record else None
+                yield ItemDiff(**item).model_dump_json() + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/{run_id}/export")
+async def export_run(
+    run_id: str,
+    format: ExportFormatEnum = ExportFormatEnum.JSONL,
+    columns: Optional[str] = None,
+    compression: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream a finished run's items as JSONL, CSV or Parquet.
+    
+    Rows are read and encoded in batches, so memory stays bounded for any
+    run size. `columns` is a comma-separated projection; `compression` is
+    gzip for JSONL/CSV and snappy, gzip or zstd for Parquet.
+    """
+    run = await db.get(EvalRun, run_id)
+    
+    if not run:
+        raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
+    if run.run_type == RunType.COMPARISON.value:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Eval run {run_id} is a comparison run; export one of its lanes instead",
+        )
+    if run.status not in (EvalStatus.COMPLETED.value, EvalStatus.FAILED.value, EvalStatus.CANCELLED.value):
+        raise HTTPException(status_code=400, detail=f"Eval run {run_id} has not finished")
+    
+    try:
+        projection = resolve_columns(columns)
+        codec = resolve_compression(format.value, compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await ensure_items(db, run)
+    reader = ArchiveReader(run) if run.archived_at is not None else None
+    
+    async def generate():
+        # The request's session may close before the response finishes streaming
+        async with async_session_factory() as session:
+            if reader is None:
+                batches = iter_rows(session, run_id, projection)
+            else:
+                # Archived item fields are merged in from the archive, in item order
+                keyed = list(dict.fromkeys(["index", *projection]))
+                batches = merge_item_rows(iter_rows(session, run_id, keyed), reader, projection)
+            async for chunk in export_rows(batches, format.value, projection, codec):
+                yield chunk
+    
+    # Gzipped text downloads as a .gz file rather than with Content-Encoding
+    media_type = "application/gzip" if format != ExportFormatEnum.PARQUET and codec == "gzip" else MEDIA_TYPES[format.value]
+    headers = {"Content-Disposition": f'attachment; filename="{export_filename(run_id, format.value, codec)}"'}
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
+
+
 @router.get("/runs", response_model=EvalListResponse)
 async def list_eval_runs(
+    request: Request,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
     db: AsyncSession = Depends(get_db),
 ):
-    """List all evaluation runs."""
-    # Get total count
-    count_stmt = select(EvalRun)
-    all_runs = (await db.execute(count_stmt)).scalars().all()
-    total = len(all_runs)
+    """
+    List all evaluation runs (comparison lanes are listed under their parent).
+    
+    Supports conditional GETs; the ETag covers the count and write versions
+    of all top-level runs, so a 304 skips loading the page.
+    """
+    cache_key = (RUNS_KEY, limit, offset)
+    cached = status_cache.get(cache_key)
+    if cached:
+        return conditional_response(request, response, cached)
+    
+    top_level = EvalRun.parent_id.is_(None)
+    
+    # Get total count and the listing's validators
+    count_stmt = select(
+        func.count(), func.coalesce(func.sum(EvalRun.version), 0), func.max(EvalRun.updated_at)
+    ).where(top_level)
+    total, version_sum, last_modified = (await db.execute(count_stmt)).one()
+    last_modified = last_modified or datetime(1970, 1, 1)
+    etag = make_etag(total, version_sum, int(last_modified.timestamp() * 1000))
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
     
     # Get paginated runs
-    stmt = select(EvalRun).order_by(desc(EvalRun.created_at)).offset(offset).limit(limit)
+    stmt = select(EvalRun).where(top_level).order_by(desc(EvalRun.created_at)).offset(offset).limit(limit)
     result = await db.execute(stmt)
     runs = result.scalars().all()
     
@@ -185,6 +623,7 @@ async def list_eval_runs(
         EvalListItem(
             id=run.id,
             status=run.status,
+            run_type=run.run_type,
             model=run.model,
             dataset_name=run.dataset_name,
             total_items=run.total_items,
@@ -196,7 +635,45 @@ async def list_eval_runs(
         for run in runs
     ]
     
-    return EvalListResponse(runs=items, total=total)
+    payload = EvalListResponse(runs=items, total=total)
+    entry = status_cache.set(cache_key, payload, etag, last_modified, settings.status_cache_ttl_seconds)
+    return conditional_response(request, response, entry)
+
+
+@router.post("/{run_id}/cancel")
+async def cancel_eval_run(
+    run_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cancel a pending or running evaluation run (and its lanes).
+    
+    Pending runs are cancelled immediately. Running ones stop within about
+    a second: in-flight upstream streams are closed and items finished so
+    far are kept in the report.
+    """
+    run = await db.get(EvalRun, run_id)
+    
+    if not run:
+        raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
+    if run.status not in (EvalStatus.PENDING.value, EvalStatus.PROCESSING.value):
+        raise HTTPException(status_code=400, detail=f"Eval run {run_id} is already {run.status}")
+    
+    lanes = (await db.execute(select(EvalRun).where(EvalRun.parent_id == run_id))).scalars().all()
+    for target in [run, *lanes]:
+        target.cancel_requested = True
+        # Queued work never starts; executing runs finish their own bookkeeping
+        if target.status == EvalStatus.PENDING.value:
+            target.status = EvalStatus.CANCELLED.value
+            target.completed_at = datetime.utcnow()
+            target.error_message = "Cancelled before start"
+    await db.commit()
+    
+    # Runs executing in this process stop now; workers elsewhere see the flag on their next poll
+    signalled = [target.id for target in [run, *lanes] if signal_cancel(target.id)]
+    logger.info(f"Cancel requested for eval run {run_id} ({len(signalled)} executing locally)")
+    
+    return {"message": f"Cancellation requested for eval run {run_id}", "status": run.status}
 
 
 @router.delete("/{run_id}")
@@ -210,7 +687,23 @@ async def delete_eval_run(
     if not run:
         raise HTTPException(status_code=404, detail=f"Eval run {run_id} not found")
     
+    # Stop executing runs rather than leaving them streaming for a deleted row
+    lane_ids = select(EvalRun.id).where(EvalRun.parent_id == run_id)
+    for target_id in [run_id, *(await db.execute(lane_ids)).scalars().all()]:
+        signal_cancel(target_id, CancelReason.DELETED)
+    
+    archived_ids = (await db.execute(
+        select(EvalRun.id).where(or_(EvalRun.id == run_id, EvalRun.parent_id == run_id), EvalRun.archived_at.is_not(None))
+    )).scalars().all()
+    
+    await db.execute(delete(EvalItem).where(or_(EvalItem.run_id == run_id, EvalItem.run_id.in_(lane_ids))))
+    await db.execute(delete(EvalRun).where(EvalRun.parent_id == run_id))
     await db.delete(run)
     await db.commit()
+    # Bulk lane deletes bypass the ORM events
+    status_cache.invalidate()
+    
+    for archived_id in archived_ids:
+        await delete_archive(archived_id)
     
     return {"message": f"Eval run {run_id} deleted"}
@@ -0,0 +1,223 @@
+"""In-process asyncio job runner for single-node deployments.
+
+Runs evaluations on the API's own event loop when Celery/Redis isn't used.
+Jobs are persisted in `eval_jobs`, so queued and interrupted runs survive a
+restart. Jobs are claimed interactive-first; at most `job_runner_concurrency`
+runs execute at once, plus `job_runner_interactive_concurrency` slots that
+only interactive runs may use so they never wait behind long batch runs.
+"""
+
+import asyncio
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.modules.common.llm_client import GroqLLMClient
+from .fair_scheduler import PriorityClass
+from .models import EvalJob, EvalRun, EvalStatus, JobStatus
+
+
+class InProcessJobRunner:
+    """Persistent, concurrency-bounded job queue executed on the running event loop."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session_factory,
+        concurrency: int | None = None,
+    ):
+        """
+        Initialize the runner (call `start()` from inside the event loop).
+
+        Args:
+            session_factory: Session factory for job and run persistence
+            concurrency: Max runs executing at once (defaults to settings)
+        """
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.job_runner_concurrency
+        self.interactive_concurrency = settings.job_runner_interactive_concurrency
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._running: dict[str, asyncio.Task] = {}
+        self._client: GroqLLMClient | None = None
+        self._stopping = False
+
+    @property
+    def started(self) -> bool:
+        """Whether the dispatcher is running."""
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self) -> None:
+        """Recover jobs from a previous process and start dispatching."""
+        if self.started:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+
+        # Jobs left running by a crashed process go back to the queue
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(EvalJob)
+                .where(EvalJob.status == JobStatus.RUNNING.value)
+                .values(status=JobStatus.QUEUED.value)
+            )
+            await session.commit()
+            if result.rowcount:
+                logger.warning(f"Re-queued {result.rowcount} interrupted eval jobs")
+
+        self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="eval-job-dispatcher")
+        self._wakeup.set()
+        logger.info(f"In-process job runner started (concurrency={self.concurrency})")
+
+    async def submit(self, run_id: str, priority: str = PriorityClass.BATCH) -> str:
+        """
+        Persist a job for an eval run and wake the dispatcher.
+
+        Args:
+            run_id: Eval run to execute
+            priority: Priority class of the run
+
+        Returns:
+            Job identifier
+        """
+        job = EvalJob(
+            run_id=run_id,
+            status=JobStatus.QUEUED.value,
+            priority=priority,
+            created_at=datetime.utcnow(),
+        )
+        async with self.session_factory() as session:
+            session.add(job)
+            await session.commit()
+
+        if not self.started:
+            await self.start()
+        self._wakeup.set()
+        logger.info(f"Queued eval {run_id} on in-process runner (job {job.id})")
+        return job.id
+
+    async def _dispatch_loop(self) -> None:
+        """Claim queued jobs whenever there is free capacity."""
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while not self._stopping:
+                if len(self._running) < self.concurrency:
+                    job = await self._claim_next()
+                elif len(self._running) < self.concurrency + self.interactive_concurrency:
+                    job = await self._claim_next(interactive_only=True)
+                else:
+                    break
+                if job is None:
+                    break
+                task = asyncio.create_task(self._run_job(job.id, job.run_id), name=f"eval-job-{job.id}")
+                self._running[job.id] = task
+
+    async def _claim_next(self, interactive_only: bool = False) -> EvalJob | None:
+        """Atomically move the next queued job (interactive first, then oldest) to running."""
+        async with self.session_factory() as session:
+            stmt = select(EvalJob).where(EvalJob.status == JobStatus.QUEUED.value)
+            if interactive_only:
+                stmt = stmt.where(EvalJob.priority == PriorityClass.INTERACTIVE)
+            job = (await session.execute(
+                stmt
+                .order_by(case((EvalJob.priority == PriorityClass.INTERACTIVE, 0), else_=1), EvalJob.created_at)
+                .limit(1)
+            )).scalars().first()
+            if job is None:
+                return None
+
+            # Conditional update so a concurrent claimer can't take the same job
+            result = await session.execute(
+                update(EvalJob)
+                .where(EvalJob.id == job.id, EvalJob.status == JobStatus.QUEUED.value)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    attempts=EvalJob.attempts + 1,
+                    started_at=datetime.utcnow(),
+                )
+            )
+            await session.commit()
+            return job if result.rowcount else None
+
+    def _get_client(self) -> GroqLLMClient | None:
+        """Shared LLM client for all jobs (None lets the run fail with a config error)."""
+        if self._client is None:
+            try:
+                self._client = GroqLLMClient()
+            except ValueError:
+                return None
+        return self._client
+
+    async def _run_job(self, job_id: str, run_id: str) -> None:
+        """Execute one job with the same code path as the Celery task."""
+        # The executor (and the Celery app it registers with) loads on the first job
+        from .tasks import execute_run
+        
+        status = JobStatus.DONE
+        error = None
+        try:
+            await execute_run(run_id, self.session_factory, self._get_client())
+
+            async with self.session_factory() as session:
+                run = await session.get(EvalRun, run_id)
+                if run is None or run.status == EvalStatus.FAILED.value:
+                    status = JobStatus.FAILED
+                    error = run.error_message if run else "Eval run not found"
+
+        except asyncio.CancelledError:
+            # Shutdown: the run has already persisted finished items
+            status = JobStatus.QUEUED
+            raise
+        except Exception as e:
+            logger.error(f"Eval job {job_id} failed: {e}")
+            status = JobStatus.FAILED
+            error = str(e)
+        finally:
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(EvalJob)
+                    .where(EvalJob.id == job_id)
+                    .values(
+                        status=status.value,
+                        error_message=error,
+                        finished_at=None if status == JobStatus.QUEUED else datetime.utcnow(),
+                    )
+                )
+                await session.commit()
+            self._running.pop(job_id, None)
+            if not self._stopping:
+                self._wakeup.set()
+
+    async def shutdown(self, timeout: float | None = None) -> None:
+        """
+        Stop dispatching and interrupt running jobs.
+
+        Unfinished items are re-queued: each run persists its completed items
+        and its job returns to the queue for the next process to resume.
+        """
+        if not self.started:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._dispatcher
+
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout or settings.job_runner_shutdown_timeout)
+            logger.info(f"Re-queued {len(tasks)} running eval jobs on shutdown")
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._dispatcher = None
+
+
+# Process-wide runner used by the API
+job_runner = InProcessJobRunner()
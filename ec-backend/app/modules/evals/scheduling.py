@@ -0,0 +1,257 @@
+"""Token-budget-aware scheduling for eval items.
+
+A pre-flight pass estimates input/output tokens per item, then orders items
+so that every rate-limit window uses both its token (TPM) and request (RPM)
+budget, instead of bunching long prompts together. The same pass produces an
+ETA and cost estimate. At run time, each key of the API key pool enforces
+both budgets (see `app.modules.common.key_pool`); plans assume the pool's
+combined budget.
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Iterable, List, TypeVar
+
+from loguru import logger
+
+from app.core.config import settings
+from app.modules.common.key_pool import SECONDS_PER_WINDOW, key_pool
+from app.modules.common.tokenizer_registry import TokenizerUnavailable, tokenizer_registry
+
+
+# Approximate USD per 1M tokens (input, output). Unknown models get no cost estimate.
+MODEL_PRICING: dict[str, tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.2-1b-preview": (0.04, 0.04),
+    "llama-3.2-3b-preview": (0.06, 0.06),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "gemma2-9b-it": (0.20, 0.20),
+}
+
+# Chat formatting overhead: per message, plus reply priming
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+T = TypeVar("T")
+
+
+@dataclass
+class ItemEstimate:
+    """Estimated token usage for one eval item."""
+    index: int
+    input_tokens: int
+    output_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass
+class SchedulePlan:
+    """Execution order plus pre-flight estimates for a run."""
+    order: List[int]
+    input_tokens: int
+    output_tokens: int
+    estimated_cost_usd: float | None
+    eta_seconds: float
+    tpm_limit: int
+    rpm_limit: int
+    concurrency: int
+
+    def summary(self) -> Dict[str, Any]:
+        """Estimate fields without the (potentially large) order list."""
+        data = asdict(self)
+        data.pop("order")
+        data["total_tokens"] = self.input_tokens + self.output_tokens
+        return data
+
+
+def count_tokens_batch(texts: List[str], model: str | None = None) -> List[int]:
+    """Count tokens with the model's tokenizer (~4 chars/token when none is installed)."""
+    try:
+        tokenizer = tokenizer_registry.get(model)
+    except TokenizerUnavailable as e:
+        logger.warning(f"{e}; estimating tokens from length")
+        return [math.ceil(len(text) / 4) for text in texts]
+    return [len(ids) for ids in tokenizer.encode_batch(texts)]
+
+
+def estimate_items(inputs: List[Dict[str, Any]], max_tokens: int, model: str | None = None) -> List[ItemEstimate]:
+    """
+    Estimate input and output tokens for each item.
+
+    Output is estimated from `expected_output` when present, otherwise from
+    `settings.eval_default_output_tokens`; both are capped at `max_tokens`.
+
+    Args:
+        inputs: Eval inputs (dicts with system_prompt/user_prompt/expected_output)
+        max_tokens: Generation limit for the run
+        model: Model whose tokenizer counts the tokens
+
+    Returns:
+        One ItemEstimate per input, in input order
+    """
+    system_counts = count_tokens_batch([inp.get("system_prompt") or "" for inp in inputs], model)
+    user_counts = count_tokens_batch([inp.get("user_prompt") or "" for inp in inputs], model)
+    expected_counts = count_tokens_batch([inp.get("expected_output") or "" for inp in inputs], model)
+
+    estimates = []
+    for i, inp in enumerate(inputs):
+        input_tokens = system_counts[i] + user_counts[i] + 2 * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY
+        if inp.get("expected_output"):
+            output_tokens = expected_counts[i]
+        else:
+            output_tokens = settings.eval_default_output_tokens
+        estimates.append(ItemEstimate(i, input_tokens, min(output_tokens, max_tokens)))
+    return estimates
+
+
+def pack_items(estimates: List[ItemEstimate], tpm: int, rpm: int) -> List[List[ItemEstimate]]:
+    """
+    Pack items into rate-limit windows that fill both TPM and RPM budgets.
+
+    Each window greedily takes the largest remaining item while it is at
+    least the average token share left per request slot, and otherwise the
+    smallest, so long and short prompts are mixed.
+
+    Returns:
+        Items grouped by window, in execution order
+    """
+    remaining = sorted(estimates, key=lambda e: e.total_tokens)
+    lo, hi = 0, len(remaining) - 1
+    windows = []
+
+    while lo <= hi:
+        window = []
+        tokens_left, slots_left = tpm, rpm
+        while lo <= hi and slots_left > 0:
+            largest, smallest = remaining[hi], remaining[lo]
+            share = tokens_left / slots_left
+            if largest.total_tokens >= share and largest.total_tokens <= tokens_left:
+                item, hi = largest, hi - 1
+            elif smallest.total_tokens <= tokens_left or not window:
+                # Oversized items still get a window of their own
+                item, lo = smallest, lo + 1
+            else:
+                break
+            window.append(item)
+            tokens_left -= item.total_tokens
+            slots_left -= 1
+        windows.append(window)
+    return windows
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float | None:
+    """Estimated USD cost from MODEL_PRICING, or None for unknown models."""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    return round((input_tokens * pricing[0] + output_tokens * pricing[1]) / 1_000_000, 6)
+
+
+def plan_run(
+    inputs: List[Dict[str, Any]],
+    model: str,
+    max_tokens: int,
+    tpm: int | None = None,
+    rpm: int | None = None,
+    concurrency: int | None = None,
+    estimates: List[ItemEstimate] | None = None,
+) -> SchedulePlan:
+    """
+    Pre-flight pass: estimate tokens, pack items and compute ETA and cost.
+
+    The ETA is the larger of the rate-limit bound (windows needed to pack
+    every item) and the throughput bound (estimated generation time spread
+    over `concurrency` streams). Pass `estimates` to reuse token counts
+    across several plans for the same inputs and tokenizer. Limits default
+    to the per-key limits times the number of pooled keys.
+    """
+    keys = max(1, len(key_pool))
+    tpm = tpm or settings.eval_tpm_limit * keys
+    rpm = rpm or settings.eval_rpm_limit * keys
+    concurrency = concurrency or settings.eval_item_concurrency
+
+    if estimates is None:
+        estimates = estimate_items(inputs, max_tokens, model)
+    windows = pack_items(estimates, tpm, rpm)
+    order = [item.index for window in windows for item in window]
+
+    input_tokens = sum(e.input_tokens for e in estimates)
+    output_tokens = sum(e.output_tokens for e in estimates)
+
+    # Rate-limit bound: full windows, plus the last one in proportion to its use
+    rate_bound = 0.0
+    if windows:
+        last = windows[-1]
+        last_fill = max(
+            len(last) / rpm,
+            min(1.0, sum(e.total_tokens for e in last) / tpm),
+        )
+        rate_bound = (len(windows) - 1 + last_fill) * SECONDS_PER_WINDOW
+
+    # Throughput bound: per-request overhead plus decode time
+    busy_seconds = sum(
+        settings.eval_request_overhead_ms / 1000 + e.output_tokens / settings.eval_output_tokens_per_s
+        for e in estimates
+    )
+    throughput_bound = busy_seconds / concurrency
+
+    return SchedulePlan(
+        order=order,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        estimated_cost_usd=estimate_cost(model, input_tokens, output_tokens),
+        eta_seconds=round(max(rate_bound, throughput_bound), 1),
+        tpm_limit=tpm,
+        rpm_limit=rpm,
+        concurrency=concurrency,
+    )
+
+
+async def run_bounded(
+    factories: Iterable[Callable[[], Awaitable[T]]],
+    concurrency: int,
+    stop: asyncio.Event | None = None,
+) -> AsyncGenerator[T, None]:
+    """
+    Start awaitables in the given order, at most `concurrency` at a time.
+
+    Yields results as they complete. Closing the generator (or cancelling
+    its consumer) cancels whatever is still in flight, and so does setting
+    `stop`, which ends the generator without waiting for running items.
+
+    Args:
+        factories: Zero-argument callables creating each awaitable, in start order
+        concurrency: Maximum number in flight
+        stop: Optional event that ends the generator
+    """
+    factories = iter(factories)
+    in_flight: set[asyncio.Task] = set()
+    stopped = asyncio.ensure_future(stop.wait()) if stop else None
+    try:
+        while not (stop and stop.is_set()):
+            while len(in_flight) < concurrency:
+                factory = next(factories, None)
+                if factory is None:
+                    break
+                in_flight.add(asyncio.ensure_future(factory()))
+            if not in_flight:
+                return
+
+            waiting = in_flight | {stopped} if stopped else in_flight
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            in_flight -= done
+            for task in done:
+                if task is not stopped:
+                    yield task.result()
+    finally:
+        if stopped:
+            stopped.cancel()
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
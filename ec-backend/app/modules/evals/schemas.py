@@ -1,6 +1,6 @@
 """Pydantic schemas for Evals module."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -12,14 +12,56 @@ class EvalStatusEnum(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class PriorityEnum(str, Enum):
+    """Scheduling priority class of an evaluation run."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class ExecutionModeEnum(str, Enum):
+    """How a run's items reach the provider."""
+    STREAM = "stream"
+    BATCH = "batch"
+
+
+class MatchModeEnum(str, Enum):
+    """How outputs are compared with `expected_output`."""
+    EXACT = "exact"
+    NORMALIZED = "normalized"
+
+
+class ReadabilityConfig(BaseModel):
+    """Readability thresholds (scored after generation, off the event loop)."""
+    
+    min_reading_ease: Optional[float] = Field(default=None, description="Minimum Flesch reading ease")
+    max_grade_level: Optional[float] = Field(default=None, description="Maximum Flesch-Kincaid grade level")
 
 
 class MetricConfig(BaseModel):
-    """Configuration for evaluation metrics."""
+    """
+    Configuration for evaluation metrics.
+    
+    Every configured validator runs on every item; an item passes only if
+    all of them pass.
+    """
     
     check_json: bool = Field(default=False, description="Validate JSON output")
     check_length: Optional[int] = Field(default=None, description="Expected output length")
-    custom_rules: Optional[Dict[str, Any]] = Field(default=None, description="Custom validation rules")
+    regex: Optional[str] = Field(default=None, description="Regex the output must contain a match for")
+    json_schema: Optional[Dict[str, Any]] = Field(default=None, description="JSON Schema the output must satisfy")
+    match_expected: Optional[MatchModeEnum] = Field(
+        default=None, description="Compare output with expected_output (items without one are skipped)"
+    )
+    contains: Optional[List[str]] = Field(default=None, description="Keywords the output must contain")
+    excludes: Optional[List[str]] = Field(default=None, description="Keywords the output must not contain")
+    readability: Optional[ReadabilityConfig] = Field(default=None, description="Readability thresholds")
+    custom_rules: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Extra validators by registered name -> params, e.g. {\"regex\": {\"pattern\": \"^OK\", \"mode\": \"fullmatch\"}}",
+    )
 
 
 class EvalInput(BaseModel):
@@ -30,15 +72,113 @@ class EvalInput(BaseModel):
     expected_output: Optional[str] = Field(default=None, description="Expected output for comparison")
 
 
+class StoppingMethodEnum(str, Enum):
+    """Interval method for the pass rate."""
+    WILSON = "wilson"
+    BAYESIAN = "bayesian"
+
+
+class StoppingRuleConfig(BaseModel):
+    """
+    Sequential stopping rule.
+    
+    Items are evaluated in random order and the run stops as soon as any
+    configured criterion is met.
+    """
+    
+    pass_rate_margin: Optional[float] = Field(
+        default=None, gt=0, lt=0.5, description="Stop when the pass-rate interval is within +/- this"
+    )
+    latency_margin_ms: Optional[float] = Field(
+        default=None, gt=0, description="Stop when the mean-latency interval is within +/- this many ms"
+    )
+    regression_threshold: Optional[float] = Field(
+        default=None, ge=0, le=1, description="Stop once the pass rate is clearly below or above this baseline"
+    )
+    confidence: float = Field(default=0.95, ge=0.5, lt=1)
+    method: StoppingMethodEnum = Field(default=StoppingMethodEnum.WILSON)
+    min_items: int = Field(default=30, ge=1, description="Never stop before this many items")
+    seed: Optional[int] = Field(default=None, description="Seed for the random item order")
+    
+    @model_validator(mode="after")
+    def _require_criterion(self) -> "StoppingRuleConfig":
+        if self.pass_rate_margin is None and self.latency_margin_ms is None and self.regression_threshold is None:
+            raise ValueError("Set at least one of pass_rate_margin, latency_margin_ms or regression_threshold")
+        return self
+
+
+class StoppingOutcome(BaseModel):
+    """How a run with a stopping rule finished."""
+    
+    stopped_early: bool
+    reason: Optional[str] = Field(default=None, description="Criterion met, or 'exhausted' if all items ran")
+    items_evaluated: int
+    method: str
+    confidence: float
+    pass_rate: float
+    pass_rate_interval: Optional[List[float]] = None
+    avg_latency_ms: Optional[float] = None
+    latency_interval_ms: Optional[List[float]] = None
+
+
 class EvalRunRequest(BaseModel):
     """Request to start an evaluation run."""
     
     model: str = Field(default="llama-3.1-8b-instant", description="Model to evaluate")
+    models: Optional[List[str]] = Field(
+        default=None,
+        min_length=2,
+        description="Compare several models over one shared pass of the inputs (overrides model)",
+    )
     dataset_name: Optional[str] = Field(default=None, description="Name for this dataset")
     inputs: List[EvalInput] = Field(..., description="List of inputs to evaluate")
     metric_config: Optional[MetricConfig] = Field(default=None, description="Metric configuration")
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=1024, ge=1, le=8192)
+    priority: Optional[PriorityEnum] = Field(
+        default=None,
+        description="Scheduling class; defaults to interactive for small runs, batch otherwise",
+    )
+    stopping: Optional[StoppingRuleConfig] = Field(
+        default=None, description="Stop early once the estimate is precise enough"
+    )
+    item_timeout_seconds: Optional[float] = Field(
+        default=None, gt=0, description="Cancel an item's stream after this long and mark it timed out"
+    )
+    run_timeout_seconds: Optional[float] = Field(
+        default=None, gt=0, description="Stop starting items after this long; in-flight items time out"
+    )
+    execution_mode: ExecutionModeEnum = Field(
+        default=ExecutionModeEnum.STREAM,
+        description="stream: items run live under the rate budgets; "
+        "batch: one offline provider batch job, results ingested when it completes",
+    )
+    
+    @model_validator(mode="after")
+    def _check_models(self) -> "EvalRunRequest":
+        # Each model is one lane; a repeated model would be counted but never run twice
+        if self.models and len(set(self.models)) != len(self.models):
+            raise ValueError("models must not contain duplicates")
+        return self
+    
+    @model_validator(mode="after")
+    def _check_execution_mode(self) -> "EvalRunRequest":
+        if self.execution_mode == ExecutionModeEnum.BATCH and (self.stopping or self.item_timeout_seconds):
+            raise ValueError("stopping and item_timeout_seconds need per-item streaming (execution_mode=stream)")
+        return self
+
+
+class RunEstimate(BaseModel):
+    """Pre-flight token, cost and duration estimate for a run."""
+    
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    estimated_cost_usd: Optional[float] = Field(default=None, description="None for models without known pricing")
+    eta_seconds: float = Field(..., description="Estimated wall time under the rate budgets")
+    tpm_limit: int
+    rpm_limit: int
+    concurrency: int
 
 
 class EvalRunResponse(BaseModel):
@@ -47,6 +187,19 @@ class EvalRunResponse(BaseModel):
     run_id: str = Field(..., description="Unique identifier for this run")
     status: EvalStatusEnum = Field(..., description="Current status")
     total_items: int = Field(..., description="Total items to process")
+    priority: PriorityEnum = Field(..., description="Scheduling class")
+    estimate: Optional[RunEstimate] = Field(default=None, description="Pre-flight estimate")
+    lanes: Optional[Dict[str, str]] = Field(default=None, description="Comparison runs: model -> lane run_id")
+
+
+class BatchProgress(BaseModel):
+    """Provider batch job of a batch-mode run."""
+    
+    id: str
+    status: str = Field(..., description="Provider status, e.g. validating, in_progress, completed, expired")
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
 
 
 class EvalStatusResponse(BaseModel):
@@ -58,6 +211,48 @@ class EvalStatusResponse(BaseModel):
     completed_items: int
     progress_percent: float = Field(..., description="Completion percentage")
     error_message: Optional[str] = None
+    
+    # Scheduling (queue fields are only set while the run is pending)
+    priority: Optional[PriorityEnum] = None
+    queue_position: Optional[int] = Field(default=None, description="1-based position among pending runs")
+    estimated_start_at: Optional[datetime] = None
+    
+    # Batch-mode runs: the provider job's progress (results land when it completes)
+    execution_mode: Optional[ExecutionModeEnum] = None
+    batch: Optional[BatchProgress] = None
+    
+    # Running metrics (updated while the run is processing)
+    pass_rate: Optional[float] = None
+    pass_rate_ci: Optional[List[float]] = Field(default=None, description="95% Wilson interval for pass rate")
+    avg_latency_ms: Optional[float] = None
+    latency_std_ms: Optional[float] = None
+    latency_ci_ms: Optional[List[float]] = Field(default=None, description="95% interval for mean latency")
+
+
+class ValidationOutcome(BaseModel):
+    """Outcome of one validator on one item."""
+    
+    name: str
+    passed: bool
+    reason: Optional[str] = None
+
+
+class ReferenceScoreSummary(BaseModel):
+    """Aggregate of one reference metric over the scored items."""
+    
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    p50: Optional[float] = None
+
+
+class ReferenceMetrics(BaseModel):
+    """Run-level scores of outputs against expected_output."""
+    
+    scored_items: int = Field(..., description="Items that had an expected_output")
+    exact_match: ReferenceScoreSummary
+    token_f1: ReferenceScoreSummary
+    rouge_l: ReferenceScoreSummary
+    char_ngram_f1: ReferenceScoreSummary
 
 
 class EvalItemResult(BaseModel):
@@ -69,6 +264,9 @@ class EvalItemResult(BaseModel):
     perplexity: Optional[float] = None
     passed: bool
     failure_reason: Optional[str] = None
+    validations: List[ValidationOutcome] = Field(default_factory=list, description="Every validator's outcome")
+    timed_out: bool = Field(default=False, description="Stream cancelled by the item or run deadline")
+    reference_scores: Optional[Dict[str, float]] = Field(default=None, description="Scores vs expected_output")
 
 
 class EvalReportResponse(BaseModel):
@@ -89,22 +287,87 @@ class EvalReportResponse(BaseModel):
     avg_latency_ms: float
     min_latency_ms: float
     max_latency_ms: float
+    latency_std_ms: Optional[float] = None
+    latency_ci_ms: Optional[List[float]] = None
+    pass_rate_ci: Optional[List[float]] = None
     avg_perplexity: Optional[float]
+    reference_metrics: Optional[ReferenceMetrics] = None
+    stopping: Optional[StoppingOutcome] = None
+    estimate: Optional[RunEstimate] = None
     
     # Timestamps
     created_at: datetime
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
+    archived_at: Optional[datetime] = Field(default=None, description="Payloads moved to the archive (rehydrated on read)")
     
     # Detailed results (optional, can be large)
     results: Optional[List[EvalItemResult]] = None
 
 
+class ComparisonLane(BaseModel):
+    """Summary of one model lane in a comparison run."""
+    
+    model: str
+    run_id: str
+    status: str
+    completed_items: int
+    passed_items: int
+    failed_items: int
+    pass_rate: float
+    pass_rate_ci: Optional[List[float]] = None
+    avg_latency_ms: Optional[float] = None
+    p50_latency_ms: Optional[float] = None
+    p90_latency_ms: Optional[float] = None
+    p99_latency_ms: Optional[float] = None
+    avg_perplexity: Optional[float] = None
+    reference_metrics: Optional[ReferenceMetrics] = None
+    error_message: Optional[str] = None
+
+
+class ComparisonItemOutcome(BaseModel):
+    """One model's result for a comparison item."""
+    
+    output: str
+    passed: bool
+    latency_ms: float
+    failure_reason: Optional[str] = None
+
+
+class ComparisonItem(BaseModel):
+    """Per-item diff across models."""
+    
+    index: int
+    input_prompt: str
+    expected_output: Optional[str] = None
+    pass_agreement: bool = Field(..., description="All models agree on pass/fail")
+    output_agreement: bool = Field(..., description="All normalized outputs are identical")
+    outcomes: Dict[str, ComparisonItemOutcome]
+
+
+class ComparisonReportResponse(BaseModel):
+    """Side-by-side report for a multi-model comparison run."""
+    
+    run_id: str
+    status: EvalStatusEnum
+    dataset_name: Optional[str]
+    total_items: int = Field(..., description="Items per lane")
+    lanes: List[ComparisonLane]
+    items: Optional[List[ComparisonItem]] = None
+    
+    # Timestamps
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    archived_at: Optional[datetime] = Field(default=None, description="Payloads moved to the archive (rehydrated on read)")
+
+
 class EvalListItem(BaseModel):
     """Summary item for listing eval runs."""
     
     id: str
     status: str
+    run_type: str = "single"
     model: str
     dataset_name: Optional[str]
     total_items: int
@@ -119,3 +382,48 @@ class EvalListResponse(BaseModel):
     
     runs: List[EvalListItem]
     total: int
+
+
+class DiffFilterEnum(str, Enum):
+    """Which matched items a run diff returns."""
+    CHANGES = "changes"
+    FLIPPED = "flipped"
+    ALL = "all"
+
+
+class ExportFormatEnum(str, Enum):
+    """Bulk export formats."""
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class RunDiffSummary(BaseModel):
+    """First line of a run diff stream: aggregate counts over matched items."""
+    
+    base: str
+    head: str
+    matched_items: int = Field(..., description="Items present in both runs (joined on prompt hash)")
+    only_in_base: int
+    only_in_head: int
+    newly_failing: int = Field(..., description="Passed in base, failed in head")
+    newly_passing: int = Field(..., description="Failed in base, passed in head")
+    output_changed: int
+    avg_latency_delta_ms: Optional[float] = Field(default=None, description="Mean of head - base latency")
+
+
+class ItemDiff(BaseModel):
+    """One matched item pair in a run diff stream."""
+    
+    base_index: int
+    head_index: int
+    input_hash: str
+    base_passed: bool
+    head_passed: bool
+    flipped: bool
+    latency_delta_ms: Optional[float] = None
+    base_failure_reason: Optional[str] = None
+    head_failure_reason: Optional[str] = None
+    output_changed: bool
+    base_output: Optional[str] = None
+    head_output: Optional[str] = None
@@ -0,0 +1,148 @@
+"""Conditional GETs and a short-TTL cache for polled run status.
+
+Every write to an eval run bumps its `version` and `updated_at`, which
+become the ETag and Last-Modified of its status. Status payloads are cached
+in-process with their validators: a poll that hits the cache is answered
+(with a 304 when the client's copy is current) without touching the
+database. ORM writes in this process invalidate the affected entries
+immediately; writes from other processes (Celery workers) become visible
+once the short TTL expires. Finished runs no longer change, so they are
+cached much longer.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+
+from app.core.config import settings
+from .models import EvalRun, EvalStatus
+
+
+FINAL_STATUSES = (EvalStatus.COMPLETED.value, EvalStatus.FAILED.value, EvalStatus.CANCELLED.value)
+
+# Cache key for run listings (all pages are dropped together)
+RUNS_KEY = "runs"
+
+
+@dataclass
+class CachedResponse:
+    """A response payload with its validators."""
+    payload: Any
+    etag: str
+    last_modified: datetime
+    expires_at: float
+
+
+class StatusCache:
+    """LRU of status payloads keyed by run id (or RUNS_KEY + page) with per-entry TTLs."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Any, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Optional[CachedResponse]:
+        """Fresh entry for `key`, or None."""
+        entry = self.entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Any, payload: Any, etag: str, last_modified: datetime, ttl: float) -> CachedResponse:
+        """Store a payload for `ttl` seconds."""
+        entry = CachedResponse(payload, etag, last_modified, time.monotonic() + ttl)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, run_id: Optional[str] = None) -> None:
+        """Drop a run's status and all run listings (everything when run_id is None)."""
+        if run_id is None:
+            self.entries.clear()
+            return
+        self.entries.pop(run_id, None)
+        for key in [k for k in self.entries if isinstance(k, tuple) and k[0] == RUNS_KEY]:
+            del self.entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit / miss counters and current size."""
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+status_cache = StatusCache(settings.status_cache_max_entries)
+
+
+def ttl_for(status: str) -> float:
+    """Cache TTL for a run in `status`."""
+    if status in FINAL_STATUSES:
+        return settings.status_cache_final_ttl_seconds
+    return settings.status_cache_ttl_seconds
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from version parts."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Whether the request's validators match (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" matches "x"
+        return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    """ETag / Last-Modified headers; no-cache makes browsers revalidate every poll."""
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def conditional_response(request: Request, response: Response, entry: CachedResponse) -> Any:
+    """
+    Answer from a cache entry.
+
+    Returns:
+        A 304 Response when the client is current, else the payload (with
+        validator headers set on `response`)
+    """
+    headers = validator_headers(entry.etag, entry.last_modified)
+    if not_modified(request, entry.etag, entry.last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return entry.payload
+
+
+@event.listens_for(EvalRun, "after_insert")
+@event.listens_for(EvalRun, "after_update")
+@event.listens_for(EvalRun, "after_delete")
+def _invalidate_run(mapper, connection, target: EvalRun) -> None:
+    # Lane progress is part of the parent's status
+    status_cache.invalidate(target.id)
+    if target.parent_id:
+        status_cache.invalidate(target.parent_id)
@@ -0,0 +1,148 @@
+"""Sequential early stopping for eval runs.
+
+Runs with a stopping rule process their items in a seeded random order and
+stop once the pass-rate or mean-latency interval is narrow enough, or once
+the pass rate is clearly below (or clearly above) a regression threshold.
+
+Items finish out of order when several stream at once, and fast items
+finish first. To keep the estimate unbiased, decisions only use the
+contiguous prefix of the random order that has finished; when the run
+stops, results beyond that prefix are discarded.
+"""
+
+import random
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List
+
+from app.modules.common.stats import RunMetrics, beta_interval, wilson_interval, z_score
+
+
+class StoppingMethod:
+    """Interval methods for the pass rate."""
+    WILSON = "wilson"
+    BAYESIAN = "bayesian"
+
+
+class StopReason:
+    """Why a run with a stopping rule finished."""
+    PASS_RATE_PRECISION = "pass_rate_precision"
+    LATENCY_PRECISION = "latency_precision"
+    REGRESSION = "regression"
+    NO_REGRESSION = "no_regression"
+    EXHAUSTED = "exhausted"
+
+
+@dataclass
+class StoppingRule:
+    """Stopping criteria; the run stops as soon as any configured one is met."""
+    pass_rate_margin: float | None = None  # Target interval half-width for pass rate
+    latency_margin_ms: float | None = None  # Target interval half-width for mean latency
+    regression_threshold: float | None = None  # Baseline pass rate to compare against
+    confidence: float = 0.95
+    method: str = StoppingMethod.WILSON
+    min_items: int = 30
+    seed: int | None = None
+
+    def to_dict(self) -> dict:
+        """Serialize the rule."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "StoppingRule | None":
+        """Restore a rule from `to_dict` output (None when the run has no rule)."""
+        if not data:
+            return None
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    def pass_rate_interval(self, metrics: RunMetrics) -> tuple[float, float] | None:
+        """Pass-rate interval at the rule's confidence, by the rule's method."""
+        if self.method == StoppingMethod.BAYESIAN:
+            return beta_interval(metrics.passed, metrics.items, self.confidence)
+        return wilson_interval(metrics.passed, metrics.items, z_score(self.confidence))
+
+    def evaluate(self, metrics: RunMetrics, reason: str | None = None) -> Dict[str, Any]:
+        """Outcome record (intervals and items evaluated) for `metrics`."""
+        pass_interval = self.pass_rate_interval(metrics)
+        latency_interval = metrics.latency.confidence_interval(z_score(self.confidence))
+        return {
+            "stopped_early": reason not in (None, StopReason.EXHAUSTED),
+            "reason": reason,
+            "items_evaluated": metrics.items,
+            "method": self.method,
+            "confidence": self.confidence,
+            "pass_rate": metrics.pass_rate,
+            "pass_rate_interval": list(pass_interval) if pass_interval else None,
+            "avg_latency_ms": metrics.latency.mean if metrics.latency.count else None,
+            "latency_interval_ms": list(latency_interval) if latency_interval else None,
+        }
+
+    def check(self, metrics: RunMetrics) -> str | None:
+        """Return the stop reason if any criterion is met, else None."""
+        if metrics.items < self.min_items:
+            return None
+
+        lower, upper = self.pass_rate_interval(metrics)
+        if self.regression_threshold is not None:
+            if upper < self.regression_threshold:
+                return StopReason.REGRESSION
+            if lower >= self.regression_threshold:
+                return StopReason.NO_REGRESSION
+        if self.pass_rate_margin is not None and (upper - lower) / 2 <= self.pass_rate_margin:
+            return StopReason.PASS_RATE_PRECISION
+
+        if self.latency_margin_ms is not None and metrics.latency.count >= 2:
+            low_ms, high_ms = metrics.latency.confidence_interval(z_score(self.confidence))
+            if (high_ms - low_ms) / 2 <= self.latency_margin_ms:
+                return StopReason.LATENCY_PRECISION
+        return None
+
+
+def random_order(total_items: int, seed: int | None) -> List[int]:
+    """Seeded random permutation of item indices."""
+    order = list(range(total_items))
+    random.Random(seed).shuffle(order)
+    return order
+
+
+class SequentialMonitor:
+    """
+    Tracks the finished prefix of a run's random order and applies its rule.
+
+    Checks run each time the prefix grows by about 2%, so the per-item cost
+    stays constant even with the (bisection-based) Bayesian interval.
+    """
+
+    def __init__(
+        self,
+        rule: StoppingRule,
+        order: List[int],
+        record: Callable[[RunMetrics, Dict[str, Any]], None],
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            rule: The run's stopping rule
+            order: Item indices in the run's random order
+            record: Adds one stored result to a RunMetrics accumulator
+        """
+        self.rule = rule
+        self.record = record
+        self.position = {index: pos for pos, index in enumerate(order)}
+        self.finished: Dict[int, Dict[str, Any]] = {}
+        self.prefix: List[Dict[str, Any]] = []
+        self.metrics = RunMetrics()
+        self._next_check = 0
+
+    def add(self, result: Dict[str, Any]) -> str | None:
+        """Add a finished item; returns a stop reason once the rule is met."""
+        self.finished[self.position[result["index"]]] = result
+        while len(self.prefix) in self.finished:
+            item = self.finished.pop(len(self.prefix))
+            self.prefix.append(item)
+            self.record(self.metrics, item)
+
+        if self.metrics.items < self._next_check:
+            return None
+        self._next_check = self.metrics.items + max(1, self.metrics.items // 50)
+        return self.rule.check(self.metrics)
@@ -0,0 +1,269 @@
+"""Incremental validators that run on tokens as they stream in.
+
+Each streaming validator keeps per-item state and consumes text chunks; as
+soon as the output can no longer pass (a character that can't continue
+valid JSON, more characters than the length window allows, a forbidden
+keyword) it reports a definite failure so the caller can cancel the
+upstream stream. They never pass an item on their own - the regular
+validators still run on complete outputs.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StreamCheck(ABC):
+    """Per-item incremental check."""
+
+    @abstractmethod
+    def feed(self, text: str) -> Optional[str]:
+        """Consume the next chunk; return a failure reason once failure is certain."""
+
+
+STREAM_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], Callable[[], StreamCheck]]] = {}
+
+
+def register_stream_validator(name: str):
+    """
+    Decorator registering an incremental counterpart for validator `name`.
+
+    The factory receives the validator's params and returns a zero-argument
+    callable creating fresh per-item state.
+    """
+    def decorator(build: Callable[[Dict[str, Any]], Callable[[], StreamCheck]]):
+        STREAM_VALIDATORS[name] = build
+        return build
+    return decorator
+
+
+# Prefix of a JSON number that can still be completed, and a complete one
+_NUMBER_PREFIX = re.compile(r"-?(?:(?:0|[1-9]\d*)(?:\.\d*)?(?:(?<=\d)[eE][+-]?\d*)?)?")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+# Python's json module (the final `json` validator) also accepts the non-finite constants
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_WHITESPACE = " \t\n\r"
+_ESCAPES = '"\\/bfnrtu'
+_HEX = "0123456789abcdefABCDEF"
+
+
+class JsonStreamParser(StreamCheck):
+    """
+    Pushdown automaton accepting exactly the prefixes of valid JSON documents
+    (with NaN and +/-Infinity, as `json.loads` accepts them).
+
+    Tracks the container stack and what may come next, plus sub-states for
+    strings (escapes, \\u sequences), numbers and literals. The first
+    character that no valid document could continue with is a definite
+    failure; trailing non-whitespace after a complete document is too.
+    """
+
+    # What the parser expects next
+    VALUE, FIRST_VALUE, KEY, FIRST_KEY, COLON, NEXT, DONE = range(7)
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.expect = self.VALUE
+        self.position = 0
+        self.error: Optional[str] = None
+        # Token in progress: "string", "number" or "literal"
+        self.token: Optional[str] = None
+        self.buffer = ""
+        self.is_key = False
+        self.escape = False
+        self.unicode_left = 0
+
+    def feed(self, text: str) -> Optional[str]:
+        if self.error:
+            return self.error
+        for char in text:
+            if not self._step(char):
+                self.error = f"Invalid JSON at char {self.position}: unexpected {char!r}"
+                return self.error
+            self.position += 1
+        return None
+
+    def _value_done(self) -> None:
+        self.expect = self.NEXT if self.stack else self.DONE
+
+    def _step(self, char: str) -> bool:
+        if self.token == "string":
+            return self._string_step(char)
+        if self.token == "number":
+            if _NUMBER_PREFIX.fullmatch(self.buffer + char):
+                self.buffer += char
+                return True
+            if self.buffer == "-" and char == "I":
+                self.token, self.buffer = "literal", "-I"
+                return True
+            if not _NUMBER.fullmatch(self.buffer):
+                return False
+            # The delimiter ends the number and is handled as structure below
+            self.token = None
+            self._value_done()
+        elif self.token == "literal":
+            self.buffer += char
+            matches = [lit for lit in _LITERALS if lit.startswith(self.buffer)]
+            if not matches:
+                return False
+            if self.buffer in matches:
+                self.token = None
+                self._value_done()
+            return True
+
+        if char in _WHITESPACE:
+            return True
+
+        if self.expect in (self.VALUE, self.FIRST_VALUE):
+            if char == "]" and self.expect == self.FIRST_VALUE:
+                return self._close("[")
+            return self._start_value(char)
+        if self.expect in (self.KEY, self.FIRST_KEY):
+            if char == "}" and self.expect == self.FIRST_KEY:
+                return self._close("{")
+            if char != '"':
+                return False
+            self.token, self.is_key = "string", True
+            return True
+        if self.expect == self.COLON:
+            if char != ":":
+                return False
+            self.expect = self.VALUE
+            return True
+        if self.expect == self.NEXT:
+            if char == ",":
+                self.expect = self.KEY if self.stack[-1] == "{" else self.VALUE
+                return True
+            if char in "}]":
+                return self._close("{" if char == "}" else "[")
+            return False
+        # DONE: only whitespace may follow a complete document
+        return False
+
+    def _start_value(self, char: str) -> bool:
+        if char == "{":
+            self.stack.append("{")
+            self.expect = self.FIRST_KEY
+        elif char == "[":
+            self.stack.append("[")
+            self.expect = self.FIRST_VALUE
+        elif char == '"':
+            self.token, self.is_key = "string", False
+        elif char == "-" or char.isdigit():
+            self.token, self.buffer = "number", char
+        elif char in "tfnNI":
+            self.token, self.buffer = "literal", char
+        else:
+            return False
+        return True
+
+    def _close(self, opener: str) -> bool:
+        if not self.stack or self.stack[-1] != opener:
+            return False
+        self.stack.pop()
+        self._value_done()
+        return True
+
+    def _string_step(self, char: str) -> bool:
+        if self.unicode_left:
+            self.unicode_left -= 1
+            return char in _HEX
+        if self.escape:
+            self.escape = False
+            if char == "u":
+                self.unicode_left = 4
+            return char in _ESCAPES
+        if char == "\\":
+            self.escape = True
+        elif char == '"':
+            self.token = None
+            if self.is_key:
+                self.expect = self.COLON
+            else:
+                self._value_done()
+        elif ord(char) < 0x20:
+            # Raw control characters aren't allowed inside strings
+            return False
+        return True
+
+
+@register_stream_validator("json")
+def _stream_json(params: Dict[str, Any]) -> Callable[[], StreamCheck]:
+    return JsonStreamParser
+
+
+@register_stream_validator("json_schema")
+def _stream_json_schema(params: Dict[str, Any]) -> Callable[[], StreamCheck]:
+    # Schema checks need the whole document, but broken syntax fails early
+    return JsonStreamParser
+
+
+class LengthLimit(StreamCheck):
+    """Running character count against the upper end of the tolerance window."""
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+        self.length = 0
+
+    def feed(self, text: str) -> Optional[str]:
+        self.length += len(text)
+        if self.length > self.max_length:
+            return f"Length exceeded {self.max_length}"
+        return None
+
+
+@register_stream_validator("length")
+def _stream_length(params: Dict[str, Any]) -> Callable[[], StreamCheck]:
+    expected = int(params["expected"])
+    max_length = int(expected * (1 + float(params.get("tolerance", 0.2))))
+    return lambda: LengthLimit(max_length)
+
+
+class ForbiddenKeywords(StreamCheck):
+    """Watches for forbidden keywords, including ones split across chunks."""
+
+    def __init__(self, keywords: List[str], case_sensitive: bool):
+        self.keywords = keywords
+        self.case_sensitive = case_sensitive
+        self.overlap = max((len(k) for k in keywords), default=1) - 1
+        self.tail = ""
+
+    def feed(self, text: str) -> Optional[str]:
+        window = self.tail + (text if self.case_sensitive else text.lower())
+        found = [k for k in self.keywords if k in window]
+        self.tail = window[-self.overlap:] if self.overlap else ""
+        if found:
+            return f"Forbidden keywords present: {', '.join(found)}"
+        return None
+
+
+@register_stream_validator("excludes")
+def _stream_excludes(params: Dict[str, Any]) -> Callable[[], StreamCheck]:
+    keywords = params.get("keywords") or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    case_sensitive = bool(params.get("case_sensitive", False))
+    keywords = [k if case_sensitive else k.lower() for k in keywords if k]
+    return lambda: ForbiddenKeywords(keywords, case_sensitive)
+
+
+class StreamMonitor:
+    """Runs every streaming validator of a run over one item's tokens."""
+
+    def __init__(self, checks: List[Tuple[str, StreamCheck]]):
+        self.checks = checks
+
+    def feed(self, text: str) -> Optional[Tuple[str, str]]:
+        """Feed a chunk; returns (validator name, reason) on the first definite failure."""
+        for name, check in self.checks:
+            reason = check.feed(text)
+            if reason:
+                return name, reason
+        return None
+
+
+def compile_stream_validators(
+    specs: List[Tuple[str, Dict[str, Any]]],
+) -> List[Tuple[str, Callable[[], StreamCheck]]]:
+    """Per-item state factories for the specs that have a streaming counterpart."""
+    return [(name, STREAM_VALIDATORS[name](params)) for name, params in specs if name in STREAM_VALIDATORS]
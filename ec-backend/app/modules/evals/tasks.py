@@ -1,231 +1,514 @@
 """Celery tasks for async evaluation processing."""
 
-import json
+import asyncio
 import time
+from contextlib import aclosing
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from loguru import logger
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import async_session_factory
+from app.core.worker import get_worker_runtime
 from app.modules.common.llm_client import GroqLLMClient
-from app.modules.common.math_utils import calculate_perplexity
-from .models import EvalRun, EvalStatus
+from app.modules.common.stats import RunMetrics
+from .models import EvalRun, EvalStatus, ExecutionMode, RunType
+from .batch import run_batch
+from .cancellation import CancelReason, RunControl, active_runs, watch_cancellation
+from .fair_scheduler import fair_scheduler
+from .items import ensure_items, load_results, store_items
+from .stopping import SequentialMonitor, StoppingRule, StopReason
+from .scheduling import ItemEstimate, estimate_items, run_bounded
+from .validators import DeferredValidation, ValidatorSet, apply_validations, run_validators
 
 
-def validate_json_output(output: str) -> tuple[bool, str | None]:
-    """Validate if output is valid JSON."""
-    try:
-        json.loads(output)
-        return True, None
-    except json.JSONDecodeError as e:
-        return False, f"Invalid JSON: {str(e)}"
+def snapshot_metrics(run: EvalRun, metrics: RunMetrics) -> None:
+    """Write the running metrics accumulator and its derived values onto the run."""
+    summary = metrics.summary()
+    run.metrics_state = metrics.to_dict()
+    run.pass_rate = summary["pass_rate"]
+    run.avg_latency_ms = summary["avg_latency_ms"] or 0
+    run.avg_perplexity = summary["avg_perplexity"]
+
 
+def record_result(metrics: RunMetrics, result: Dict[str, Any]) -> None:
+    """Add one stored item result to the metrics accumulator."""
+    metrics.record(
+        result.get("passed", False),
+        latency_ms=result.get("latency_ms") or None,
+        logprob_sum=result.get("logprob_sum", 0.0),
+        token_count=result.get("output_tokens", 0),
+    )
 
-def validate_length(output: str, expected_length: int, tolerance: float = 0.2) -> tuple[bool, str | None]:
-    """Validate output length within tolerance."""
-    actual_length = len(output)
-    min_length = int(expected_length * (1 - tolerance))
-    max_length = int(expected_length * (1 + tolerance))
+
+def restore_metrics(run: EvalRun, results: List[Dict[str, Any]]) -> RunMetrics:
+    """Restore the accumulator for a resumed run, rebuilding it if it is out of sync."""
+    metrics = RunMetrics.from_dict(run.metrics_state)
+    if metrics.items == len(results):
+        return metrics
     
-    if min_length <= actual_length <= max_length:
-        return True, None
-    return False, f"Length {actual_length} not within {min_length}-{max_length}"
+    # Snapshot doesn't match the persisted items (e.g. after a crash)
+    metrics = RunMetrics()
+    for r in results:
+        record_result(metrics, r)
+    return metrics
 
 
-@celery_app.task(bind=True)
-def run_evaluation_task(self, run_id: str):
+async def evaluate_item(
+    client: GroqLLMClient,
+    run: EvalRun,
+    index: int,
+    input_data: Dict[str, Any],
+    estimate: ItemEstimate,
+    validators: ValidatorSet,
+    control: RunControl | None = None,
+) -> Optional[Dict[str, Any]]:
     """
-    Celery task to run evaluation asynchronously.
+    Generate a single eval item and run its inline (cheap) validators.
     
-    This task:
-    1. Loads the eval run from database
-    2. Processes each input through the LLM
-    3. Validates outputs against metric config
-    4. Updates progress and stores results
+    The item holds a fair-share upstream slot for its run and reserves its
+    estimated tokens against the model's rate budget on the pooled API key
+    with the most headroom before streaming. Waiting for budget stops at
+    the run deadline; the item is then not evaluated.
+    Streaming validators check tokens as they arrive and cancel the
+    upstream stream on a definite failure; streams outliving the item or
+    run deadline are cancelled and the item is marked timed out.
+    
+    Errors are captured in the returned result rather than raised.
+    
+    Args:
+        client: LLM client
+        run: Eval run (read-only here; model and generation settings)
+        index: Position of the item in `run.inputs`
+        input_data: The item's prompts
+        estimate: Pre-flight token estimate, reserved against the budget
+        validators: Validators compiled once for the run
+        control: The run's cancellation and deadline control
+        
+    Returns:
+        Stored result dict for the item, or None if the run deadline passed before it started
+    """
+    async with fair_scheduler.slot(run.id):
+        return await _generate_item(client, run, index, input_data, estimate, validators, control)
+
+
+async def _generate_item(
+    client: GroqLLMClient,
+    run: EvalRun,
+    index: int,
+    input_data: Dict[str, Any],
+    estimate: ItemEstimate,
+    validators: ValidatorSet,
+    control: RunControl | None = None,
+) -> Optional[Dict[str, Any]]:
+    """Reserve rate budget, then stream and validate one item (see `evaluate_item`)."""
+    pool = client.pool
+    try:
+        lease = await asyncio.wait_for(
+            pool.acquire(run.model, estimate.total_tokens),
+            control.deadline_remaining() if control else None,
+        )
+    except asyncio.TimeoutError:
+        # Past the run deadline: skip the item rather than lease budget for a stream with no time left
+        return None
+    
+    token_logprobs = []
+    try:
+        start_time = time.time()
+        
+        # Collect full response, aborting as soon as a streaming validator fails
+        full_response = ""
+        monitor = validators.start_stream()
+        aborted = None
+        
+        async def consume() -> None:
+            nonlocal full_response, aborted
+            stream = client.stream_chat_completion(
+                system_prompt=input_data.get("system_prompt", "You are a helpful assistant."),
+                user_prompt=input_data.get("user_prompt", ""),
+                model=run.model,
+                temperature=run.temperature if run.temperature is not None else 0.7,
+                max_tokens=run.max_tokens or 1024,
+                lease=lease,
+            )
+            # Closing the generator closes the upstream HTTP stream
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if chunk.token:
+                        full_response += chunk.token.text
+                        token_logprobs.append(chunk.token.logprob)
+                        aborted = monitor.feed(chunk.token.text) if monitor else None
+                        if aborted:
+                            break
+                    if chunk.done:
+                        break
+                    if chunk.error:
+                        raise Exception(chunk.error)
+        
+        timeout = control.item_timeout_remaining() if control else None
+        timed_out = False
+        try:
+            await asyncio.wait_for(consume(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+        
+        latency_ms = (time.time() - start_time) * 1000
+        
+        result = {
+            "index": index,
+            "input_prompt": input_data.get("user_prompt", ""),
+            "output": full_response,
+            "latency_ms": latency_ms,
+            "output_tokens": len(token_logprobs),
+            "logprob_sum": sum(token_logprobs),
+        }
+        
+        # Validate output
+        if timed_out:
+            result["timed_out"] = True
+            apply_validations(result, [{
+                "name": "deadline",
+                "passed": False,
+                "reason": f"Timed out after {timeout:.1f}s ({len(token_logprobs)} tokens)",
+            }])
+        elif aborted:
+            name, reason = aborted
+            result["aborted"] = True
+            apply_validations(result, [{
+                "name": name,
+                "passed": False,
+                "reason": f"{reason} (stream aborted after {len(token_logprobs)} tokens)",
+            }])
+        else:
+            apply_validations(result, run_validators(validators.cheap, full_response, input_data))
+        return result
+    
+    except Exception as e:
+        logger.error(f"Error processing item {index}: {e}")
+        return {
+            "index": index,
+            "input_prompt": input_data.get("user_prompt", ""),
+            "output": "",
+            "latency_ms": 0,
+            "passed": False,
+            "failure_reason": str(e),
+        }
+    
+    finally:
+        pool.settle(lease, estimate.input_tokens + len(token_logprobs))
+
+
+async def execute_eval_run(
+    run_id: str,
+    session_factory: async_sessionmaker = async_session_factory,
+    client: GroqLLMClient | None = None,
+) -> None:
     """
-    import asyncio
+    Run an evaluation to completion.
     
-    async def _run_eval():
-        async with async_session_factory() as session:
-            # Load the eval run
-            run = await session.get(EvalRun, run_id)
-            if not run:
-                logger.error(f"Eval run {run_id} not found")
-                return
+    This coroutine:
+    1. Loads the eval run from database
+    2. Processes inputs through the LLM in scheduled order, several at once
+       within the model's TPM/RPM budget (or, in batch mode, as one
+       offline provider batch job; see `batch`)
+    3. Validates outputs against metric config: cheap validators inline,
+       expensive ones in batches on a process pool
+    4. Updates progress and stores each item's result in `eval_items`
+    5. Scores outputs against expected outputs (when given) in one batch
+    
+    With a stopping rule, the run ends as soon as the rule is met over the
+    finished prefix of its random order (see `stopping`). A cancelled run
+    keeps the items finished so far; past its deadline, a run starts no
+    new items and in-flight ones time out (see `cancellation`).
+    
+    Args:
+        run_id: Eval run identifier
+        session_factory: Session factory bound to the caller's event loop
+        client: Shared LLM client; a new one is created when omitted
+    """
+    async with session_factory() as session:
+        # Load the eval run
+        run = await session.get(EvalRun, run_id)
+        if not run:
+            logger.error(f"Eval run {run_id} not found")
+            return
+        if run.status == EvalStatus.CANCELLED.value:
+            logger.info(f"Eval run {run_id} was cancelled before it started")
+            return
+        
+        # Resume after items persisted by an interrupted attempt
+        await ensure_items(session, run)
+        results = await load_results(session, run.id)
+        metrics = restore_metrics(run, results)
+        inputs: List[Dict[str, Any]] = []
+        fair_scheduler.register(run.id, run.priority)
+        watcher = None
+        
+        try:
+            # Update status to processing
+            run.status = EvalStatus.PROCESSING.value
+            run.started_at = run.started_at or datetime.utcnow()
+            await session.commit()
             
-            try:
-                # Update status to processing
-                run.status = EvalStatus.PROCESSING.value
-                run.started_at = datetime.utcnow()
-                await session.commit()
-                
-                # Initialize client
-                client = GroqLLMClient()
-                
-                inputs = run.inputs or []
-                results = []
-                latencies = []
-                passed_count = 0
-                all_logprobs = []
-                
-                for i, input_data in enumerate(inputs):
-                    try:
-                        start_time = time.time()
-                        
-                        # Collect full response
-                        full_response = ""
-                        token_logprobs = []
-                        
-                        async for chunk in client.stream_chat_completion(
-                            system_prompt=input_data.get("system_prompt", "You are a helpful assistant."),
-                            user_prompt=input_data.get("user_prompt", ""),
-                            model=run.model,
-                            temperature=0.7,
-                            max_tokens=1024,
-                        ):
-                            if chunk.token:
-                                full_response += chunk.token.text
-                                token_logprobs.append(chunk.token.logprob)
-                            if chunk.done:
-                                break
-                            if chunk.error:
-                                raise Exception(chunk.error)
-                        
-                        latency_ms = (time.time() - start_time) * 1000
-                        latencies.append(latency_ms)
-                        all_logprobs.extend(token_logprobs)
-                        
-                        # Validate output
-                        passed = True
-                        failure_reason = None
-                        metric_config = run.metric_config or {}
-                        
-                        if metric_config.get("check_json"):
-                            passed, failure_reason = validate_json_output(full_response)
-                        
-                        if passed and metric_config.get("check_length"):
-                            passed, failure_reason = validate_length(
-                                full_response, 
-                                metric_config["check_length"]
-                            )
-                        
-                        if passed:
-                            passed_count += 1
-                        
-                        results.append({
-                            "input_prompt": input_data.get("user_prompt", ""),
-                            "output": full_response,
-                            "latency_ms": latency_ms,
-                            "passed": passed,
-                            "failure_reason": failure_reason,
-                        })
-                        
-                        # Update progress
-                        run.completed_items = i + 1
-                        await session.commit()
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing item {i}: {e}")
-                        results.append({
-                            "input_prompt": input_data.get("user_prompt", ""),
-                            "output": "",
-                            "latency_ms": 0,
-                            "passed": False,
-                            "failure_reason": str(e),
-                        })
+            # Cancellation signal (local or polled) and deadlines
+            control = RunControl.for_run(run)
+            active_runs[run.id] = control
+            if run.cancel_requested:
+                control.cancel()
+            watcher = asyncio.create_task(watch_cancellation(control, session_factory))
+            
+            # Initialize client (unless the caller owns a long-lived one)
+            client = client or GroqLLMClient()
+            
+            # Compile validators once for the whole run
+            validator_set = ValidatorSet(run.metric_config)
+            deferred = DeferredValidation(validator_set.expensive_specs) if validator_set.has_expensive else None
+            
+            # Comparison lanes share their parent's inputs and schedule
+            parent = await session.get(EvalRun, run.parent_id) if run.parent_id else None
+            inputs = run.inputs or (parent.inputs if parent else None) or []
+            schedule = run.schedule or (parent.schedule if parent else None)
+            if results:
+                logger.info(f"Resuming eval run {run_id} after {len(results)} items")
+            
+            # Optional sequential stopping over the (random) scheduled order
+            order = schedule or list(range(len(inputs)))
+            rule = StoppingRule.from_dict(run.stopping_rule)
+            monitor = SequentialMonitor(rule, order, record_result) if rule else None
+            stop_reason = None
+            for result in results if monitor else []:
+                stop_reason = monitor.add(result) or stop_reason
+            
+            # Pending items in scheduled order
+            finished = {r["index"] for r in results}
+            pending = [] if stop_reason else [i for i in order if i not in finished]
+            
+            async def finalize(batch: List[Dict[str, Any]]) -> None:
+                nonlocal stop_reason
+                if not batch:
+                    return
+                for result in batch:
+                    results.append(result)
+                    record_result(metrics, result)
+                    if monitor:
+                        stop_reason = stop_reason or monitor.add(result)
                 
-                # Calculate final metrics
-                run.status = EvalStatus.COMPLETED.value
-                run.completed_at = datetime.utcnow()
-                run.results = results
-                run.outputs = [r["output"] for r in results]
-                run.avg_latency_ms = sum(latencies) / len(latencies) if latencies else 0
-                run.pass_rate = passed_count / len(inputs) if inputs else 0
+                # Update progress and running metrics
+                run.completed_items = len(results)
+                snapshot_metrics(run, metrics)
+                await session.commit()
+            
+            async def ingest(group: List[Dict[str, Any]]) -> None:
+                # Generated items wait for their expensive-validator batch; failed ones are final
+                done = []
+                for result in group:
+                    final = result.get("aborted") or result.get("timed_out")
+                    if deferred and "validations" in result and not final:
+                        deferred.add(result, inputs[result["index"]])
+                    else:
+                        done.append(result)
+                await finalize(done + (deferred.ready() if deferred else []))
+            
+            if run.execution_mode == ExecutionMode.BATCH.value:
+                # One provider batch job; its results arrive together once it finishes
+                groups = run_batch(client, session, run, inputs, pending, validator_set, control)
+                async with aclosing(groups):
+                    async for group in groups:
+                        await ingest(group)
+            else:
+                # Token estimates for the rate budget
+                estimates = await asyncio.to_thread(
+                    estimate_items, [inputs[i] for i in pending], run.max_tokens or 1024, run.model
+                )
                 
-                if all_logprobs:
-                    run.avg_perplexity = calculate_perplexity(all_logprobs)
+                # No new items start once the run deadline has passed
+                item_coros = (
+                    lambda i=i, est=est: evaluate_item(client, run, i, inputs[i], est, validator_set, control)
+                    for i, est in zip(pending, estimates)
+                    if not control.deadline_passed()
+                )
                 
-                await session.commit()
+                # Cancelling ends the loop at once; items in flight (and their streams) are cancelled
+                completed = run_bounded(item_coros, settings.eval_item_concurrency, stop=control.cancelled)
+                async with aclosing(completed):
+                    async for result in completed:
+                        if result is not None:
+                            await ingest([result])
+                        if stop_reason or control.cancelled.is_set():
+                            # Leaving the loop cancels items still in flight
+                            break
+            
+            cancelled = control.cancelled.is_set()
+            if cancelled and control.reason == CancelReason.DELETED:
+                logger.info(f"Eval run {run_id} was deleted while running; stopped after {len(results)} items")
+                return
+            
+            if deferred and not (stop_reason or cancelled):
+                await finalize(await deferred.drain())
+            
+            if monitor:
+                if stop_reason:
+                    # Keep only the unbiased prefix of the random order
+                    logger.info(
+                        f"Eval run {run_id} stopped early ({stop_reason}) after {len(monitor.prefix)} items, "
+                        f"discarding {len(results) - len(monitor.prefix)} out-of-order results"
+                    )
+                    results, metrics = list(monitor.prefix), monitor.metrics
+                run.stopping = rule.evaluate(metrics, stop_reason or StopReason.EXHAUSTED)
+            
+            # Score outputs against expected_output in one batch over the whole run
+            from .reference import score_results
+            run.reference_metrics = await asyncio.to_thread(score_results, results, inputs)
+            
+            # Calculate final metrics
+            results.sort(key=lambda r: r["index"])
+            await store_items(session, run.id, results, inputs)
+            run.status = EvalStatus.CANCELLED.value if cancelled else EvalStatus.COMPLETED.value
+            run.completed_at = datetime.utcnow()
+            run.completed_items = len(results)
+            snapshot_metrics(run, metrics)
+            
+            if cancelled:
+                run.error_message = f"Cancelled after {len(results)} of {len(order)} items"
+            elif control.deadline_passed() and not stop_reason and len(results) < len(order):
+                run.error_message = (
+                    f"Run deadline of {run.run_timeout_seconds:g}s exceeded; "
+                    f"{len(order) - len(results)} items not evaluated"
+                )
+            
+            await session.commit()
+            if cancelled:
+                logger.info(f"Eval run {run_id} cancelled after {len(results)} items")
+            else:
                 logger.info(f"Eval run {run_id} completed successfully")
-                
-            except Exception as e:
-                logger.error(f"Eval run {run_id} failed: {e}")
-                run.status = EvalStatus.FAILED.value
-                run.error_message = str(e)
-                run.completed_at = datetime.utcnow()
-                await session.commit()
-    
-    # Run the async function
-    asyncio.run(_run_eval())
+        
+        except asyncio.CancelledError:
+            # Graceful shutdown: persist finished items and hand the rest back
+            logger.warning(f"Eval run {run_id} interrupted after {len(results)} items, re-queueing")
+            run.status = EvalStatus.PENDING.value
+            if inputs:
+                await store_items(session, run.id, results, inputs)
+            run.completed_items = len(results)
+            snapshot_metrics(run, metrics)
+            await session.commit()
+            raise
+            
+        except Exception as e:
+            logger.error(f"Eval run {run_id} failed: {e}")
+            run.status = EvalStatus.FAILED.value
+            run.error_message = str(e)
+            run.completed_at = datetime.utcnow()
+            await session.commit()
+        
+        finally:
+            if watcher:
+                watcher.cancel()
+            active_runs.pop(run.id, None)
+            fair_scheduler.unregister(run.id)
 
 
-def run_evaluation_sync(run_id: str):
+async def execute_comparison_run(
+    run_id: str,
+    session_factory: async_sessionmaker = async_session_factory,
+    client: GroqLLMClient | None = None,
+) -> None:
     """
-    Synchronous version of evaluation for when Celery/Redis is not available.
+    Run every model lane of a comparison run concurrently.
     
-    This can be called directly for development/testing.
-    """
-    import asyncio
+    Each lane is a regular eval run over the parent's inputs, with its own
+    per-model rate budget, so wall time tracks the slowest lane rather than
+    the sum. Lanes already completed by an earlier attempt are skipped.
     
-    async def _run():
-        async with async_session_factory() as session:
-            run = await session.get(EvalRun, run_id)
-            if not run:
-                return
-            
-            # Simplified sync processing
+    Args:
+        run_id: Comparison (parent) run identifier
+        session_factory: Session factory bound to the caller's event loop
+        client: Shared LLM client; a new one is created per lane when omitted
+    """
+    async with session_factory() as session:
+        run = await session.get(EvalRun, run_id)
+        if not run:
+            logger.error(f"Eval run {run_id} not found")
+            return
+        if run.status == EvalStatus.CANCELLED.value:
+            logger.info(f"Comparison run {run_id} was cancelled before it started")
+            return
+        
+        lane_rows = (await session.execute(
+            select(EvalRun.id, EvalRun.status).where(EvalRun.parent_id == run_id)
+        )).all()
+        
+        try:
             run.status = EvalStatus.PROCESSING.value
-            run.started_at = datetime.utcnow()
+            run.started_at = run.started_at or datetime.utcnow()
             await session.commit()
             
-            try:
-                client = GroqLLMClient()
-                inputs = run.inputs or []
-                results = []
-                latencies = []
-                passed_count = 0
-                
-                for i, input_data in enumerate(inputs):
-                    start_time = time.time()
-                    full_response = ""
-                    
-                    async for chunk in client.stream_chat_completion(
-                        system_prompt=input_data.get("system_prompt", "You are a helpful assistant."),
-                        user_prompt=input_data.get("user_prompt", ""),
-                        model=run.model,
-                    ):
-                        if chunk.token:
-                            full_response += chunk.token.text
-                        if chunk.done or chunk.error:
-                            break
-                    
-                    latency_ms = (time.time() - start_time) * 1000
-                    latencies.append(latency_ms)
-                    
-                    passed = True
-                    results.append({
-                        "input_prompt": input_data.get("user_prompt", ""),
-                        "output": full_response,
-                        "latency_ms": latency_ms,
-                        "passed": passed,
-                    })
-                    passed_count += 1
-                    
-                    run.completed_items = i + 1
-                    await session.commit()
-                
-                run.status = EvalStatus.COMPLETED.value
-                run.completed_at = datetime.utcnow()
-                run.results = results
-                run.avg_latency_ms = sum(latencies) / len(latencies) if latencies else 0
-                run.pass_rate = passed_count / len(inputs) if inputs else 0
-                await session.commit()
-                
-            except Exception as e:
+            await asyncio.gather(*(
+                execute_eval_run(lane.id, session_factory, client)
+                for lane in lane_rows
+                if lane.status != EvalStatus.COMPLETED.value
+            ))
+            
+            lanes = (await session.execute(
+                select(EvalRun.model, EvalRun.status, EvalRun.completed_items, EvalRun.error_message)
+                .where(EvalRun.parent_id == run_id)
+            )).all()
+            if not lanes:
+                logger.info(f"Comparison run {run_id} was deleted while running")
+                return
+            failed = [lane for lane in lanes if lane.status == EvalStatus.FAILED.value]
+            cancelled = [lane for lane in lanes if lane.status == EvalStatus.CANCELLED.value]
+            
+            run.completed_items = sum(lane.completed_items or 0 for lane in lanes)
+            run.completed_at = datetime.utcnow()
+            if cancelled:
+                run.status = EvalStatus.CANCELLED.value
+                run.error_message = f"Cancelled ({len(cancelled)} of {len(lanes)} lanes)"
+            elif len(failed) == len(lanes):
                 run.status = EvalStatus.FAILED.value
-                run.error_message = str(e)
-                await session.commit()
+                run.error_message = "All comparison lanes failed"
+            else:
+                run.status = EvalStatus.COMPLETED.value
+                if failed:
+                    run.error_message = "; ".join(f"{lane.model}: {lane.error_message}" for lane in failed)
+            await session.commit()
+            logger.info(f"Comparison run {run_id} finished ({len(lanes) - len(failed)}/{len(lanes)} lanes ok)")
+        
+        except asyncio.CancelledError:
+            # Lanes persist their own progress; the parent goes back to the queue
+            run.status = EvalStatus.PENDING.value
+            await session.commit()
+            raise
+
+
+async def execute_run(
+    run_id: str,
+    session_factory: async_sessionmaker = async_session_factory,
+    client: GroqLLMClient | None = None,
+) -> None:
+    """Execute a run of any type (entry point for Celery and the in-process runner)."""
+    async with session_factory() as session:
+        run_type = (await session.execute(
+            select(EvalRun.run_type).where(EvalRun.id == run_id)
+        )).scalar_one_or_none()
+    
+    if run_type == RunType.COMPARISON.value:
+        await execute_comparison_run(run_id, session_factory, client)
+    else:
+        await execute_eval_run(run_id, session_factory, client)
+
+
+@celery_app.task(bind=True)
+def run_evaluation_task(self, run_id: str):
+    """
+    Celery task to run evaluation asynchronously.
     
-    asyncio.run(_run())
+    Runs `execute_run` on the worker process's persistent event loop,
+    reusing its DB engine and LLM client across tasks.
+    """
+    runtime = get_worker_runtime()
+    runtime.run(execute_run(run_id, runtime.session_factory, runtime.llm_client))
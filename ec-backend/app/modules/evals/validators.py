@@ -0,0 +1,428 @@
+"""Pluggable output validators for eval runs.
+
+Validators are registered by name with a factory that compiles its
+parameters once per run (regexes, JSON schemas, keyword sets). Every
+configured validator runs on every fully generated item and reports its
+own result.
+
+Validators with a streaming counterpart (see `stream_validators`) also
+watch tokens as they arrive; a definite failure cancels generation and
+the item is reported with just that failure.
+Cheap validators run inline as each item finishes generating. Expensive
+ones (e.g. readability scoring) are collected into batches and executed on
+a process pool, so they never hold up the network-bound generation loop.
+"""
+
+import asyncio
+import json
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.assets import missing_assets
+from app.core.config import settings
+from .stream_validators import StreamMonitor, compile_stream_validators
+
+
+# A compiled check: (output, input item) -> (passed, reason), or None if not applicable
+Check = Callable[[str, Dict[str, Any]], Optional[Tuple[bool, Optional[str]]]]
+
+
+@dataclass
+class ValidatorFactory:
+    """Registry entry: builds a compiled check from validator params."""
+    name: str
+    build: Callable[[Dict[str, Any]], Check]
+    expensive: bool = False
+
+
+VALIDATORS: Dict[str, ValidatorFactory] = {}
+
+
+def register_validator(name: str, expensive: bool = False):
+    """
+    Decorator registering a validator factory under `name`.
+
+    The factory receives the validator's params dict and returns a check
+    function. Factories should raise ValueError for invalid params.
+    """
+    def decorator(build: Callable[[Dict[str, Any]], Check]):
+        VALIDATORS[name] = ValidatorFactory(name=name, build=build, expensive=expensive)
+        return build
+    return decorator
+
+
+@register_validator("json")
+def _build_json(params: Dict[str, Any]) -> Check:
+    def check(output, item):
+        try:
+            json.loads(output)
+            return True, None
+        except json.JSONDecodeError as e:
+            return False, f"Invalid JSON: {str(e)}"
+    return check
+
+
+@register_validator("length")
+def _build_length(params: Dict[str, Any]) -> Check:
+    expected = int(params["expected"])
+    tolerance = float(params.get("tolerance", 0.2))
+    min_length = int(expected * (1 - tolerance))
+    max_length = int(expected * (1 + tolerance))
+
+    def check(output, item):
+        if min_length <= len(output) <= max_length:
+            return True, None
+        return False, f"Length {len(output)} not within {min_length}-{max_length}"
+    return check
+
+
+@register_validator("regex")
+def _build_regex(params: Dict[str, Any]) -> Check:
+    flags = re.IGNORECASE if params.get("ignore_case") else 0
+    try:
+        pattern = re.compile(params["pattern"], flags | re.DOTALL)
+    except re.error as e:
+        raise ValueError(f"Invalid regex: {e}")
+    full = params.get("mode", "search") == "fullmatch"
+
+    def check(output, item):
+        matched = pattern.fullmatch(output.strip()) if full else pattern.search(output)
+        if matched:
+            return True, None
+        return False, f"Output does not match /{pattern.pattern}/"
+    return check
+
+
+@register_validator("json_schema")
+def _build_json_schema(params: Dict[str, Any]) -> Check:
+    try:
+        from jsonschema import exceptions, validators
+    except ImportError:
+        raise ValueError("json_schema validation requires the 'jsonschema' package")
+
+    schema = params["schema"]
+    try:
+        validator_cls = validators.validator_for(schema)
+        validator_cls.check_schema(schema)
+    except exceptions.SchemaError as e:
+        raise ValueError(f"Invalid JSON schema: {e.message}")
+    validator = validator_cls(schema)
+
+    def check(output, item):
+        try:
+            data = json.loads(output)
+        except json.JSONDecodeError as e:
+            return False, f"Invalid JSON: {str(e)}"
+        error = exceptions.best_match(validator.iter_errors(data))
+        if error is None:
+            return True, None
+        path = "/".join(str(p) for p in error.absolute_path) or "<root>"
+        return False, f"Schema violation at {path}: {error.message}"
+    return check
+
+
+@register_validator("expected_match")
+def _build_expected_match(params: Dict[str, Any]) -> Check:
+    mode = params.get("mode", "normalized")
+    if mode not in ("exact", "normalized"):
+        raise ValueError(f"Unknown expected_match mode: {mode}")
+
+    # reference pulls in NumPy; only runs using this validator need it
+    from .reference import normalize_text
+
+    def check(output, item):
+        expected = item.get("expected_output")
+        if expected is None:
+            return None
+        if mode == "exact":
+            matched = output.strip() == expected.strip()
+        else:
+            matched = normalize_text(output) == normalize_text(expected)
+        return (True, None) if matched else (False, f"Output does not match expected ({mode})")
+    return check
+
+
+def _keyword_params(params: Dict[str, Any]) -> Tuple[List[str], bool]:
+    keywords = params.get("keywords") or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    case_sensitive = bool(params.get("case_sensitive", False))
+    return [k if case_sensitive else k.lower() for k in keywords], case_sensitive
+
+
+@register_validator("contains")
+def _build_contains(params: Dict[str, Any]) -> Check:
+    keywords, case_sensitive = _keyword_params(params)
+    require_all = params.get("mode", "all") == "all"
+
+    def check(output, item):
+        text = output if case_sensitive else output.lower()
+        missing = [k for k in keywords if k not in text]
+        if (not missing) if require_all else (len(missing) < len(keywords)):
+            return True, None
+        return False, f"Missing keywords: {', '.join(missing)}"
+    return check
+
+
+@register_validator("excludes")
+def _build_excludes(params: Dict[str, Any]) -> Check:
+    keywords, case_sensitive = _keyword_params(params)
+
+    def check(output, item):
+        text = output if case_sensitive else output.lower()
+        found = [k for k in keywords if k in text]
+        if not found:
+            return True, None
+        return False, f"Forbidden keywords present: {', '.join(found)}"
+    return check
+
+
+@register_validator("readability", expensive=True)
+def _build_readability(params: Dict[str, Any]) -> Check:
+    min_ease = params.get("min_reading_ease")
+    max_grade = params.get("max_grade_level")
+
+    # textstat downloads cmudict on first use; only score with what the build prepared
+    if "nltk:cmudict" in missing_assets():
+        def unavailable(output, item):
+            return False, "Readability data (nltk:cmudict) not installed (run `python -m app.core.assets`)"
+        return unavailable
+
+    def check(output, item):
+        import textstat
+
+        if not output.strip():
+            return False, "Empty output"
+        reasons = []
+        if min_ease is not None:
+            ease = textstat.flesch_reading_ease(output)
+            if ease < min_ease:
+                reasons.append(f"Reading ease {ease:.1f} < {min_ease}")
+        if max_grade is not None:
+            grade = textstat.flesch_kincaid_grade(output)
+            if grade > max_grade:
+                reasons.append(f"Grade level {grade:.1f} > {max_grade}")
+        return (False, "; ".join(reasons)) if reasons else (True, None)
+    return check
+
+
+def specs_from_config(metric_config: Dict[str, Any] | None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Translate a MetricConfig dict into (validator name, params) pairs.
+
+    Built-in fields map to their validators; `custom_rules` entries are
+    passed through as {validator name: params}.
+    """
+    config = metric_config or {}
+    specs = []
+    if config.get("check_json"):
+        specs.append(("json", {}))
+    if config.get("check_length"):
+        specs.append(("length", {"expected": config["check_length"]}))
+    if config.get("regex"):
+        specs.append(("regex", {"pattern": config["regex"]}))
+    if config.get("json_schema"):
+        specs.append(("json_schema", {"schema": config["json_schema"]}))
+    if config.get("match_expected"):
+        specs.append(("expected_match", {"mode": config["match_expected"]}))
+    if config.get("contains"):
+        specs.append(("contains", {"keywords": config["contains"]}))
+    if config.get("excludes"):
+        specs.append(("excludes", {"keywords": config["excludes"]}))
+    if config.get("readability"):
+        specs.append(("readability", config["readability"]))
+    for name, params in (config.get("custom_rules") or {}).items():
+        specs.append((name, params if isinstance(params, dict) else {"value": params}))
+    return specs
+
+
+@dataclass
+class CompiledValidator:
+    """A validator with its params compiled for one run."""
+    name: str
+    check: Check
+    expensive: bool
+
+
+def compile_validators(specs: List[Tuple[str, Dict[str, Any]]]) -> List[CompiledValidator]:
+    """
+    Compile validator specs once per run.
+
+    Raises:
+        ValueError: For unknown validators or invalid params
+    """
+    compiled = []
+    for name, params in specs:
+        factory = VALIDATORS.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown validator '{name}'. Available: {', '.join(sorted(VALIDATORS))}")
+        try:
+            check = factory.build(params)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid params for validator '{name}': {e}")
+        compiled.append(CompiledValidator(name=name, check=check, expensive=factory.expensive))
+    return compiled
+
+
+def _describe_error(error: Exception) -> str:
+    """First meaningful line of an exception (some, like NLTK's, are multi-line banners)."""
+    lines = [line.strip(" *") for line in str(error).splitlines() if line.strip(" *")]
+    return f"{type(error).__name__}: {lines[0]}" if lines else type(error).__name__
+
+
+def run_validators(
+    validators: List[CompiledValidator],
+    output: str,
+    item: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Run every validator on one output; errors count as failures."""
+    results = []
+    for validator in validators:
+        try:
+            outcome = validator.check(output, item)
+        except Exception as e:
+            outcome = (False, f"Validator error: {_describe_error(e)}")
+        if outcome is None:
+            continue
+        passed, reason = outcome
+        results.append({"name": validator.name, "passed": passed, "reason": reason})
+    return results
+
+
+def apply_validations(result: Dict[str, Any], validations: List[Dict[str, Any]]) -> None:
+    """Merge validator outcomes into an item result and recompute pass/fail."""
+    result.setdefault("validations", []).extend(validations)
+    failures = [v["reason"] or v["name"] for v in result["validations"] if not v["passed"]]
+    result["passed"] = not failures
+    result["failure_reason"] = "; ".join(failures) if failures else None
+
+
+def validate_batch(
+    specs: List[Tuple[str, Dict[str, Any]]],
+    outputs: List[str],
+    items: List[Dict[str, Any]],
+) -> List[List[Dict[str, Any]]]:
+    """Compile and run validators over a batch (process pool entry point)."""
+    validators = compile_validators(specs)
+    return [run_validators(validators, output, item) for output, item in zip(outputs, items)]
+
+
+class ValidatorSet:
+    """Compiled validators for a run, split into inline and deferred groups."""
+
+    def __init__(self, metric_config: Dict[str, Any] | None):
+        specs = specs_from_config(metric_config)
+        compiled = compile_validators(specs)
+        self.cheap = [v for v in compiled if not v.expensive]
+        self.expensive_specs = [spec for spec, v in zip(specs, compiled) if v.expensive]
+        self.streaming = compile_stream_validators(specs)
+
+    @property
+    def has_expensive(self) -> bool:
+        return bool(self.expensive_specs)
+
+    def start_stream(self) -> StreamMonitor | None:
+        """Fresh incremental-check state for one item, or None if nothing can abort early."""
+        if not self.streaming:
+            return None
+        return StreamMonitor([(name, create()) for name, create in self.streaming])
+
+
+_pool: Executor | None = None
+
+
+def get_validation_pool() -> Executor:
+    """Process pool for expensive validators, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.validator_pool_workers)
+    return _pool
+
+
+def _fall_back_to_threads(error: Exception) -> Executor:
+    """Switch to a thread pool where child processes aren't allowed (e.g. daemonic workers)."""
+    global _pool
+    logger.warning(f"Validator process pool unavailable, using threads: {error}")
+    _pool = ThreadPoolExecutor(max_workers=settings.validator_pool_workers)
+    return _pool
+
+
+def shutdown_validation_pool() -> None:
+    """Shut down the validator pool (on app or worker shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class DeferredValidation:
+    """
+    Batches generated results through expensive validators off the event loop.
+
+    `add` buffers results and submits full batches; `ready` returns results
+    whose batch has finished without waiting; `drain` flushes and waits for
+    everything. Results are only final once they come back from here.
+    """
+
+    def __init__(self, specs: List[Tuple[str, Dict[str, Any]]], batch_size: int | None = None):
+        self.specs = specs
+        self.batch_size = batch_size or settings.validator_batch_size
+        self._buffer: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        self._batches: List[Tuple[asyncio.Future, List[Dict[str, Any]]]] = []
+
+    def add(self, result: Dict[str, Any], item: Dict[str, Any]) -> None:
+        self._buffer.append((result, item))
+        if len(self._buffer) >= self.batch_size:
+            self._submit()
+
+    def _submit(self) -> None:
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        results = [r for r, _ in batch]
+        args = (self.specs, [r["output"] for r in results], [item for _, item in batch])
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(get_validation_pool(), validate_batch, *args)
+        except (AssertionError, OSError, RuntimeError) as e:
+            future = loop.run_in_executor(_fall_back_to_threads(e), validate_batch, *args)
+        self._batches.append((future, results))
+
+    def _collect(self, future: asyncio.Future, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            batch_validations = future.result()
+        except Exception as e:
+            logger.error(f"Deferred validation batch failed: {e}")
+            batch_validations = [
+                [{"name": name, "passed": False, "reason": f"Validator error: {_describe_error(e)}"} for name, _ in self.specs]
+                for _ in results
+            ]
+        for result, validations in zip(results, batch_validations):
+            apply_validations(result, validations)
+        return results
+
+    def ready(self) -> List[Dict[str, Any]]:
+        """Results from batches that have already finished."""
+        finished = []
+        pending = []
+        for future, results in self._batches:
+            if future.done():
+                finished.extend(self._collect(future, results))
+            else:
+                pending.append((future, results))
+        self._batches = pending
+        return finished
+
+    async def drain(self) -> List[Dict[str, Any]]:
+        """Submit the partial batch and wait for all outstanding batches."""
+        self._submit()
+        finished = []
+        for future, results in self._batches:
+            await asyncio.wait([future])
+            finished.extend(self._collect(future, results))
+        self._batches = []
+        return finished
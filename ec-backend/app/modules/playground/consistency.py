@@ -0,0 +1,84 @@
+"""Self-consistency of repeated samples for the same prompt.
+
+Samples that agree with each other are less likely to be hallucinated:
+a model that knows the answer tends to give it every time, while a guess
+varies between samples. Two views of agreement are reported, both cheap
+enough to compute inline at the end of a stream:
+
+- pairwise similarity: mean word-set Jaccard overlap over all sample pairs
+- answer clusters: samples grouped by overlap, with the entropy of the
+  cluster sizes (0 when every sample gives the same answer)
+"""
+
+import math
+import re
+from itertools import combinations
+from typing import Any, Dict, List, Set
+
+
+# Samples whose word overlap with a cluster's first member reaches this join that cluster
+CLUSTER_THRESHOLD = 0.8
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> Set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_answers(texts: List[str], threshold: float = CLUSTER_THRESHOLD) -> List[int]:
+    """
+    Greedily cluster samples by word overlap.
+
+    Returns:
+        Cluster label per sample, numbered in order of first appearance
+    """
+    word_sets = [_words(text) for text in texts]
+    representatives: List[Set[str]] = []
+    labels = []
+    for words in word_sets:
+        for label, representative in enumerate(representatives):
+            if _jaccard(words, representative) >= threshold:
+                labels.append(label)
+                break
+        else:
+            labels.append(len(representatives))
+            representatives.append(words)
+    return labels
+
+
+def consistency_score(texts: List[str]) -> Dict[str, Any]:
+    """
+    Agreement across samples of the same prompt.
+
+    Args:
+        texts: Completed sample outputs (at least two)
+
+    Returns:
+        Dict with pairwise_similarity (0-1), clusters, majority_fraction,
+        cluster_entropy (bits) and normalized_entropy (0-1, entropy over
+        its maximum for this many samples)
+    """
+    word_sets = [_words(text) for text in texts]
+    pairs = list(combinations(word_sets, 2))
+    similarity = sum(_jaccard(a, b) for a, b in pairs) / len(pairs) if pairs else 1.0
+
+    labels = cluster_answers(texts)
+    sizes = [labels.count(label) for label in set(labels)]
+    n = len(texts)
+    entropy = sum((size / n) * math.log2(n / size) for size in sizes) if n else 0.0
+
+    return {
+        "samples": n,
+        "pairwise_similarity": round(similarity, 4),
+        "clusters": len(sizes),
+        "majority_fraction": round(max(sizes) / n, 4) if n else 0.0,
+        "cluster_entropy": round(entropy, 4),
+        "normalized_entropy": round(entropy / math.log2(n), 4) if n > 1 else 0.0,
+    }
@@ -0,0 +1,33 @@
+"""SQLAlchemy models for Playground module."""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Integer, JSON, String, Text
+
+from app.core.database import Base
+
+
+class PlaygroundSession(Base):
+    """A recorded playground session; its token streams live in the recording blob store."""
+    
+    __tablename__ = "playground_sessions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    # Request
+    models = Column(JSON, nullable=False)
+    n = Column(Integer, default=1, nullable=False)
+    system_prompt = Column(Text, nullable=True)
+    user_prompt = Column(Text, nullable=False)
+    temperature = Column(Float, nullable=True)
+    max_tokens = Column(Integer, nullable=True)
+    top_p = Column(Float, nullable=True)
+    
+    # Per-stream summary (model, sample, status, tokens, timings) for listings
+    streams = Column(JSON, nullable=False)
+    duration_ms = Column(Float, nullable=True)
+    
+    # Compressed recording
+    blob_key = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
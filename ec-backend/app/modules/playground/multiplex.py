@@ -0,0 +1,173 @@
+"""Fan-in of concurrent playground streams onto one SSE response.
+
+Every (model, sample) pair streams from its own task into a shared queue;
+the SSE generator drains the queue and tags each event with its stream.
+Chunks are timestamped when they arrive from upstream, not when the
+generator gets to them, so per-model TTFT and throughput aren't skewed by
+the other streams sharing the response.
+
+Recorded sessions are replayed by putting their chunks on the same kind
+of queue (see `recorder.replay`), so live and replayed sessions produce
+the same events.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.modules.common.llm_client import StreamChunk
+from .consistency import consistency_score
+
+
+# (model, sample index)
+StreamKey = Tuple[str, int]
+
+# Observer of every chunk taken off the queue (None marks the end of a stream)
+ChunkHook = Callable[[StreamKey, Optional[StreamChunk], float], None]
+
+
+async def pump(stream: AsyncGenerator[StreamChunk, None], key: StreamKey, queue: asyncio.Queue) -> None:
+    """Forward one stream's chunks (with arrival times) to the shared queue, then a None sentinel."""
+    try:
+        async for chunk in stream:
+            await queue.put((key, chunk, time.perf_counter()))
+            if chunk.done or chunk.error:
+                break
+    finally:
+        # Closes the upstream stream when the sample ends early or is cancelled
+        await stream.aclose()
+        queue.put_nowait((key, None, time.perf_counter()))
+
+
+@dataclass
+class StreamStats:
+    """Live timing for one stream."""
+    model: str
+    sample: int
+    started_at: float
+    first_token_at: Optional[float] = None
+    last_token_at: Optional[float] = None
+    tokens: int = 0
+    reported_at: float = 0.0
+
+    def record_token(self, at: float) -> None:
+        """Count a token that arrived at `at` (perf_counter)."""
+        if self.first_token_at is None:
+            self.first_token_at = at
+        self.last_token_at = at
+        self.tokens += 1
+
+    def report_due(self, now: float, interval: float) -> bool:
+        """Whether a live metrics event is due (always for the first token)."""
+        if self.tokens == 1 or now - self.reported_at >= interval:
+            self.reported_at = now
+            return True
+        return False
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        """
+        Current metrics.
+
+        tokens_per_s is the decode rate after the first token, so it
+        compares models independently of their queueing / prefill time
+        (which TTFT covers).
+        """
+        ttft = self.first_token_at - self.started_at if self.first_token_at is not None else None
+        decode_time = (self.last_token_at - self.first_token_at) if self.tokens > 1 else 0.0
+        return {
+            "model": self.model,
+            "sample": self.sample,
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "tokens": self.tokens,
+            "tokens_per_s": round((self.tokens - 1) / decode_time, 1) if decode_time > 0 else None,
+            "elapsed_ms": round((now - self.started_at) * 1000, 1),
+        }
+
+
+async def multiplex_events(
+    keys: List[StreamKey],
+    queue: asyncio.Queue,
+    started_at: float,
+    n: int,
+    on_chunk: Optional[ChunkHook] = None,
+) -> AsyncGenerator[Dict[str, str], None]:
+    """
+    SSE events for the chunks of `keys` arriving on `queue`, until every stream has ended.
+
+    Yields token, metrics, error and sample_done events tagged with their
+    stream, then (when `n` > 1) one consistency event per model; the
+    caller sends the final done event.
+
+    Args:
+        keys: Streams feeding the queue, in model-major order
+        queue: (key, chunk or None, arrival perf_counter) tuples, as put by `pump`
+        started_at: perf_counter the streams started at (TTFT baseline)
+        n: Samples per model
+        on_chunk: Called with every queue entry (e.g. a session recorder)
+    """
+    models = list(dict.fromkeys(model for model, _ in keys))
+    stats = {key: StreamStats(key[0], key[1], started_at) for key in keys}
+    outputs = {key: [] for key in keys}
+    failed = set()
+    pending = len(keys)
+    while pending:
+        key, chunk, arrived_at = await queue.get()
+        if on_chunk:
+            on_chunk(key, chunk, arrived_at)
+        tags = {"model": key[0], "sample": key[1]}
+
+        if chunk is None:
+            pending -= 1
+            yield {
+                "event": "sample_done",
+                "data": json.dumps({
+                    **stats[key].snapshot(arrived_at),
+                    "status": "failed" if key in failed else "completed",
+                }),
+            }
+            continue
+
+        if chunk.error:
+            failed.add(key)
+            yield {
+                "event": "error",
+                "data": json.dumps({**tags, "error": chunk.error}),
+            }
+            continue
+
+        if chunk.token:
+            outputs[key].append(chunk.token.text)
+            stats[key].record_token(arrived_at)
+            token_data = {
+                **tags,
+                "id": chunk.token.id,
+                "text": chunk.token.text,
+                "logprob": round(chunk.token.logprob, 6),
+                "entropy": round(chunk.token.entropy, 6),
+            }
+            yield {
+                "event": "token",
+                "data": json.dumps(token_data),
+            }
+            if stats[key].report_due(arrived_at, settings.playground_metrics_interval_seconds):
+                yield {
+                    "event": "metrics",
+                    "data": json.dumps(stats[key].snapshot(arrived_at)),
+                }
+
+    # Agreement across each model's samples (needs at least two that completed)
+    if n > 1:
+        for model in models:
+            completed = [
+                "".join(outputs[(model, sample)])
+                for sample in range(n)
+                if (model, sample) not in failed
+            ]
+            if len(completed) > 1:
+                yield {
+                    "event": "consistency",
+                    "data": json.dumps({"model": model, **consistency_score(completed)}),
+                }
@@ -0,0 +1,242 @@
+"""Recording and replay of playground token streams.
+
+With recording on (PLAYGROUND_RECORDING_ENABLED, or `record` per request),
+every playground session that runs to completion is saved for offline
+analysis. The save holds the request and, for each (model, sample)
+stream, each token's text, logprob, entropy and top-k alternatives, plus
+when it arrived. Streams are stored column-wise, with arrival times as
+integer microsecond gaps. Each session is one zstd-compressed JSONL blob
+(`sessions/<id>/streams.jsonl.zst` under RECORDING_DIR). A
+`playground_sessions` row keeps the request and per-stream summaries for
+listings.
+
+Replaying puts the recorded chunks on a queue exactly as the live
+`pump`s would, so the same multiplexer emits the same events (tokens,
+live metrics, sample_done, consistency). Playback runs at the original
+pace, faster, or all at once, and never calls the provider. Timings in
+the events are the original ones, whatever the playback speed.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.modules.common.llm_client import StreamChunk, TokenData
+from app.modules.evals.archive import LocalBlobStore, compress_records, decompress_records
+from .models import PlaygroundSession
+from .multiplex import StreamKey, StreamStats
+from .schemas import ChatCompletionRequest
+
+
+# Bumped when the blob layout changes
+RECORDING_FORMAT = 1
+
+recording_store = LocalBlobStore(settings.recording_dir)
+
+
+def _us(seconds: float) -> int:
+    return max(0, round(seconds * 1_000_000))
+
+
+@dataclass
+class StreamRecording:
+    """One recorded (model, sample) stream; times are offsets from the session start."""
+    model: str
+    sample: int
+    text: List[str] = field(default_factory=list)
+    logprob: List[float] = field(default_factory=list)
+    entropy: List[float] = field(default_factory=list)
+    top: List[Optional[List[Tuple[str, float]]]] = field(default_factory=list)
+    at_us: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+    error_us: Optional[int] = None
+    end_us: int = 0
+
+    @property
+    def key(self) -> StreamKey:
+        return (self.model, self.sample)
+
+    def add_token(self, token: TokenData, at_us: int) -> None:
+        self.text.append(token.text)
+        self.logprob.append(round(token.logprob, 6))
+        self.entropy.append(round(token.entropy, 6))
+        self.top.append([[t, round(lp, 6)] for t, lp in token.top_logprobs] if token.top_logprobs else None)
+        self.at_us.append(at_us)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Column-wise record with inter-token gaps (the first gap is the TTFT)."""
+        gaps = [at - prev for prev, at in zip([0, *self.at_us], self.at_us)]
+        return {
+            "model": self.model,
+            "sample": self.sample,
+            "text": self.text,
+            "logprob": self.logprob,
+            "entropy": self.entropy,
+            "top": self.top if any(self.top) else None,
+            "gap_us": gaps,
+            "error": self.error,
+            "error_us": self.error_us,
+            "end_us": self.end_us,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "StreamRecording":
+        at_us, total = [], 0
+        for gap in record["gap_us"]:
+            total += gap
+            at_us.append(total)
+        return cls(
+            model=record["model"],
+            sample=record["sample"],
+            text=record["text"],
+            logprob=record["logprob"],
+            entropy=record["entropy"],
+            top=record["top"] or [None] * len(record["text"]),
+            at_us=at_us,
+            error=record["error"],
+            error_us=record["error_us"],
+            end_us=record["end_us"],
+        )
+
+    def chunks(self) -> Iterator[Tuple[int, Optional[StreamChunk]]]:
+        """(offset, chunk) in arrival order, ending with the None end-of-stream marker."""
+        for i, at_us in enumerate(self.at_us):
+            top = self.top[i]
+            yield at_us, StreamChunk(token=TokenData(
+                id=i,
+                text=self.text[i],
+                logprob=self.logprob[i],
+                entropy=self.entropy[i],
+                top_logprobs=[(t, lp) for t, lp in top] if top else None,
+            ))
+        if self.error is not None:
+            yield self.error_us, StreamChunk(error=self.error)
+        yield self.end_us, None
+
+    def summary(self) -> Dict[str, Any]:
+        """Final metrics as the live stream reported them, plus status and error."""
+        stats = StreamStats(self.model, self.sample, 0.0)
+        for at_us in self.at_us:
+            stats.record_token(at_us / 1_000_000)
+        return {
+            **stats.snapshot(self.end_us / 1_000_000),
+            "status": "failed" if self.error is not None else "completed",
+            "error": self.error,
+        }
+
+    def tokens(self) -> List[Dict[str, Any]]:
+        """Per-token view (for analysis clients)."""
+        return [
+            {
+                "id": i,
+                "text": self.text[i],
+                "logprob": self.logprob[i],
+                "entropy": self.entropy[i],
+                "top_logprobs": self.top[i],
+                "at_ms": round(self.at_us[i] / 1000, 3),
+            }
+            for i in range(len(self.text))
+        ]
+
+
+class SessionRecorder:
+    """Collects one playground session's streams as the multiplexer consumes them."""
+
+    def __init__(self, request: ChatCompletionRequest, keys: List[StreamKey], started_at: float):
+        self.request = request
+        self.started_at = started_at
+        self.streams = {key: StreamRecording(*key) for key in keys}
+
+    def on_chunk(self, key: StreamKey, chunk: Optional[StreamChunk], arrived_at: float) -> None:
+        """`multiplex_events` hook."""
+        stream = self.streams[key]
+        at_us = _us(arrived_at - self.started_at)
+        if chunk is None:
+            stream.end_us = at_us
+        elif chunk.error:
+            stream.error, stream.error_us = chunk.error, at_us
+        elif chunk.token:
+            stream.add_token(chunk.token, at_us)
+
+    async def save(
+        self,
+        session_factory: async_sessionmaker = async_session_factory,
+        store: LocalBlobStore = recording_store,
+    ) -> str:
+        """Compress and store the streams, then index the session; returns its id."""
+        session_id = str(uuid.uuid4())
+        blob_key = f"sessions/{session_id}/streams.jsonl.zst"
+        streams = list(self.streams.values())
+        records = [{"format": RECORDING_FORMAT}, *(stream.to_record() for stream in streams)]
+
+        def write() -> int:
+            data = compress_records(records)
+            store.put(blob_key, data)
+            return len(data)
+
+        size = await asyncio.to_thread(write)
+        request = self.request
+        async with session_factory() as session:
+            session.add(PlaygroundSession(
+                id=session_id,
+                created_at=datetime.utcnow(),
+                models=list(dict.fromkeys(stream.model for stream in streams)),
+                n=request.n,
+                system_prompt=request.system_prompt,
+                user_prompt=request.user_prompt,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                top_p=request.top_p,
+                streams=[stream.summary() for stream in streams],
+                duration_ms=round(max(stream.end_us for stream in streams) / 1000, 1),
+                blob_key=blob_key,
+                size_bytes=size,
+            ))
+            await session.commit()
+        logger.debug(f"Recorded playground session {session_id} ({len(streams)} streams, {size} bytes)")
+        return session_id
+
+
+async def load_streams(row: PlaygroundSession, store: LocalBlobStore = recording_store) -> List[StreamRecording]:
+    """Recorded streams of a session, in their original order."""
+    records = await asyncio.to_thread(lambda: decompress_records(store.get(row.blob_key)))
+    return [StreamRecording.from_record(record) for record in records[1:]]
+
+
+def delete_recording(row: PlaygroundSession, store: LocalBlobStore = recording_store) -> None:
+    store.delete_prefix(f"sessions/{row.id}")
+
+
+async def replay(
+    streams: List[StreamRecording],
+    queue: asyncio.Queue,
+    started_at: float,
+    speed: float = 1.0,
+) -> None:
+    """
+    Put recorded chunks on `queue` as the live `pump`s would.
+
+    Chunks are paced by their original arrival times divided by `speed`
+    (0 sends everything at once), but carry their original arrival times,
+    so the metrics match the recorded session.
+    """
+    timeline = sorted(
+        (at_us, order, stream.key, chunk)
+        for stream in streams
+        for order, (at_us, chunk) in enumerate(stream.chunks())
+    )
+    playback_start = time.perf_counter()
+    for at_us, _, key, chunk in timeline:
+        if speed > 0:
+            delay = playback_start + at_us / 1_000_000 / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await queue.put((key, chunk, started_at + at_us / 1_000_000))
@@ -1,74 +1,137 @@
 """Playground API routes for real-time inference."""
 
+import asyncio
 import json
-import tiktoken
-from fastapi import APIRouter, HTTPException
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sse_starlette.sse import EventSourceResponse
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
+from app.core.config import settings
+from app.core.database import get_db
 from app.modules.common.llm_client import GroqLLMClient
+from app.modules.common.tokenizer_registry import (
+    MODEL_TOKENIZERS,
+    TokenizerUnavailable,
+    encode_batch,
+    tokenize,
+    tokenizer_registry,
+)
+from .models import PlaygroundSession
+from .multiplex import multiplex_events, pump
+from .recorder import SessionRecorder, delete_recording, load_streams, replay
 from .schemas import (
     ChatCompletionRequest,
     TokenizeRequest,
     TokenizeResponse,
     TokenInfo,
+    TokenCountRequest,
+    TokenCountResponse,
+    LoadedTokenizerInfo,
+    TokenizersResponse,
     ModelsResponse,
+    RecordedStream,
+    RecordedStreamSummary,
+    SessionDetail,
+    SessionListResponse,
+    SessionSummary,
 )
 
 
 router = APIRouter(prefix="/playground", tags=["Playground"])
 
+# Shared by all playground requests: building a client sets up two HTTP pools
+# (and their SSL contexts), far too slow to repeat on the event loop per request
+_client: GroqLLMClient | None = None
+
+
+def get_client() -> GroqLLMClient:
+    """
+    Shared LLM client, created on first use.
+
+    Raises:
+        ValueError: If the API key is not configured
+    """
+    global _client
+    if _client is None:
+        _client = GroqLLMClient()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client's connection pools (app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 @router.post("/chat/completions")
 async def stream_chat_completions(request: ChatCompletionRequest):
     """
     Stream chat completions with token-level metadata.
     
-    Returns Server-Sent Events (SSE) with structured token data:
-    - token: The generated token text
-    - id: Token index in sequence
-    - logprob: Log probability of the token
-    - entropy: Entropy at this token position
+    With several `models` and/or `n` > 1, every (model, sample) stream is
+    generated concurrently and multiplexed into one response; every event
+    carries its `model` and `sample`. Returns Server-Sent Events (SSE):
+    - token: token text, index in its sample (id), logprob and entropy
+    - metrics: live TTFT and tokens/sec for a stream
+    - error: a stream failed
+    - sample_done: a stream finished (final metrics and status)
+    - consistency: agreement across a model's completed samples (n > 1 only)
+    - done: all streams finished (with the `session_id` when recorded)
+    
+    With `record` (or PLAYGROUND_RECORDING_ENABLED), the finished session
+    is saved for replay via /playground/sessions.
     """
     
     async def event_generator():
+        tasks = []
         try:
-            client = GroqLLMClient()
+            client = get_client()
+            queue: asyncio.Queue = asyncio.Queue()
+            models = list(dict.fromkeys(request.models or [request.model]))
+            keys = [(model, sample) for model in models for sample in range(request.n)]
             
-            async for chunk in client.stream_chat_completion(
-                system_prompt=request.system_prompt,
-                user_prompt=request.user_prompt,
-                model=request.model,
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-                top_p=request.top_p,
+            # One upstream stream per (model, sample), all in flight at once
+            started_at = time.perf_counter()
+            record = settings.playground_recording_enabled if request.record is None else request.record
+            recorder = SessionRecorder(request, keys, started_at) if record else None
+            tasks = [
+                asyncio.create_task(pump(
+                    client.stream_chat_completion(
+                        system_prompt=request.system_prompt,
+                        user_prompt=request.user_prompt,
+                        model=key[0],
+                        temperature=request.temperature,
+                        max_tokens=request.max_tokens,
+                        top_p=request.top_p,
+                    ),
+                    key,
+                    queue,
+                ))
+                for key in keys
+            ]
+            
+            async for event in multiplex_events(
+                keys, queue, started_at, request.n, recorder.on_chunk if recorder else None
             ):
-                if chunk.error:
-                    error_data = {"error": chunk.error}
-                    yield {
-                        "event": "error",
-                        "data": json.dumps(error_data),
-                    }
-                    break
-                
-                if chunk.done:
-                    yield {
-                        "event": "done",
-                        "data": json.dumps({"done": True}),
-                    }
-                    break
-                
-                if chunk.token:
-                    token_data = {
-                        "id": chunk.token.id,
-                        "text": chunk.token.text,
-                        "logprob": round(chunk.token.logprob, 6),
-                        "entropy": round(chunk.token.entropy, 6),
-                    }
-                    yield {
-                        "event": "token",
-                        "data": json.dumps(token_data),
-                    }
+                yield event
+            
+            done = {"done": True}
+            if recorder:
+                try:
+                    done["session_id"] = await recorder.save()
+                except Exception as e:
+                    # The stream itself succeeded; only the recording is lost
+                    logger.error(f"Failed to record playground session: {e}")
+            yield {
+                "event": "done",
+                "data": json.dumps(done),
+            }
         
         except ValueError as e:
             # API key not configured
@@ -83,36 +146,129 @@ async def stream_chat_completions(request: ChatCompletionRequest):
                 "event": "error",
                 "data": json.dumps({"error": f"Streaming failed: {str(e)}"}),
             }
+        finally:
+            # Client disconnected or stream finished: stop any sample still running
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+    
+    return EventSourceResponse(event_generator())
+
+
+def _session_summary(row: PlaygroundSession) -> SessionSummary:
+    return SessionSummary(
+        session_id=row.id,
+        created_at=row.created_at,
+        models=row.models,
+        n=row.n,
+        user_prompt=row.user_prompt,
+        duration_ms=row.duration_ms,
+        size_bytes=row.size_bytes,
+        streams=[RecordedStreamSummary(**stream) for stream in row.streams],
+    )
+
+
+async def _get_session(db: AsyncSession, session_id: str) -> PlaygroundSession:
+    row = await db.get(PlaygroundSession, session_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Playground session {session_id} not found")
+    return row
+
+
+@router.get("/sessions", response_model=SessionListResponse)
+async def list_sessions(limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_db)):
+    """List recorded playground sessions, newest first."""
+    total = (await db.execute(select(func.count()).select_from(PlaygroundSession))).scalar_one()
+    rows = (await db.execute(
+        select(PlaygroundSession).order_by(desc(PlaygroundSession.created_at)).offset(offset).limit(limit)
+    )).scalars().all()
+    return SessionListResponse(sessions=[_session_summary(row) for row in rows], total=total)
+
+
+@router.get("/sessions/{session_id}", response_model=SessionDetail)
+async def get_session(session_id: str, db: AsyncSession = Depends(get_db)):
+    """A recorded session's request and token streams (text, logprob, entropy, top-k, arrival times)."""
+    row = await _get_session(db, session_id)
+    streams = await load_streams(row)
+    return SessionDetail(
+        **_session_summary(row).model_dump(exclude={"streams"}),
+        system_prompt=row.system_prompt,
+        temperature=row.temperature,
+        max_tokens=row.max_tokens,
+        top_p=row.top_p,
+        streams=[RecordedStream(**stream.summary(), token_data=stream.tokens()) for stream in streams],
+    )
+
+
+@router.get("/sessions/{session_id}/replay")
+async def replay_session(
+    session_id: str,
+    speed: float = Query(default=1.0, ge=0, le=1000, description="Playback speed multiple; 0 sends everything at once"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Replay a recorded session as Server-Sent Events, without calling the provider.
+    
+    Emits the same events as the live stream, with the recorded timings
+    in its metrics; `speed` only changes the pacing. The done event
+    carries `replay: true`.
+    """
+    row = await _get_session(db, session_id)
+    streams = await load_streams(row)
+    
+    async def event_generator():
+        queue: asyncio.Queue = asyncio.Queue()
+        started_at = time.perf_counter()
+        player = asyncio.create_task(replay(streams, queue, started_at, speed))
+        try:
+            async for event in multiplex_events([stream.key for stream in streams], queue, started_at, row.n):
+                yield event
+            yield {
+                "event": "done",
+                "data": json.dumps({"done": True, "session_id": session_id, "replay": True}),
+            }
+        finally:
+            player.cancel()
+            await asyncio.gather(player, return_exceptions=True)
     
     return EventSourceResponse(event_generator())
 
 
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, db: AsyncSession = Depends(get_db)):
+    """Delete a recorded session and its recording."""
+    row = await _get_session(db, session_id)
+    await asyncio.to_thread(delete_recording, row)
+    await db.delete(row)
+    await db.commit()
+    return {"deleted": session_id}
+
+
 @router.post("/tokenize", response_model=TokenizeResponse)
 async def tokenize_text(request: TokenizeRequest):
     """
     Tokenize text using the specified model's tokenizer.
     
     Returns a list of tokens with their IDs and text representations.
+    Models without a locally installed tokenizer use cl100k_base and are
+    flagged `approximate`.
     """
     try:
-        # Use tiktoken with cl100k_base encoding (closest to Llama tokenizer for demo)
-        # In production, you'd use the actual model's tokenizer
-        encoding = tiktoken.get_encoding("cl100k_base")
-        
-        # Encode text to get token IDs
-        token_ids = encoding.encode(request.text)
+        tokenizer, pieces = await tokenize(request.model, request.text)
         
-        # Decode each token to get its text representation
-        tokens = []
-        for token_id in token_ids:
-            token_text = encoding.decode([token_id])
-            tokens.append(TokenInfo(id=token_id, text=token_text))
+        tokens = [TokenInfo(id=token_id, text=token_text) for token_id, token_text in pieces]
         
         return TokenizeResponse(
             tokens=tokens,
             total_tokens=len(tokens),
+            tokenizer=tokenizer.name,
+            approximate=tokenizer.approximate,
         )
     
+    except TokenizerUnavailable as e:
+        # Tokenizer files are installed at build time; never download on the request path
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Tokenization error: {e}")
         raise HTTPException(
@@ -121,12 +277,38 @@ async def tokenize_text(request: TokenizeRequest):
         )
 
 
+@router.post("/tokenize/count", response_model=TokenCountResponse)
+async def count_tokens(request: TokenCountRequest):
+    """Count tokens for many texts at once (batch-encoded off the event loop)."""
+    try:
+        tokenizer, ids = await encode_batch(request.model, request.texts)
+    except TokenizerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    counts = [len(token_ids) for token_ids in ids]
+    return TokenCountResponse(
+        counts=counts,
+        total_tokens=sum(counts),
+        tokenizer=tokenizer.name,
+        approximate=tokenizer.approximate,
+    )
+
+
+@router.get("/tokenizers", response_model=TokenizersResponse)
+async def list_tokenizers():
+    """Tokenizer used for each model, and the tokenizers currently loaded (with memory)."""
+    return TokenizersResponse(
+        models={model: tokenizer_registry.resolve(model) for model in MODEL_TOKENIZERS},
+        loaded=[LoadedTokenizerInfo(**info) for info in tokenizer_registry.stats()],
+        max_loaded=tokenizer_registry.max_entries,
+    )
+
+
 @router.get("/models", response_model=ModelsResponse)
 async def get_available_models():
     """Get list of available models for inference."""
     try:
-        client = GroqLLMClient()
-        models = client.get_available_models()
+        models = get_client().get_available_models()
         return ModelsResponse(models=models)
     except ValueError:
         # API key not configured, return default list
@@ -1,7 +1,8 @@
 """Pydantic schemas for Playground module."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 
 
 class ChatCompletionRequest(BaseModel):
@@ -19,6 +20,12 @@ class ChatCompletionRequest(BaseModel):
         default="llama-3.1-8b-instant",
         description="Model identifier"
     )
+    models: Optional[List[str]] = Field(
+        default=None,
+        min_length=1,
+        max_length=4,
+        description="Models to stream side by side over one connection (overrides model)"
+    )
     temperature: float = Field(
         default=0.7,
         ge=0.0,
@@ -37,6 +44,16 @@ class ChatCompletionRequest(BaseModel):
         le=1.0,
         description="Top-p sampling parameter"
     )
+    n: int = Field(
+        default=1,
+        ge=1,
+        le=16,
+        description="Number of samples to generate concurrently (scored for self-consistency when > 1)"
+    )
+    record: Optional[bool] = Field(
+        default=None,
+        description="Save the session for replay (defaults to PLAYGROUND_RECORDING_ENABLED)"
+    )
 
 
 class TokenData(BaseModel):
@@ -70,9 +87,108 @@ class TokenizeResponse(BaseModel):
     
     tokens: List[TokenInfo] = Field(..., description="List of tokenized tokens")
     total_tokens: int = Field(..., description="Total number of tokens")
+    tokenizer: str = Field(..., description="Tokenizer used")
+    approximate: bool = Field(
+        default=False,
+        description="True when the model's own tokenizer isn't installed and cl100k_base was used"
+    )
+
+
+class TokenCountRequest(BaseModel):
+    """Request schema for batch token counting."""
+    
+    texts: List[str] = Field(..., max_length=10000, description="Texts to count")
+    model: str = Field(
+        default="llama-3.1-8b-instant",
+        description="Model whose tokenizer to use"
+    )
+
+
+class TokenCountResponse(BaseModel):
+    """Response schema for batch token counting."""
+    
+    counts: List[int] = Field(..., description="Token count per text, in input order")
+    total_tokens: int = Field(..., description="Sum of counts")
+    tokenizer: str = Field(..., description="Tokenizer used")
+    approximate: bool = Field(default=False, description="Whether the cl100k_base fallback was used")
+
+
+class LoadedTokenizerInfo(BaseModel):
+    """A tokenizer held in the registry cache."""
+    
+    name: str = Field(..., description="Tokenizer family")
+    approximate: bool = Field(..., description="Whether this is the cl100k_base fallback")
+    memory_bytes: Optional[int] = Field(default=None, description="Process memory added when it loaded")
+    load_ms: float = Field(..., description="Load time")
+
+
+class TokenizersResponse(BaseModel):
+    """Response schema for the tokenizer registry."""
+    
+    models: Dict[str, str] = Field(..., description="Tokenizer used for each model")
+    loaded: List[LoadedTokenizerInfo] = Field(..., description="Loaded tokenizers, most recently used first")
+    max_loaded: int = Field(..., description="LRU capacity")
 
 
 class ModelsResponse(BaseModel):
     """Response schema for available models."""
     
     models: List[str] = Field(..., description="List of available model IDs")
+
+
+class RecordedStreamSummary(BaseModel):
+    """Final metrics of one recorded (model, sample) stream."""
+    
+    model: str
+    sample: int
+    status: str = Field(..., description="completed or failed")
+    error: Optional[str] = None
+    tokens: int
+    ttft_ms: Optional[float] = None
+    tokens_per_s: Optional[float] = None
+    elapsed_ms: float
+
+
+class RecordedToken(TokenData):
+    """A recorded token with its alternatives and arrival time."""
+    
+    top_logprobs: Optional[List[Tuple[str, float]]] = Field(
+        default=None, description="Top-k alternatives as (token, logprob)"
+    )
+    at_ms: float = Field(..., description="Arrival time since the session started")
+
+
+class RecordedStream(RecordedStreamSummary):
+    """A recorded stream with its tokens."""
+    
+    token_data: List[RecordedToken] = Field(..., description="Tokens in generation order")
+
+
+class SessionSummary(BaseModel):
+    """A recorded playground session, as listed."""
+    
+    session_id: str
+    created_at: datetime
+    models: List[str]
+    n: int
+    user_prompt: str
+    duration_ms: Optional[float] = None
+    size_bytes: int = Field(..., description="Compressed size of the recording")
+    streams: List[RecordedStreamSummary]
+
+
+class SessionListResponse(BaseModel):
+    """Response schema for listing recorded sessions."""
+    
+    sessions: List[SessionSummary]
+    total: int
+
+
+class SessionDetail(SessionSummary):
+    """A recorded session with its request and full token streams."""
+    
+    system_prompt: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    top_p: Optional[float] = None
+    streams: List[RecordedStream]
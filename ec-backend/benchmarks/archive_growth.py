@@ -0,0 +1,185 @@
+"""Database size and query latency as run history grows, with and without archival.
+
+Seeds waves of finished runs into a temporary SQLite database. In the
+`archive` mode, every run older than the latest wave is archived after
+each wave (as the retention sweep would); the `inline` mode keeps every
+payload in the database. After each wave the benchmark records the
+database file size, the archive's size on disk, and the median latency of
+the queries the API serves most: the run listing, a status poll and
+loading the results of the oldest run (rehydrated once archived).
+
+Usage:
+    python -m benchmarks.archive_growth
+    python -m benchmarks.archive_growth --waves 10 --runs-per-wave 20 --items 2000 --output growth.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import Base, create_engine
+from app.modules.evals.archive import LocalBlobStore, archive_due_runs, iter_results
+from app.modules.evals.items import store_items
+from app.modules.evals.models import EvalRun, EvalStatus
+
+
+WORDS = ["the", "model", "answer", "is", "likely", "correct", "because", "of", "context", "and", "data"]
+
+
+def _synthetic_run(items: int, output_words: int) -> tuple[list, list]:
+    inputs = [{"user_prompt": f"Question {i}: " + " ".join(random.choices(WORDS, k=20))} for i in range(items)]
+    results = []
+    for i, input_data in enumerate(inputs):
+        passed = random.random() < 0.8
+        results.append({
+            "index": i,
+            "input_prompt": input_data["user_prompt"],
+            "output": " ".join(random.choices(WORDS, k=output_words)),
+            "latency_ms": random.uniform(200, 2000),
+            "passed": passed,
+            "failure_reason": None if passed else "Excluded phrase found",
+            "validations": [{"name": "excludes", "passed": passed, "reason": None}],
+            "output_tokens": output_words,
+            "logprob_sum": -random.uniform(10, 50),
+        })
+    return inputs, results
+
+
+async def _seed_wave(factory, runs: int, items: int, output_words: int, completed_at: datetime) -> List[str]:
+    run_ids = []
+    for _ in range(runs):
+        inputs, results = _synthetic_run(items, output_words)
+        run = EvalRun(
+            id=str(uuid.uuid4()),
+            status=EvalStatus.COMPLETED.value,
+            model="bench",
+            inputs=inputs,
+            total_items=items,
+            completed_items=items,
+            pass_rate=sum(r["passed"] for r in results) / items,
+            created_at=completed_at,
+            completed_at=completed_at,
+        )
+        async with factory() as session:
+            session.add(run)
+            await store_items(session, run.id, results, inputs)
+            await session.commit()
+        run_ids.append(run.id)
+    return run_ids
+
+
+async def _median_ms(query: Callable[[], Awaitable[Any]], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await query()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+async def run_mode(args: argparse.Namespace, archive: bool, tmp: str) -> List[Dict[str, Any]]:
+    """Seed all waves in one mode; returns one measurement per wave."""
+    mode = "archive" if archive else "inline"
+    db_path = os.path.join(tmp, f"{mode}.db")
+    store = LocalBlobStore(os.path.join(tmp, f"{mode}-blobs"))
+    engine = create_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    random.seed(args.seed)
+    waves = []
+    first_run = None
+    start = datetime.utcnow() - timedelta(days=args.waves)
+    for wave in range(args.waves):
+        run_ids = await _seed_wave(factory, args.runs_per_wave, args.items, args.output_words, start + timedelta(days=wave))
+        first_run = first_run or run_ids[0]
+        if archive:
+            # Everything but the latest wave is past the retention threshold
+            older_than = datetime.utcnow() - (start + timedelta(days=wave)) + timedelta(hours=12)
+            while await archive_due_runs(older_than, 50, factory, store) == 50:
+                pass
+
+        # Checkpoint so the main file reflects the data (WAL would otherwise hold it)
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        async def list_runs():
+            async with factory() as session:
+                stmt = select(EvalRun).where(EvalRun.parent_id.is_(None)).order_by(desc(EvalRun.created_at)).limit(50)
+                (await session.execute(stmt)).scalars().all()
+
+        async def status():
+            async with factory() as session:
+                await session.get(EvalRun, random.choice(run_ids))
+
+        async def report():
+            # The first run ever seeded: inline in one mode, archived in the other
+            async with factory() as session:
+                async for _ in iter_results(session, await session.get(EvalRun, first_run), store):
+                    pass
+
+        measurement = {
+            "wave": wave + 1,
+            "runs": (wave + 1) * args.runs_per_wave,
+            "db_bytes": os.path.getsize(db_path),
+            "archive_bytes": _dir_bytes(store.root) if os.path.isdir(store.root) else 0,
+            "list_ms": await _median_ms(list_runs, args.repeats),
+            "status_ms": await _median_ms(status, args.repeats),
+            "report_ms": await _median_ms(report, args.repeats),
+        }
+        waves.append(measurement)
+        print(json.dumps({"mode": mode, **measurement}))
+
+    await engine.dispose()
+    return waves
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        return {
+            "config": {
+                "waves": args.waves,
+                "runs_per_wave": args.runs_per_wave,
+                "items": args.items,
+                "output_words": args.output_words,
+            },
+            "inline": await run_mode(args, archive=False, tmp=tmp),
+            "archive": await run_mode(args, archive=True, tmp=tmp),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waves", type=int, default=6)
+    parser.add_argument("--runs-per-wave", type=int, default=10)
+    parser.add_argument("--items", type=int, default=1000, help="Items per run")
+    parser.add_argument("--output-words", type=int, default=120, help="Words per synthetic output")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed repetitions per query")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
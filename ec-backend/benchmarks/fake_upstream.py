@@ -0,0 +1,326 @@
+"""Local stand-in for the Groq chat completions API.
+
+Streams OpenAI-format chunks (with logprobs) at a configurable pace, so
+load tests exercise the real client, SSE relaying and token metadata
+without calling the provider. Point the backend at it with
+GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+Optionally enforces a per-key request limit (429 with Retry-After) and
+rejects listed keys (401), to exercise the API key pool.
+
+Also serves the batch API (files upload and content, batches create,
+retrieve and cancel): a batch validates its input file, then answers one
+request every --batch-request-ms and writes output and error files. A
+completion window like "30s" expires the batch early, for tests; requests
+without messages land in the error file.
+
+Usage:
+    python -m benchmarks.fake_upstream --port 8100
+    python -m benchmarks.fake_upstream --ttft-ms 300 --token-ms 5 --tokens 200
+    python -m benchmarks.fake_upstream --key-rpm 30 --reject-keys revoked-key
+    python -m benchmarks.fake_upstream --batch-request-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict, deque
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from typing import Any, Deque, Dict, Iterable, List
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+WORDS = ["the", "model", "answer", "is", "likely", "correct", "because", "of", "context", "and", "data"]
+
+
+def _error(status_code: int, message: str, code: str, headers: Dict[str, str] | None = None) -> JSONResponse:
+    body = {"error": {"message": message, "type": "invalid_request_error", "code": code}}
+    return JSONResponse(body, status_code=status_code, headers=headers)
+
+
+def _window_seconds(window: str) -> float:
+    """Seconds in a completion window like "24h", "7d" or "30s"."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    return float(window[:-1]) * units[window[-1]]
+
+
+def _multipart_fields(content_type: str, body: bytes) -> Dict[str, bytes]:
+    """Fields of a multipart/form-data body (without needing python-multipart)."""
+    message = BytesParser(policy=email_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()
+    }
+
+
+def create_app(
+    ttft_ms: float,
+    token_ms: float,
+    tokens: int,
+    key_rpm: int = 0,
+    rejected_keys: Iterable[str] = (),
+    batch_request_ms: float = 10.0,
+) -> FastAPI:
+    """
+    Stand-in app; every response has `tokens` tokens (capped by max_tokens).
+
+    `key_rpm` > 0 limits requests per key over a sliding minute;
+    `rejected_keys` answer 401. Batches answer one request per
+    `batch_request_ms`.
+    """
+    app = FastAPI()
+    rejected = set(rejected_keys)
+    requests_by_key: Dict[str, Deque[float]] = defaultdict(deque)
+    app.state.requests_by_key = defaultdict(int)
+    files: Dict[str, bytes] = {}
+    batches: Dict[str, Dict[str, Any]] = {}
+    app.state.batches = batches
+
+    def chunk(completion_id: str, model: str, content: str | None, finish_reason: str | None) -> str:
+        choice = {"index": 0, "delta": {}, "logprobs": None, "finish_reason": finish_reason}
+        if content is not None:
+            choice["delta"] = {"role": "assistant", "content": content}
+            logprob = -random.random()
+            choice["logprobs"] = {"content": [{
+                "token": content,
+                "logprob": logprob,
+                "bytes": None,
+                "top_logprobs": [
+                    {"token": content, "logprob": logprob, "bytes": None},
+                    {"token": "alt", "logprob": logprob - 1.5, "bytes": None},
+                ],
+            }]}
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [choice],
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    def completion(completion_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """A non-streamed chat completion, with logprobs when requested."""
+        count = min(tokens, body.get("max_tokens") or tokens)
+        words = random.choices(WORDS, k=count)
+        choice = {
+            "index": 0,
+            "message": {"role": "assistant", "content": " ".join(words)},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }
+        if body.get("logprobs"):
+            choice["logprobs"] = {"content": [
+                {"token": word, "logprob": -random.random(), "bytes": None, "top_logprobs": []} for word in words
+            ]}
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [choice],
+            "usage": {"prompt_tokens": 10, "completion_tokens": count, "total_tokens": 10 + count},
+        }
+
+    def api_key_of(request: Request) -> str:
+        return request.headers.get("authorization", "").removeprefix("Bearer ")
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        api_key = api_key_of(request)
+        if api_key in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        if key_rpm > 0:
+            now = time.monotonic()
+            window = requests_by_key[api_key]
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= key_rpm:
+                retry_after = 60 - (now - window[0])
+                return _error(
+                    429, "Rate limit reached for requests", "rate_limit_exceeded",
+                    headers={"retry-after": f"{retry_after:.1f}"},
+                )
+            window.append(now)
+        app.state.requests_by_key[api_key] += 1
+
+        body = await request.json()
+        model = body.get("model", "fake")
+        count = min(tokens, body.get("max_tokens") or tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if not body.get("stream"):
+            await asyncio.sleep((ttft_ms + token_ms * count) / 1000)
+            return JSONResponse(completion(completion_id, body))
+
+        async def stream():
+            await asyncio.sleep(ttft_ms / 1000)
+            for i in range(count):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                yield chunk(completion_id, model, random.choice(WORDS) + " ", None)
+            yield chunk(completion_id, model, None, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    def store_file(content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        file_id = f"file_{uuid.uuid4().hex}"
+        files[file_id] = content
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+        }
+
+    def result_line(request_id: str, status_code: int, body: Dict[str, Any]) -> str:
+        return json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex}",
+            "custom_id": request_id,
+            "response": {"status_code": status_code, "request_id": uuid.uuid4().hex, "body": body},
+            "error": None,
+        })
+
+    async def process_batch(batch: Dict[str, Any]) -> None:
+        """Validate the input file, answer its requests one by one, then write the result files."""
+        await asyncio.sleep(batch_request_ms / 1000)
+        try:
+            requests = [json.loads(line) for line in files[batch["input_file_id"]].splitlines() if line.strip()]
+            invalid = [i for i, r in enumerate(requests) if "custom_id" not in r or "body" not in r]
+        except ValueError as e:
+            requests, invalid = [], [0]
+            batch["errors"] = {"object": "list", "data": [{"code": "invalid_json", "line": 1, "message": str(e)}]}
+        if invalid:
+            batch.setdefault("errors", {"object": "list", "data": [
+                {"code": "invalid_request", "line": i + 1, "message": "Missing custom_id or body"} for i in invalid
+            ]})
+            batch.update(status="failed", failed_at=int(time.time()))
+            return
+
+        counts = batch["request_counts"]
+        counts["total"] = len(requests)
+        if batch["status"] == "validating":
+            batch.update(status="in_progress", in_progress_at=int(time.time()))
+        outputs: List[str] = []
+        errors: List[str] = []
+        for r in requests:
+            if batch["status"] == "cancelling" or time.time() >= batch["expires_at"]:
+                break
+            await asyncio.sleep(batch_request_ms / 1000)
+            if not r["body"].get("messages"):
+                error = {"error": {"message": "'messages' is required", "type": "invalid_request_error"}}
+                errors.append(result_line(r["custom_id"], 400, error))
+                counts["failed"] += 1
+            else:
+                outputs.append(result_line(r["custom_id"], 200, completion(f"chatcmpl-{uuid.uuid4().hex}", r["body"])))
+                counts["completed"] += 1
+
+        cancelled = batch["status"] == "cancelling"
+        batch.update(status="finalizing", finalizing_at=int(time.time()))
+        if outputs:
+            batch["output_file_id"] = store_file(("\n".join(outputs) + "\n").encode(), "output.jsonl", "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = store_file(("\n".join(errors) + "\n").encode(), "errors.jsonl", "batch_output")["id"]
+        now = int(time.time())
+        if cancelled:
+            batch.update(status="cancelled", cancelled_at=now)
+        elif counts["completed"] + counts["failed"] < counts["total"]:
+            batch.update(status="expired", expired_at=now)
+        else:
+            batch.update(status="completed", completed_at=now)
+
+    def public_batch(batch: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in batch.items() if k != "task"}
+
+    @app.post("/openai/v1/files")
+    async def upload_file(request: Request):
+        if api_key_of(request) in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        fields = _multipart_fields(request.headers["content-type"], await request.body())
+        return store_file(fields["file"], "batch.jsonl", fields.get("purpose", b"batch").decode())
+
+    @app.get("/openai/v1/files/{file_id}/content")
+    async def file_content(file_id: str, request: Request):
+        if api_key_of(request) in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        if file_id not in files:
+            return _error(404, f"File {file_id} not found", "not_found")
+        return Response(files[file_id], media_type="application/octet-stream")
+
+    @app.post("/openai/v1/batches")
+    async def create_batch(request: Request):
+        if api_key_of(request) in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        body = await request.json()
+        if body.get("input_file_id") not in files:
+            return _error(404, f"File {body.get('input_file_id')} not found", "not_found")
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"],
+            "status": "validating",
+            "created_at": now,
+            "expires_at": int(time.time() + _window_seconds(body["completion_window"])),
+            "metadata": body.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        batches[batch["id"]] = batch
+        batch["task"] = asyncio.create_task(process_batch(batch))
+        return public_batch(batch)
+
+    @app.get("/openai/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str, request: Request):
+        if api_key_of(request) in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        if batch_id not in batches:
+            return _error(404, f"Batch {batch_id} not found", "not_found")
+        return public_batch(batches[batch_id])
+
+    @app.post("/openai/v1/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str, request: Request):
+        if api_key_of(request) in rejected:
+            return _error(401, "Invalid API Key", "invalid_api_key")
+        batch = batches.get(batch_id)
+        if batch is None:
+            return _error(404, f"Batch {batch_id} not found", "not_found")
+        if batch["status"] in ("validating", "in_progress"):
+            batch.update(status="cancelling", cancelling_at=int(time.time()))
+        return public_batch(batch)
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--token-ms", type=float, default=10.0, help="Delay between tokens")
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens per response")
+    parser.add_argument("--key-rpm", type=int, default=0, help="Requests per minute per API key (0: unlimited)")
+    parser.add_argument("--reject-keys", type=lambda v: v.split(","), default=[], help="API keys answered with 401")
+    parser.add_argument("--batch-request-ms", type=float, default=10.0, help="Time per request inside a batch")
+    args = parser.parse_args()
+
+    app = create_app(args.ttft_ms, args.token_ms, args.tokens, args.key_rpm, args.reject_keys, args.batch_request_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start import cost of the API and worker entry points.
+
+Imports each entry point in a fresh interpreter with `-X importtime`, and
+reports wall time, the slowest packages by cumulative import time (nested
+packages count toward their importers too), and which heavy optional
+dependencies got imported eagerly.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeats 10 --output import_time.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+ENTRY_POINTS = {
+    "api": "import main",
+    "worker": "import app.core.celery_app, app.modules.evals.tasks",
+}
+
+# Packages that should only load when a feature needs them
+HEAVY_MODULES = ["groq", "numpy", "celery", "tiktoken", "tokenizers", "nltk", "textstat", "pyarrow"]
+
+
+def _import_once(statement: str) -> dict:
+    """Run one cold import; returns wall time and per-package cumulative import time (ms)."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    packages: dict = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        # A package's own line (at whatever nesting depth) carries the cumulative cost of loading it
+        if "." not in name:
+            packages[name] += int(cumulative) / 1000
+    return {"wall_ms": wall_ms, "packages": dict(packages)}
+
+
+def bench(statement: str, repeats: int, top: int) -> dict:
+    """Median wall time and per-package import times over `repeats` cold imports."""
+    samples = [_import_once(statement) for _ in range(repeats)]
+    names = set().union(*(sample["packages"] for sample in samples))
+    packages = {
+        name: statistics.median(sample["packages"].get(name, 0.0) for sample in samples)
+        for name in names
+    }
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "wall_ms": round(statistics.median(sample["wall_ms"] for sample in samples), 1),
+        "slowest": {name: round(ms, 1) for name, ms in slowest},
+        "heavy_imported": [name for name in HEAVY_MODULES if name in packages],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest packages to report")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {name: bench(statement, args.repeats, args.top) for name, statement in ENTRY_POINTS.items()}
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
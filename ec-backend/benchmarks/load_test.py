@@ -0,0 +1,303 @@
+"""Load test for the API under ramping concurrency.
+
+Starts a stand-in upstream (benchmarks.fake_upstream) and one uvicorn worker
+running the app (temporary SQLite database, in-process jobs, event-loop lag
+monitor on), unless --target points at an already running server. At each
+concurrency level, every selected scenario runs that many closed-loop
+clients for --duration seconds. Each level reports, per scenario, latency
+percentiles, throughput and error rate, plus the server's event-loop lag
+and RSS over the level.
+
+Scenarios:
+    stream    POST /playground/chat/completions, read to `done` (TTFT and total)
+    tokenize  POST /playground/tokenize
+    submit    POST /evals/run (small runs against the stand-in upstream)
+    poll      GET /evals/status/{id} of submitted runs, revalidating with ETags
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --levels 1,10,50,100 --duration 20 --output load.json
+    python -m benchmarks.load_test --target http://localhost:8000 --scenarios stream,poll
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+
+SCENARIOS = ["stream", "tokenize", "submit", "poll"]
+
+PROMPT = "Explain in two sentences why the sky is blue."
+
+
+@dataclass
+class Recorder:
+    """Outcomes of one scenario at one level."""
+    latencies: List[float] = field(default_factory=list)
+    ttfts: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def error(self, e: Exception) -> None:
+        if isinstance(e, httpx.HTTPStatusError):
+            key = str(e.response.status_code)
+        else:
+            key = type(e).__name__
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        errors = sum(self.errors.values())
+        total = len(self.latencies) + errors
+        summary = {
+            "requests": total,
+            "throughput_per_s": round(len(self.latencies) / duration, 1),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "errors": self.errors,
+            "latency_ms": _percentiles(self.latencies),
+        }
+        if self.ttfts:
+            summary["ttft_ms"] = _percentiles(self.ttfts)
+        return summary
+
+
+def _percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    values = sorted(values)
+
+    def at(q: float) -> float:
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+    return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": round(values[-1] * 1000, 1)}
+
+
+@dataclass
+class Context:
+    """State shared by the scenarios of a load test."""
+    client: httpx.AsyncClient
+    model: str
+    run_items: int
+    run_ids: List[str] = field(default_factory=list)
+    etags: Dict[str, str] = field(default_factory=dict)
+
+
+async def stream_scenario(ctx: Context, recorder: Recorder) -> None:
+    started = time.perf_counter()
+    body = {"user_prompt": PROMPT, "model": ctx.model, "max_tokens": 256}
+    async with ctx.client.stream("POST", "/playground/chat/completions", json=body) as response:
+        response.raise_for_status()
+        first = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: token") and first is None:
+                first = time.perf_counter() - started
+            elif line.startswith("event: error"):
+                raise RuntimeError("stream error event")
+            elif line.startswith("event: done"):
+                break
+    if first is not None:
+        recorder.ttfts.append(first)
+
+
+async def tokenize_scenario(ctx: Context, recorder: Recorder) -> None:
+    response = await ctx.client.post("/playground/tokenize", json={"text": PROMPT * 20, "model": ctx.model})
+    response.raise_for_status()
+
+
+async def submit_scenario(ctx: Context, recorder: Recorder) -> None:
+    inputs = [{"user_prompt": f"{PROMPT} ({i})"} for i in range(ctx.run_items)]
+    response = await ctx.client.post("/evals/run", json={"model": ctx.model, "inputs": inputs, "max_tokens": 32})
+    response.raise_for_status()
+    ctx.run_ids.append(response.json()["run_id"])
+    # Poll the most recent runs, like a dashboard would
+    del ctx.run_ids[:-100]
+
+
+async def poll_scenario(ctx: Context, recorder: Recorder) -> None:
+    if not ctx.run_ids:
+        await submit_scenario(ctx, Recorder())
+    run_id = random.choice(ctx.run_ids)
+    headers = {"If-None-Match": ctx.etags[run_id]} if run_id in ctx.etags else {}
+    response = await ctx.client.get(f"/evals/status/{run_id}", headers=headers)
+    if response.status_code != 304:
+        response.raise_for_status()
+    if "etag" in response.headers:
+        ctx.etags[run_id] = response.headers["etag"]
+
+
+SCENARIO_FUNCTIONS: Dict[str, Callable[[Context, Recorder], Awaitable[None]]] = {
+    "stream": stream_scenario,
+    "tokenize": tokenize_scenario,
+    "submit": submit_scenario,
+    "poll": poll_scenario,
+}
+
+
+async def _client_loop(scenario: str, ctx: Context, recorder: Recorder, deadline: float) -> None:
+    """One closed-loop client: issue requests back to back until the deadline."""
+    run = SCENARIO_FUNCTIONS[scenario]
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            await run(ctx, recorder)
+            recorder.latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            recorder.error(e)
+
+
+async def _runtime_stats(client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+    """Server RSS and loop lag since the last call (resets the lag window)."""
+    try:
+        response = await client.get("/health/runtime", params={"reset": "true"})
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError:
+        return None
+
+
+async def run_level(ctx: Context, scenarios: List[str], concurrency: int, duration: float) -> Dict[str, Any]:
+    """Run every scenario with `concurrency` clients each for `duration` seconds."""
+    await _runtime_stats(ctx.client)
+    recorders = {scenario: Recorder() for scenario in scenarios}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        _client_loop(scenario, ctx, recorders[scenario], deadline)
+        for scenario in scenarios
+        for _ in range(concurrency)
+    ))
+    return {
+        "concurrency": concurrency,
+        "scenarios": {scenario: recorder.summary(duration) for scenario, recorder in recorders.items()},
+        "server": await _runtime_stats(ctx.client),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} (see its log)")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start in {timeout}s")
+
+
+@contextmanager
+def local_servers(args: argparse.Namespace) -> Iterator[str]:
+    """Start the stand-in upstream and the API; yields the API base URL."""
+    with tempfile.TemporaryDirectory() as tmp:
+        upstream_port, api_port = _free_port(), _free_port()
+        log = open(os.path.join(tmp, "server.log"), "w")
+        upstream = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_upstream", "--port", str(upstream_port),
+             "--ttft-ms", str(args.upstream_ttft_ms), "--token-ms", str(args.upstream_token_ms),
+             "--tokens", str(args.upstream_tokens)],
+            stdout=log, stderr=subprocess.STDOUT,
+        )
+        env = {
+            **os.environ,
+            "GROQ_API_KEY": "load-test",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{upstream_port}",
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/load.db",
+            "JOB_BACKEND": "inprocess",
+            "LOOP_MONITOR_INTERVAL_MS": "10",
+            # The stand-in has no rate limits; don't let run budgets throttle submissions
+            "EVAL_TPM_LIMIT": str(10**9),
+            "EVAL_RPM_LIMIT": str(10**6),
+            "DEBUG": "false",
+        }
+        api = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning"],
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+        )
+        try:
+            _wait_ready(f"http://127.0.0.1:{upstream_port}/docs", upstream)
+            _wait_ready(f"http://127.0.0.1:{api_port}/health", api)
+            yield f"http://127.0.0.1:{api_port}"
+        finally:
+            for process in (api, upstream):
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            log.close()
+
+
+async def load_test(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        ctx = Context(client, args.model, args.run_items)
+        levels = []
+        for concurrency in args.levels:
+            level = await run_level(ctx, args.scenarios, concurrency, args.duration)
+            levels.append(level)
+            print(json.dumps(level), file=sys.stderr)
+    return {
+        "config": {
+            "target": args.target or "local",
+            "scenarios": args.scenarios,
+            "duration_s": args.duration,
+            "model": args.model,
+            "run_items": args.run_items,
+            "upstream": None if args.target else {
+                "ttft_ms": args.upstream_ttft_ms,
+                "token_ms": args.upstream_token_ms,
+                "tokens": args.upstream_tokens,
+            },
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Base URL of a running server (default: start one locally)")
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32, 64])
+    parser.add_argument("--scenarios", type=lambda v: v.split(","), default=SCENARIOS)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    parser.add_argument("--model", default="llama-3.1-8b-instant")
+    parser.add_argument("--run-items", type=int, default=5, help="Items per submitted run")
+    parser.add_argument("--upstream-ttft-ms", type=float, default=200.0)
+    parser.add_argument("--upstream-token-ms", type=float, default=10.0)
+    parser.add_argument("--upstream-tokens", type=int, default=100)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.target:
+        results = asyncio.run(load_test(args.target, args))
+    else:
+        with local_servers(args) as base_url:
+            results = asyncio.run(load_test(base_url, args))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Throughput benchmark for batched reference scoring.
+
+Generates synthetic (output, expected_output) pairs with partial overlap and
+times `score_pairs` end to end and per metric.
+
+Usage:
+    python -m benchmarks.reference_scoring
+    python -m benchmarks.reference_scoring --pairs 100000 --max-words 60
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app.modules.evals import reference
+
+
+VOCABULARY = [f"w{i}" for i in range(5000)]
+
+
+def make_pairs(n: int, max_words: int, seed: int) -> tuple[list[str], list[str]]:
+    """Random references, and outputs that copy, drop and substitute some of their words."""
+    rng = random.Random(seed)
+    outputs, references = [], []
+    for _ in range(n):
+        words = rng.choices(VOCABULARY, k=rng.randint(1, max_words))
+        output = [w if rng.random() > 0.2 else rng.choice(VOCABULARY) for w in words if rng.random() > 0.1]
+        references.append(" ".join(words) + ".")
+        outputs.append(" ".join(output).capitalize())
+    return outputs, references
+
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return round(time.perf_counter() - start, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=100_000)
+    parser.add_argument("--max-words", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    outputs, references = make_pairs(args.pairs, args.max_words, args.seed)
+
+    pred_norm = [reference.normalize_text(o) for o in outputs]
+    ref_norm = [reference.normalize_text(r) for r in references]
+    tokens, n_terms = reference.encode_tokens(pred_norm + ref_norm)
+    pred_tokens, ref_tokens = tokens.split(len(pred_norm))
+
+    total = _timed(reference.score_pairs, outputs, references)
+    results = {
+        "pairs": args.pairs,
+        "max_words": args.max_words,
+        "total_s": total,
+        "pairs_per_s": round(args.pairs / total),
+        "stages_s": {
+            "normalize_and_tokenize": _timed(
+                lambda: reference.encode_tokens([reference.normalize_text(t) for t in outputs + references])
+            ),
+            "token_f1": _timed(reference.token_f1, pred_tokens, ref_tokens, n_terms),
+            "rouge_l": _timed(reference.rouge_l, pred_tokens, ref_tokens),
+            "char_ngram_f1": _timed(reference.char_ngram_f1, pred_norm, ref_norm),
+        },
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
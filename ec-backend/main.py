@@ -6,9 +6,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from app.core.config import settings
-from app.core.database import init_db
-from app.modules.playground.router import router as playground_router
+from app.core.assets import check_assets, configure_asset_paths
+from app.core.database import engine, init_db
+from app.core.profiling import ProfilingMiddleware
+from app.core.runtime_stats import loop_monitor, rss_bytes
+from app.modules.common.key_pool import key_pool
+from app.modules.playground.router import close_client as close_playground_client, router as playground_router
+from app.modules.evals.archive import archive_sweeper
 from app.modules.evals.router import router as evals_router
+from app.modules.evals.runner import job_runner
+from app.modules.evals.validators import shutdown_validation_pool
 
 
 @asynccontextmanager
@@ -16,15 +23,28 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     logger.info("Starting EC-Backend...")
+    check_assets()
     await init_db()
     logger.info("Database initialized")
+    if settings.job_backend != "celery":
+        await job_runner.start()
+    loop_monitor.start()
+    archive_sweeper.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down EC-Backend...")
+    await archive_sweeper.stop()
+    await loop_monitor.stop()
+    await job_runner.shutdown()
+    await close_playground_client()
+    shutdown_validation_pool()
+    await engine.dispose()
 
 
+configure_asset_paths()
+
 # Create FastAPI application
 app = FastAPI(
     title="EC-Backend",
@@ -42,6 +62,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling (outermost, so it covers every other middleware)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(playground_router)
 app.include_router(evals_router)
@@ -62,7 +86,22 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "groq_configured": bool(settings.groq_api_key),
+        "groq_configured": bool(settings.groq_api_keys_list),
+    }
+
+
+@app.get("/health/keys")
+async def key_pool_stats():
+    """Health, rate-budget headroom and usage of each pooled API key in this process."""
+    return key_pool.snapshot()
+
+
+@app.get("/health/runtime")
+async def runtime_stats(reset: bool = False):
+    """Process memory and event-loop lag since the last reset (lag is null unless the monitor is enabled)."""
+    return {
+        "rss_bytes": rss_bytes(),
+        "loop_lag": loop_monitor.snapshot(reset=reset),
     }
 
 
@@ -0,0 +1,131 @@
+"""API key pool: routing by headroom, ejection and failover."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.modules.common.key_pool import EjectReason, KeyPool, KeyPoolExhausted
+
+
+def test_route_prefers_the_key_with_most_headroom():
+    pool = KeyPool(["k0", "k1"], tpm=1000, rpm=10)
+    first = pool.route("m", 600)
+    second = pool.route("m", 100)
+    assert first.key is not second.key
+    third = pool.route("m", 100)
+    assert third.key is second.key
+
+
+def test_rate_limit_ejects_for_retry_after_and_fails_over():
+    pool = KeyPool(["k0", "k1"], tpm=1000, rpm=10)
+    lease = pool.route("m", 10)
+    ejected = lease.key
+
+    assert pool.report_error(lease, 429, 20.0, "rate limited")
+    assert not ejected.available(time.monotonic())
+    assert ejected.eject_reason == EjectReason.RATE_LIMIT
+    assert ejected.ejected_until - time.monotonic() == pytest.approx(20.0, abs=1)
+    assert ejected.usage.ejections == 1
+
+    # Other requests, and the failed one once rerouted, go to the healthy key
+    assert pool.route("m", 10).key is not ejected
+    rerouted = asyncio.run(pool.reroute(lease, wait=False))
+    assert rerouted is lease and lease.key is not ejected
+    assert ejected.usage.in_flight == 0
+
+
+def test_retry_after_zero_is_not_treated_as_missing():
+    pool = KeyPool(["k0"], tpm=1000, rpm=10)
+    lease = pool.route("m", 10)
+    pool.report_error(lease, 429, 0.0, "window reset")
+    assert lease.key.ejected_until <= time.monotonic()
+
+
+def test_rate_limit_backoff_doubles_without_retry_after():
+    pool = KeyPool(["k0"], tpm=1000, rpm=10)
+    key = pool.keys[0]
+    for attempt in range(3):
+        key.ejected_until = 0.0
+        pool.report_error(pool.route("m", 1), 429, None, "rate limited")
+        expected = min(settings.key_rate_limit_ejection_seconds * 2 ** attempt, settings.key_max_ejection_seconds)
+        assert key.ejected_until - time.monotonic() == pytest.approx(expected, abs=1)
+    assert key.usage.ejections == 3
+
+
+def test_in_flight_errors_on_an_ejected_key_count_once():
+    pool = KeyPool(["k0"], tpm=1000, rpm=10)
+    leases = [pool.route("m", 1) for _ in range(3)]
+    for lease in leases:
+        pool.report_error(lease, 429, 5.0, "rate limited")
+    assert pool.keys[0].usage.ejections == 1
+    assert pool.keys[0].usage.errors == {"rate_limit": 3}
+
+
+def test_other_errors_do_not_eject():
+    pool = KeyPool(["k0"], tpm=1000, rpm=10)
+    lease = pool.route("m", 1)
+    assert not pool.report_error(lease, 500, None, "upstream error")
+    assert lease.key.available(time.monotonic())
+
+
+def test_auth_errors_on_every_key_exhaust_the_pool():
+    pool = KeyPool(["k0", "k1"], tpm=1000, rpm=10)
+    for _ in pool.keys:
+        # Each route lands on a key that hasn't been rejected yet
+        pool.report_error(pool.route("m", 1), 401, None, "Invalid API Key")
+    assert {key.eject_reason for key in pool.keys} == {EjectReason.AUTH}
+    with pytest.raises(KeyPoolExhausted):
+        pool.route("m", 1)
+    with pytest.raises(KeyPoolExhausted):
+        asyncio.run(pool.acquire("m", 1))
+
+
+def test_empty_pool_is_exhausted():
+    with pytest.raises(KeyPoolExhausted):
+        KeyPool([], tpm=1000, rpm=10).route("m", 1)
+
+
+def test_settle_corrects_the_reservation():
+    pool = KeyPool(["k0"], tpm=1000, rpm=10)
+    lease = pool.route("m", 800)
+    budget = lease.key.budget("m")
+    assert budget.tokens.level == pytest.approx(200, abs=1)
+    pool.settle(lease, 100)
+    pool.settle(lease, 100)  # Settling twice is a no-op
+    assert budget.tokens.level == pytest.approx(900, abs=1)
+    assert lease.key.usage.tokens == 100 and lease.key.usage.in_flight == 0
+
+
+async def test_acquire_waits_for_budget_then_uses_the_key_that_frees_first():
+    pool = KeyPool(["k0", "k1"], tpm=100000, rpm=60)  # One request per second per key
+    for key in pool.keys:
+        key.budget("m").requests.level = 0.0
+    pool.keys[1].budget("m").requests.level = 0.5
+
+    start = time.monotonic()
+    lease = await pool.acquire("m", 1)
+    assert lease.key is pool.keys[1]
+    assert 0.3 < time.monotonic() - start < 0.8
+
+
+async def test_a_model_waiting_for_budget_does_not_block_other_models():
+    pool = KeyPool(["k0"], tpm=1000, rpm=2)
+    await pool.acquire("a", 10)
+    await pool.acquire("a", 10)
+    waiting = asyncio.create_task(pool.acquire("a", 10))
+    await asyncio.sleep(0.01)
+
+    lease = await asyncio.wait_for(pool.acquire("b", 10), 0.5)
+    assert lease.model == "b"
+    assert not waiting.done()
+    waiting.cancel()
+
+
+async def test_acquire_skips_ejected_keys():
+    pool = KeyPool(["k0", "k1"], tpm=1000, rpm=10)
+    pool.report_error(pool.route("m", 1), 429, 60.0, "rate limited")
+    healthy = next(key for key in pool.keys if key.available(time.monotonic()))
+    for _ in range(3):
+        assert (await pool.acquire("m", 1)).key is healthy
@@ -0,0 +1,85 @@
+"""Mergeable run metrics against a one-pass computation."""
+
+import math
+import random
+import statistics
+
+import pytest
+
+from app.modules.common.stats import RunMetrics, RunningStats, wilson_interval
+
+
+def _items(seed: int, count: int):
+    rng = random.Random(seed)
+    return [
+        (rng.random() < 0.7, rng.lognormvariate(6, 0.5) if rng.random() < 0.9 else None, -rng.random() * 20, rng.randint(1, 50))
+        for _ in range(count)
+    ]
+
+
+def _record_all(items) -> RunMetrics:
+    metrics = RunMetrics()
+    for passed, latency, logprob_sum, tokens in items:
+        metrics.record(passed, latency, logprob_sum, tokens)
+    return metrics
+
+
+@pytest.mark.parametrize("splits", [[0], [1], [500], [17, 250, 251, 400], list(range(0, 600, 37))])
+def test_merged_chunks_match_one_pass(splits):
+    items = _items(7, 600)
+    one_pass = _record_all(items)
+
+    bounds = [0, *splits, len(items)]
+    merged = RunMetrics()
+    for start, end in zip(bounds, bounds[1:]):
+        # Round-trip each chunk through its stored form, as resumed runs do
+        merged.merge(RunMetrics.from_dict(_record_all(items[start:end]).to_dict()))
+
+    assert (merged.items, merged.passed, merged.token_count) == (one_pass.items, one_pass.passed, one_pass.token_count)
+    assert merged.logprob_sum == pytest.approx(one_pass.logprob_sum)
+    assert merged.latency.count == one_pass.latency.count
+    assert merged.latency.mean == pytest.approx(one_pass.latency.mean)
+    assert merged.latency.variance == pytest.approx(one_pass.latency.variance)
+    assert (merged.latency.min, merged.latency.max) == (one_pass.latency.min, one_pass.latency.max)
+    assert merged.perplexity == pytest.approx(one_pass.perplexity)
+
+
+def test_running_stats_match_statistics_module():
+    rng = random.Random(3)
+    values = [rng.gauss(100, 15) for _ in range(250)]
+    stats = RunningStats()
+    for value in values:
+        stats.update(value)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.std == pytest.approx(statistics.stdev(values))
+
+
+def test_merging_into_or_from_empty_stats():
+    filled = RunningStats()
+    for value in (1.0, 2.0, 4.0):
+        filled.update(value)
+    assert RunningStats().merge(filled).to_dict() == filled.to_dict()
+    before = filled.to_dict()
+    assert filled.merge(RunningStats()).to_dict() == before
+
+
+def test_confidence_interval_needs_two_samples():
+    stats = RunningStats()
+    assert stats.confidence_interval() is None
+    stats.update(5.0)
+    assert stats.confidence_interval() is None
+    stats.update(7.0)
+    low, high = stats.confidence_interval()
+    assert low < 6.0 < high
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) is None
+    low, high = wilson_interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    low, high = wilson_interval(0, 10)
+    assert low == 0.0 and 0 < high < 0.35
+    low, high = wilson_interval(10, 10)
+    assert 0.65 < low < 1 and high == pytest.approx(1.0)
+    assert not math.isnan(low)
@@ -0,0 +1,146 @@
+"""The streaming JSON parser must agree with `json.loads` on every prefix."""
+
+import json
+import random
+
+import pytest
+
+from app.modules.evals.stream_validators import JsonStreamParser, compile_stream_validators
+
+
+VALID = [
+    "{}",
+    "[]",
+    "0",
+    "-0.5e-3",
+    '"a\\"b\\\\c\\u00e9\\n"',
+    '{"a": [1, 2.5, -3e+2, true, false, null], "b": {"c": ""}}',
+    "[NaN, Infinity, -Infinity]",
+    '{"a": -Infinity}',
+    '  [ {"k" : [ [ ] , { } ] } ]  ',
+    '"\\ud83d\\ude00"',
+]
+
+INVALID = [
+    "{,}",
+    "[1,]",
+    "01",
+    "1.",
+    "-",
+    "+1",
+    "[1 2]",
+    '{"a" 1}',
+    "{1: 2}",
+    '"\\x"',
+    '"\\u12g4"',
+    '"tab\there"',
+    "nul",
+    "nan",
+    "-Inf",
+    "Infinityx",
+    "[]]",
+    "{} {}",
+    "tru e",
+]
+
+
+def feed(text: str) -> JsonStreamParser:
+    parser = JsonStreamParser()
+    for char in text:
+        if parser.feed(char):
+            break
+    return parser
+
+
+def accepts(text: str) -> bool:
+    """Whether the parser takes `text` as one complete document (a trailing space ends numbers)."""
+    parser = feed(text + " ")
+    return parser.error is None and parser.expect == JsonStreamParser.DONE and parser.token is None
+
+
+def loads(text: str) -> bool:
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+@pytest.mark.parametrize("text", VALID)
+def test_valid_documents_and_their_prefixes_never_fail(text):
+    assert loads(text)
+    for end in range(len(text) + 1):
+        assert feed(text[:end]).error is None, text[:end]
+    assert accepts(text)
+
+
+@pytest.mark.parametrize("text", INVALID)
+def test_invalid_documents_are_rejected(text):
+    assert not loads(text)
+    assert not accepts(text)
+
+
+def test_failure_is_reported_at_the_first_impossible_character():
+    parser = JsonStreamParser()
+    assert parser.feed('{"a": [1, ') is None
+    reason = parser.feed("}")
+    assert reason == "Invalid JSON at char 10: unexpected '}'"
+    # The failure is sticky
+    assert parser.feed("]}") == reason
+
+
+def test_chunking_does_not_matter():
+    text = '{"key": [12.5e3, "va\\u0041ue", null]}'
+    whole = JsonStreamParser()
+    assert whole.feed(text) is None
+    for size in (1, 2, 3, 7):
+        parser = JsonStreamParser()
+        for start in range(0, len(text), size):
+            assert parser.feed(text[start:start + size]) is None
+        assert parser.expect == whole.expect == JsonStreamParser.DONE
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    kinds = ["int", "float", "str", "bool", "null", "const"] + (["list", "dict"] if depth < 3 else [])
+    kind = rng.choice(kinds)
+    if kind == "int":
+        return rng.randint(-10**6, 10**6)
+    if kind == "float":
+        return rng.uniform(-1e6, 1e6) * 10 ** rng.randint(-8, 8)
+    if kind == "str":
+        return "".join(rng.choice('ab "\\\n\té€😀') for _ in range(rng.randint(0, 6)))
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    if kind == "const":
+        return rng.choice([float("nan"), float("inf"), float("-inf")])
+    if kind == "list":
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {
+        "".join(rng.choice("abc") for _ in range(3)): _random_value(rng, depth + 1)
+        for _ in range(rng.randint(0, 4))
+    }
+
+
+def test_agrees_with_json_loads_on_random_documents_and_mutations():
+    rng = random.Random(1234)
+    alphabet = '{}[]:,"\\ 0123456789-+.eEtrufalsnNIiy'
+    for _ in range(300):
+        text = json.dumps(_random_value(rng), ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1]))
+        assert accepts(text), text
+        for end in range(len(text)):
+            assert feed(text[:end]).error is None, text[:end]
+
+        # Corrupt one character: both must agree on the result
+        chars = list(text)
+        position = rng.randrange(len(chars))
+        chars[position] = rng.choice(alphabet)
+        mutated = "".join(chars)
+        assert accepts(mutated) == loads(mutated), mutated
+
+
+def test_compiled_json_validators_use_the_parser():
+    factories = dict(compile_stream_validators([("json", {}), ("json_schema", {"schema": {}}), ("regex", {})]))
+    assert set(factories) == {"json", "json_schema"}
+    assert isinstance(factories["json"](), JsonStreamParser)
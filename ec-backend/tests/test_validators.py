@@ -0,0 +1,12 @@
+"""Validators that depend on build-time assets."""
+
+from app.modules.evals import validators
+
+
+def test_readability_fails_without_cmudict(monkeypatch):
+    monkeypatch.setattr(validators, "missing_assets", lambda: ["nltk:cmudict"])
+    check = validators._build_readability({"min_reading_ease": 50})
+
+    passed, reason = check("The cat sat on the mat.", {})
+    assert not passed
+    assert "nltk:cmudict" in reason and "python -m app.core.assets" in reason
@@ -2,7 +2,11 @@ import { useAppStore } from "@/store/appStore"
 
 const API_BASE_URL = "http://localhost:8000"
 
-interface TokenEvent {
+export const DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+export interface TokenEvent {
+    model: string
+    sample: number
     id: number
     text: string
     logprob: number
@@ -30,7 +34,7 @@ export async function runInference() {
             body: JSON.stringify({
                 system_prompt: systemPrompt,
                 user_prompt: userPrompt,
-                model: "llama-3.1-8b-instant",
+                model: DEFAULT_MODEL,
                 temperature,
                 max_tokens: maxTokens,
                 top_p: 1.0,
@@ -122,6 +126,130 @@ export async function runInference() {
     }
 }
 
+export interface StreamMetrics {
+    model: string
+    sample: number
+    ttft_ms: number | null
+    tokens: number
+    tokens_per_s: number | null
+    elapsed_ms: number
+    status?: "completed" | "failed"
+}
+
+export interface ModelStreamHandlers {
+    onToken?: (token: TokenEvent) => void
+    onMetrics?: (metrics: StreamMetrics) => void
+    onError?: (model: string, sample: number, error: string) => void
+}
+
+/**
+ * Stream several models side by side over one SSE connection.
+ * Resolves with each stream's final metrics once every model has finished.
+ */
+export async function streamModels(
+    models: string[],
+    prompt: { systemPrompt: string; userPrompt: string; temperature: number; maxTokens: number },
+    handlers: ModelStreamHandlers,
+    signal?: AbortSignal,
+): Promise<StreamMetrics[]> {
+    const response = await fetch(`${API_BASE_URL}/playground/chat/completions`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", "Accept": "text/event-stream" },
+        body: JSON.stringify({
+            system_prompt: prompt.systemPrompt,
+            user_prompt: prompt.userPrompt,
+            models,
+            temperature: prompt.temperature,
+            max_tokens: prompt.maxTokens,
+            top_p: 1.0,
+        }),
+        signal,
+    })
+    return readModelStreams(response, handlers)
+}
+
+/** Dispatch a playground SSE response to `handlers`; resolves with each stream's final metrics. */
+async function readModelStreams(response: Response, handlers: ModelStreamHandlers): Promise<StreamMetrics[]> {
+    if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    const finished: StreamMetrics[] = []
+    let buffer = ""
+    let eventType = ""
+
+    while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split("\n")
+        buffer = lines.pop() || ""
+
+        for (const line of lines) {
+            if (line.startsWith("event: ")) {
+                eventType = line.slice(7).trim()
+                continue
+            }
+            if (!line.startsWith("data: ")) continue
+
+            const data = JSON.parse(line.slice(6))
+            if (eventType === "token") {
+                handlers.onToken?.(data)
+            } else if (eventType === "metrics") {
+                handlers.onMetrics?.(data)
+            } else if (eventType === "sample_done") {
+                finished.push(data)
+                handlers.onMetrics?.(data)
+            } else if (eventType === "error") {
+                handlers.onError?.(data.model, data.sample, data.error)
+            }
+        }
+    }
+    return finished
+}
+
+export interface PlaygroundSession {
+    session_id: string
+    created_at: string
+    models: string[]
+    n: number
+    user_prompt: string
+    duration_ms: number
+    size_bytes: number
+    streams: (StreamMetrics & { error: string | null })[]
+}
+
+export async function fetchPlaygroundSessions(): Promise<PlaygroundSession[]> {
+    try {
+        const response = await fetch(`${API_BASE_URL}/playground/sessions`)
+        const data = await response.json()
+        return data.sessions || []
+    } catch (error) {
+        console.error("Failed to fetch playground sessions:", error)
+        return []
+    }
+}
+
+/**
+ * Replay a recorded playground session with the same events as the live stream.
+ * `speed` scales the original pacing; 0 delivers everything at once.
+ */
+export async function replaySession(
+    sessionId: string,
+    speed: number,
+    handlers: ModelStreamHandlers,
+    signal?: AbortSignal,
+): Promise<StreamMetrics[]> {
+    const response = await fetch(`${API_BASE_URL}/playground/sessions/${sessionId}/replay?speed=${speed}`, {
+        headers: { "Accept": "text/event-stream" },
+        signal,
+    })
+    return readModelStreams(response, handlers)
+}
+
 export async function fetchModels(): Promise<string[]> {
     try {
         const response = await fetch(`${API_BASE_URL}/playground/models`)
@@ -138,7 +266,7 @@ export async function tokenizeText(text: string): Promise<{ id: number; text: st
         const response = await fetch(`${API_BASE_URL}/playground/tokenize`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ text, model: "llama-3.1-8b-instant" }),
+            body: JSON.stringify({ text, model: DEFAULT_MODEL }),
         })
         const data = await response.json()
         return data.tokens || []
@@ -175,11 +303,32 @@ export interface EvalRunRequest {
     metric_config?: {
         check_json?: boolean
         check_length?: number
+        regex?: string
+        json_schema?: Record<string, unknown>
+        match_expected?: 'exact' | 'normalized'
+        contains?: string[]
+        excludes?: string[]
+        readability?: { min_reading_ease?: number; max_grade_level?: number }
+        custom_rules?: Record<string, Record<string, unknown>>
     }
     temperature?: number
     max_tokens?: number
+    stopping?: {
+        pass_rate_margin?: number
+        latency_margin_ms?: number
+        regression_threshold?: number
+        confidence?: number
+        method?: 'wilson' | 'bayesian'
+        min_items?: number
+        seed?: number
+    }
+    item_timeout_seconds?: number
+    run_timeout_seconds?: number
+    execution_mode?: 'stream' | 'batch'
 }
 
+export type ReferenceMetric = 'exact_match' | 'token_f1' | 'rouge_l' | 'char_ngram_f1'
+
 export interface EvalReport {
     run_id: string
     status: string
@@ -193,6 +342,20 @@ export interface EvalReport {
     min_latency_ms: number
     max_latency_ms: number
     avg_perplexity: number | null
+    reference_metrics?: {
+        scored_items: number
+    } & Record<ReferenceMetric, { mean: number | null; std: number | null; p50: number | null }> | null
+    stopping?: {
+        stopped_early: boolean
+        reason: string | null
+        items_evaluated: number
+        method: string
+        confidence: number
+        pass_rate: number
+        pass_rate_interval: [number, number] | null
+        avg_latency_ms: number | null
+        latency_interval_ms: [number, number] | null
+    } | null
     created_at: string
     started_at: string | null
     completed_at: string | null
@@ -202,6 +365,9 @@ export interface EvalReport {
         latency_ms: number
         passed: boolean
         failure_reason: string | null
+        validations: Array<{ name: string; passed: boolean; reason: string | null }>
+        timed_out?: boolean
+        reference_scores?: Record<ReferenceMetric, number> | null
     }> | null
 }
 
@@ -251,6 +417,18 @@ export async function getEvalReport(runId: string): Promise<EvalReport | null> {
     }
 }
 
+export async function cancelEvalRun(runId: string): Promise<boolean> {
+    try {
+        const response = await fetch(`${API_BASE_URL}/evals/${runId}/cancel`, {
+            method: "POST",
+        })
+        return response.ok
+    } catch (error) {
+        console.error("Failed to cancel eval run:", error)
+        return false
+    }
+}
+
 export async function deleteEvalRun(runId: string): Promise<boolean> {
     try {
         const response = await fetch(`${API_BASE_URL}/evals/${runId}`, {
@@ -263,3 +441,65 @@ export async function deleteEvalRun(runId: string): Promise<boolean> {
     }
 }
 
+
+export interface RunDiffSummary {
+    base: string
+    head: string
+    matched_items: number
+    only_in_base: number
+    only_in_head: number
+    newly_failing: number
+    newly_passing: number
+    output_changed: number
+    avg_latency_delta_ms: number | null
+}
+
+export interface ItemDiff {
+    base_index: number
+    head_index: number
+    input_hash: string
+    base_passed: boolean
+    head_passed: boolean
+    flipped: boolean
+    latency_delta_ms: number | null
+    base_failure_reason: string | null
+    head_failure_reason: string | null
+    output_changed: boolean
+    base_output: string | null
+    head_output: string | null
+}
+
+export async function compareEvalRuns(
+    base: string,
+    head: string,
+    onItem: (item: ItemDiff) => void,
+    only: 'changes' | 'flipped' | 'all' = 'changes',
+): Promise<RunDiffSummary | null> {
+    try {
+        const params = new URLSearchParams({ base, head, only })
+        const response = await fetch(`${API_BASE_URL}/evals/compare?${params}`)
+        if (!response.ok || !response.body) throw new Error("Failed to compare runs")
+
+        // NDJSON: a summary line, then one line per item
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ""
+        let summary: RunDiffSummary | null = null
+        while (true) {
+            const { done, value } = await reader.read()
+            if (done) break
+            buffer += decoder.decode(value, { stream: true })
+            const lines = buffer.split("\n")
+            buffer = lines.pop() || ""
+            for (const line of lines) {
+                if (!line) continue
+                if (summary === null) summary = JSON.parse(line)
+                else onItem(JSON.parse(line))
+            }
+        }
+        return summary
+    } catch (error) {
+        console.error("Failed to compare eval runs:", error)
+        return null
+    }
+}